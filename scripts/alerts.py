@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+ALERTS
+Rules evaluated on every appended liveData point, each in O(1) against state
+kept per strategy in store/alerts/<id>/state.json:
+
+    drawdown   point drawdown at or below -DRAWDOWN_PCT
+    tvl_drop   TVL more than TVL_DROP_PCT below its max over TVL_WINDOW
+               (sliding max kept as a monotonic deque)
+    offline    status 'Offline'
+    stale      no new point for STALE_SECONDS (checked by `check` / the daemon)
+
+An alert emits one 'firing' event when its condition starts and one
+'resolved' event when it clears, to store/alerts/<id>/events.jsonl and, when
+SENTQUANT_ALERT_WEBHOOK is set, as a JSON POST to that URL.
+
+    python alerts.py check                     # stale data for every strategy
+    python alerts.py active
+    python alerts.py replay --strategy sentquant --drawdown 10   # dry run over history
+"""
+
+import argparse
+import json
+import os
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+
+import history_store
+from strategies import STRATEGIES, get_strategy
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+ALERTS_DIR = STORE_DIR / "alerts"
+WEBHOOK_URL = os.getenv('SENTQUANT_ALERT_WEBHOOK')
+WEBHOOK_TIMEOUT = 5
+
+DEFAULT_RULES = {
+    'drawdown_pct': 20.0,      # Fire at drawdown <= -20%
+    'tvl_drop_pct': 30.0,      # Fire when TVL is 30% below its window max
+    'tvl_window': 86400,       # Seconds
+    'stale_seconds': 3 * 3600, # Hourly updaters miss three runs
+    'hysteresis_pct': 0.5,     # Percentage points a value must recover before resolving
+}
+
+# ========== SINKS ==========
+
+class JsonlSink:
+    """One JSON event per line in <directory>/<strategy>/events.jsonl"""
+
+    def __init__(self, directory=ALERTS_DIR):
+        self.directory = Path(directory)
+
+    def emit(self, event):
+        path = self.directory / event['strategy'] / "events.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps(event) + "\n")
+
+
+class WebhookSink:
+    """POST each event as JSON; failures are reported, never raised"""
+
+    def __init__(self, url, timeout=WEBHOOK_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, event):
+        import requests
+        try:
+            requests.post(self.url, json=event, timeout=self.timeout).raise_for_status()
+        except Exception as e:
+            print(f"⚠️  Alert webhook failed: {e}")
+
+
+class PrintSink:
+    def emit(self, event):
+        icon = '🚨' if event['state'] == 'firing' else '✅'
+        print(f"{icon} {event['time']} {event['strategy']}: {event['rule']} {event['state']} — {event['message']}")
+
+
+def default_sinks():
+    sinks = [JsonlSink(), PrintSink()]
+    if WEBHOOK_URL:
+        sinks.append(WebhookSink(WEBHOOK_URL))
+    return sinks
+
+# ========== ENGINE ==========
+
+def now_epoch():
+    # Points carry naive datetime.now() stamps read back as UTC; compare like with like
+    return datetime.now().replace(tzinfo=timezone.utc).timestamp()
+
+
+def stamp(epoch):
+    return datetime.fromtimestamp(int(epoch), timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def empty_state():
+    return {'last_epoch': None, 'tvl_window': deque(), 'active': {}}
+
+
+class AlertEngine:
+    """Incremental rule state per strategy; every transition goes to the sinks"""
+
+    def __init__(self, rules=None, sinks=None, directory=ALERTS_DIR, persist=True, output_dir=None):
+        self.rules = {**DEFAULT_RULES, **(rules or {})}
+        self.sinks = default_sinks() if sinks is None else sinks
+        self.directory = Path(directory)
+        self.output_dir = output_dir  # live-data directory history is primed from
+        self.persist = persist
+        self.states = {}
+        self.unannounced = set()  # Primed up to a point that has not been evaluated yet
+
+    # ----- state -----
+
+    def state_path(self, strategy_id):
+        return self.directory / strategy_id / "state.json"
+
+    def state(self, strategy, before=None):
+        """Loaded (or primed from history up to `before`) rule state of a strategy"""
+        strategy_id = strategy['id']
+        if strategy_id not in self.states:
+            path = self.state_path(strategy_id)
+            if self.persist and path.exists():
+                with open(path, 'r') as f:
+                    saved = json.load(f)
+                self.states[strategy_id] = {**saved, 'tvl_window': deque(saved['tvl_window'])}
+            else:
+                self.prime(strategy, before)
+        return self.states[strategy_id]
+
+    def prime(self, strategy, before=None):
+        """
+        First sight of a strategy: replay its history silently, then announce
+        only the alerts still active at the last point. Updaters write a point
+        before evaluating it, so `before` (its epoch) keeps it out of the replay.
+        """
+        self.states[strategy['id']] = empty_state()
+        sinks, self.sinks = self.sinks, []
+        try:
+            document = history_store.load_history(strategy['id'], self.output_dir).get(strategy['id'], {})
+            points = document.get('liveData', [])
+            if before is not None:
+                points = [p for p in points if history_store.point_epoch(p) < before]
+            for point in points:
+                self.on_point(strategy, point)
+            if points and before is None:
+                self.on_status(strategy, document.get('status'), point_epoch=history_store.point_epoch(points[-1]))
+        finally:
+            self.sinks = sinks
+        if before is not None:
+            # Announced by on_point once the new point has been evaluated
+            self.unannounced.add(strategy['id'])
+            return
+        self.announce(strategy['id'])
+
+    def announce(self, strategy_id, skip=()):
+        """One 'firing' event per alert active after priming, with its latest value"""
+        return [self.emit(strategy_id, rule, 'firing', alert['since'], alert['value'], alert['message'])
+                for rule, alert in self.states[strategy_id]['active'].items() if rule not in skip]
+
+    def save(self, strategy_id):
+        if not self.persist or strategy_id not in self.states:
+            return
+        state = self.states[strategy_id]
+        history_store.write_json_atomic(self.state_path(strategy_id),
+                                        {**state, 'tvl_window': list(state['tvl_window'])}, indent=None)
+
+    # ----- transitions -----
+
+    def emit(self, strategy_id, rule, state, since, value, message):
+        event = {
+            'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'strategy': strategy_id,
+            'rule': rule,
+            'state': state,
+            'value': value,
+            'message': message,
+            'since': stamp(since),
+            # Same key for the firing and resolved events of one episode
+            'key': f"{strategy_id}:{rule}:{int(since)}",
+        }
+        for sink in self.sinks:
+            sink.emit(event)
+        return event
+
+    def update(self, strategy_id, rule, firing, clear, epoch, value, message):
+        """
+        Fire on the first point that meets a rule, resolve once it is `clear`;
+        anything in between changes nothing (deduplication and hysteresis)
+        """
+        active = self.states[strategy_id]['active']
+        if rule not in active:
+            if firing:
+                active[rule] = {'since': epoch, 'value': value, 'message': message}
+                return [self.emit(strategy_id, rule, 'firing', epoch, value, message)]
+        elif clear:
+            alert = active.pop(rule)
+            return [self.emit(strategy_id, rule, 'resolved', alert['since'], value, message)]
+        elif firing:
+            active[rule].update(value=value, message=message)  # Still firing: keep the latest reading
+        return []
+
+    # ----- rules -----
+
+    def on_point(self, strategy, point, status=None):
+        """Evaluate one appended point; points at or before the last seen one are ignored"""
+        strategy_id = strategy['id']
+        epoch = history_store.point_epoch(point)
+        state = self.state(strategy, before=epoch)
+        if state['last_epoch'] is not None and epoch <= state['last_epoch']:
+            return []
+        state['last_epoch'] = epoch
+        rules = self.rules
+        margin = rules['hysteresis_pct']
+        events = self.update(strategy_id, 'stale', False, True, epoch, 0, f"new point at {stamp(epoch)}")
+
+        drawdown = point.get('drawdown', 0)
+        events += self.update(strategy_id, 'drawdown',
+                              drawdown <= -rules['drawdown_pct'], drawdown > -rules['drawdown_pct'] + margin,
+                              epoch, drawdown, f"drawdown {drawdown:.2f}% (limit -{rules['drawdown_pct']:g}%)")
+
+        tvl = point.get(strategy.get('tvl_key', 'tvl'))
+        if tvl is not None:
+            # Monotonic deque: window max at the front, amortized O(1) per point
+            window = state['tvl_window']
+            while window and window[-1][1] <= tvl:
+                window.pop()
+            window.append([epoch, tvl])
+            while window[0][0] < epoch - rules['tvl_window']:
+                window.popleft()
+            peak = window[0][1]
+            drop = (peak - tvl) / peak * 100 if peak > 0 else 0
+            events += self.update(strategy_id, 'tvl_drop',
+                                  drop > rules['tvl_drop_pct'], drop < rules['tvl_drop_pct'] - margin,
+                                  epoch, round(drop, 4),
+                                  f"TVL {tvl:,.2f} is {drop:.1f}% below the {rules['tvl_window'] / 3600:g}h max {peak:,.2f}")
+
+        if status is not None:
+            events += self.on_status(strategy, status, epoch)
+        if strategy_id in self.unannounced:
+            self.unannounced.discard(strategy_id)
+            events += self.announce(strategy_id, skip={e['rule'] for e in events})
+        return events
+
+    def on_status(self, strategy, status, point_epoch):
+        offline = status == 'Offline'
+        return self.update(strategy['id'], 'offline', offline, not offline, point_epoch, status,
+                           f"status {status}")
+
+    def on_points(self, strategy, new_points, status=None):
+        """Daemon listener: evaluate a flushed batch and persist the state once"""
+        events = []
+        for point in new_points:
+            events += self.on_point(strategy, point)
+        if status is not None and new_points:
+            events += self.on_status(strategy, status, history_store.point_epoch(new_points[-1]))
+        self.save(strategy['id'])
+        return events
+
+    def check_stale(self, strategies, now=None):
+        """Fire 'stale' for strategies whose last point is older than the limit"""
+        now = now_epoch() if now is None else now
+        limit = self.rules['stale_seconds']
+        events = []
+        for strategy in strategies:
+            state = self.state(strategy)
+            last = state['last_epoch']
+            if last is not None and now - last > limit:
+                age = (now - last) / 3600
+                events += self.update(strategy['id'], 'stale', True, False, last, round(age, 2),
+                                      f"last point {stamp(last)}, {age:.1f}h ago")
+            self.save(strategy['id'])
+        return events
+
+
+def observe(strategy_id, point, status=None):
+    """Updater hook: evaluate the point just appended. Alerting never fails an update."""
+    try:
+        engine = AlertEngine()
+        strategy = get_strategy(strategy_id)
+        engine.on_point(strategy, point, status)
+        engine.save(strategy_id)
+    except Exception as e:
+        print(f"⚠️  Alert evaluation failed for {strategy_id}: {e}")
+
+# ========== CLI ==========
+
+def parse_rules(args):
+    overrides = {'drawdown_pct': args.drawdown, 'tvl_drop_pct': args.tvl_drop,
+                 'tvl_window': args.tvl_window, 'stale_seconds': args.stale}
+    return {key: value for key, value in overrides.items() if value is not None}
+
+
+def main():
+    """Stale checks, active alerts and dry-run replays"""
+    parser = argparse.ArgumentParser(description="Incremental NAV / TVL alerting")
+    parser.add_argument('command', choices=['check', 'active', 'replay'])
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all)")
+    parser.add_argument('--drawdown', type=float, help="drawdown limit in percent")
+    parser.add_argument('--tvl-drop', type=float, help="TVL drop limit in percent")
+    parser.add_argument('--tvl-window', type=float, help="TVL window in seconds")
+    parser.add_argument('--stale', type=float, help="seconds without a point before data is stale")
+    args = parser.parse_args()
+
+    strategies = [get_strategy(s) for s in args.strategy] if args.strategy else STRATEGIES
+    rules = parse_rules(args)
+
+    if args.command == 'replay':
+        # Every transition over the full history, nothing written
+        engine = AlertEngine(rules, sinks=[PrintSink()], persist=False)
+        for strategy in strategies:
+            engine.states[strategy['id']] = empty_state()
+            for point in history_store.load_history(strategy['id']).get(strategy['id'], {}).get('liveData', []):
+                engine.on_point(strategy, point)
+        return 0
+
+    engine = AlertEngine(rules)
+    if args.command == 'check':
+        events = engine.check_stale(strategies)
+        print(f"🔎 Checked {len(strategies)} strategies, {len(events)} new stale alerts")
+        return 0
+
+    for strategy in strategies:
+        for rule, alert in engine.state(strategy)['active'].items():
+            print(f"🚨 {strategy['id']:<16} {rule:<9} since {stamp(alert['since'])}  {alert['message']}")
+        engine.save(strategy['id'])
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
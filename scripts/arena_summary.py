@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+ARENA SUMMARY
+One small public/data/arena-summary.json for the landing page: per strategy
+the headline numbers the Arena cards show (profit since the first point, TVL,
+status, SRS) and a fixed-length sparkline, so the browser makes one request
+instead of downloading every full liveData history. Full histories are only
+fetched when a profile is opened.
+
+    python arena_summary.py
+    python arena_summary.py --points 64 --output-dir public/data
+"""
+
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+import history_store
+import srs_real
+from nav_model import NavSeries
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+OUTPUT_DIR = SCRIPT_DIR.parent / "public" / "data"
+SUMMARY_FILE = "arena-summary.json"
+SPARKLINE_POINTS = 64
+
+# ========== SUMMARY ==========
+
+def stamp(epoch):
+    return datetime.fromtimestamp(int(epoch), timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def sparkline_point(epoch, value):
+    # Same keys the charts read from liveData points
+    when = stamp(epoch)
+    return {'date': when[:10], 'timestamp': when, 'value': float(value)}
+
+
+def sparkline(series, points=SPARKLINE_POINTS):
+    """
+    `points` samples evenly spaced in time from first to last point, each the
+    last observation at or before its target; first and last are exact
+    """
+    if not len(series):
+        return []
+    epochs, values = series.epoch, series.value
+    order = np.argsort(epochs, kind='stable')
+    epochs, values = epochs[order], values[order]
+    targets = np.linspace(epochs[0], epochs[-1], min(points, len(epochs)))
+    picks = np.unique(np.searchsorted(epochs, targets, side='right') - 1)
+    picks[-1] = len(epochs) - 1
+    return [sparkline_point(epochs[i], values[i]) for i in picks]
+
+
+def strategy_summary(strategy_id, output_dir=None, points=SPARKLINE_POINTS):
+    document = history_store.load_history(strategy_id, output_dir).get(strategy_id, {})
+    series = NavSeries.from_points(document.get('liveData', []), strategy_id)
+    values = series.value
+    # Same rule as the Arena: first vs last point, in percent
+    profit = (values[-1] - values[0]) / values[0] * 100 if len(values) > 1 and values[0] else 0
+    return {
+        'profitValue': float(profit),
+        'tvl': document.get('tvl', 0),
+        'status': document.get('status', 'Offline'),
+        'points': len(series),
+        'lastUpdate': stamp(series.epoch.max()) if len(series) else None,
+        'sparkline': sparkline(series, points),
+    }
+
+
+def build_summary(output_dir=None, agents=srs_real.AGENTS, points=SPARKLINE_POINTS):
+    """{generated, strategies: {id: summary}} for every agent with a live-data file"""
+    directory = Path(output_dir or OUTPUT_DIR)
+    srs = {r['id']: r['srs'] for r in srs_real.score_results(srs_real.load_raw_results(agents, str(directory)))}
+    strategies = {}
+    for agent in agents:
+        if not history_store.live_data_path(agent['id'], directory).exists():
+            continue
+        strategies[agent['id']] = {**strategy_summary(agent['id'], directory, points), 'srs': srs.get(agent['id'])}
+    return {'generated': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'strategies': strategies}
+
+
+def write_summary(output_dir=None, points=SPARKLINE_POINTS):
+    summary = build_summary(output_dir, points=points)
+    path = Path(output_dir or OUTPUT_DIR) / SUMMARY_FILE
+    history_store.write_json_atomic(path, summary, indent=None)
+    return path, summary
+
+
+def main():
+    """Write arena-summary.json"""
+    parser = argparse.ArgumentParser(description="Publish the Arena landing-page summary")
+    parser.add_argument('--points', type=int, default=SPARKLINE_POINTS, help="sparkline length")
+    parser.add_argument('--output-dir', help="live-data directory (default: public/data)")
+    args = parser.parse_args()
+
+    path, summary = write_summary(args.output_dir, args.points)
+    for strategy_id, s in summary['strategies'].items():
+        print(f"   {strategy_id:<16} {s['profitValue']:>+9.2f}%  TVL {s['tvl']:>14,.2f}  SRS {s['srs']}  "
+              f"({s['points']} → {len(s['sparkline'])} points)")
+    print(f"💾 Saved to {path} ({path.stat().st_size / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+BACKFILL
+Import a strategy's past performance from venue history endpoints instead of
+starting flat at START_NAV on its first poll:
+
+    lighter      GET /pnl (cumulative trade PnL and transfers per hour), fetched
+                 as time partitions across a worker pool
+    hyperliquid  info type=portfolio (accountValueHistory + pnlHistory), merged
+                 across the day / week / month / allTime periods
+
+Every fetched partition is checkpointed under store/backfill/<id>/, so an
+interrupted run resumes where it stopped. Returns are PnL over the previous
+equity, so transfers do not move NAV. The reconstructed curve is chained
+backwards from the first live point (existing points keep their values) and the
+whole history is written in one pass.
+
+    python backfill.py --strategy sentquant --since 2025-06-01
+    python backfill.py --strategy edgehedge --venue lighter --account 12345 --since 2025-01-01
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+import history_store
+import time_index
+from strategies import get_strategy, load_updater
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+CHECKPOINT_DIR = STORE_DIR / "backfill"
+RESOLUTION = '1h'
+STEP = 3600
+PARTITION_SECONDS = 30 * 86400     # 720 hourly rows, under Lighter's 1000-row page
+DEFAULT_WORKERS = 8
+RETRIES = 4
+
+# ========== STRATEGY ==========
+
+def resolve_strategy(strategy_id, venue=None, account=None):
+    """Registry entry (or an ad-hoc one for unregistered ids) plus its account and API URL"""
+    try:
+        strategy = dict(get_strategy(strategy_id))
+        module = load_updater(strategy)
+        account = account or getattr(module, strategy['account_attr'])
+    except KeyError:
+        if not venue or not account:
+            raise SystemExit(f"❌ {strategy_id} is not registered: pass --venue and --account")
+        lighter = venue == 'lighter'
+        strategy = {'id': strategy_id, 'venue': venue,
+                    'module': 'daily_update' if lighter else 'daily_update_hyperliquid',
+                    'tvl_key': 'collateral' if lighter else 'tvl',
+                    'pnl_metric': 'total_pnl' if lighter else 'unrealized_pnl',
+                    'nav_decimals': 2 if lighter else None}
+        module = load_updater(strategy)
+    api = module.BASE_URL if strategy['venue'] == 'lighter' else module.API_URL
+    return strategy, module, account, api
+
+# ========== FETCHING ==========
+
+def with_retries(fetch):
+    """Call fetch(), backing off on 429 / 5xx / network errors"""
+    for attempt in range(RETRIES):
+        try:
+            return fetch()
+        except requests.RequestException as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            if attempt == RETRIES - 1 or (status is not None and status < 500 and status != 429):
+                raise
+            time.sleep(2 ** attempt)
+
+
+def lighter_partition(api, account, start, end):
+    """[(ts, cumulative pnl, cumulative net inflow)] for one time partition"""
+    def fetch():
+        response = requests.get(f"{api}/pnl", params={
+            'by': 'index', 'value': account, 'resolution': RESOLUTION,
+            'start_timestamp': start, 'end_timestamp': end,
+            'count_back': (end - start) // STEP + 1,
+        }, timeout=20)
+        response.raise_for_status()
+        return response.json().get('pnl', [])
+    return [(int(r['timestamp']), float(r.get('trade_pnl', 0)),
+             float(r.get('inflow', 0)) - float(r.get('outflow', 0)))
+            for r in with_retries(fetch) if start <= int(r['timestamp']) < end]
+
+
+def hyperliquid_portfolio(api, wallet):
+    """[(ts, equity, cumulative pnl)] at the finest step available for each time"""
+    def fetch():
+        response = requests.post(api, json={'type': 'portfolio', 'user': wallet}, timeout=20)
+        response.raise_for_status()
+        return response.json()
+    merged = {}
+    for period, data in with_retries(fetch):
+        if period.startswith('perp'):
+            continue  # Perp-only duplicates of the same periods
+        pnl = {t: float(v) for t, v in data.get('pnlHistory', [])}
+        for t, value in data.get('accountValueHistory', []):
+            if t in pnl:
+                merged[t // 1000] = (float(value), pnl[t])
+    return [(t, equity, pnl) for t, (equity, pnl) in sorted(merged.items())]
+
+
+def partitions(since, until, span=PARTITION_SECONDS):
+    starts = range(since - since % STEP, until, span)
+    return [(start, min(start + span, until)) for start in starts]
+
+
+def fetch_checkpointed(checkpoint_dir, jobs, workers):
+    """
+    Run {name: fetch()} jobs across a thread pool; each result is saved as
+    <name>.json as soon as it arrives and reused on the next run.
+    """
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    results, pending = {}, {}
+    for name, fetch in jobs.items():
+        path = checkpoint_dir / f"{name}.json"
+        if path.exists():
+            with open(path, 'r') as f:
+                results[name] = json.load(f)
+        else:
+            pending[name] = fetch
+    if results:
+        print(f"♻️  Resuming: {len(results)}/{len(jobs)} partitions already fetched")
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch): name for name, fetch in pending.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"❌ {name}: {e}")
+                continue
+            history_store.write_json_atomic(checkpoint_dir / f"{name}.json", rows, indent=None)
+            results[name] = rows
+            print(f"   [{done}/{len(pending)}] {name}: {len(rows)} rows")
+    if failures:
+        raise SystemExit(f"❌ {failures} partitions failed; run again to resume")
+    return results
+
+
+def lighter_samples(strategy, module, account, api, since, until, workers, checkpoint_dir):
+    """
+    [(ts, equity, cumulative pnl)] for since <= ts < until. Equity is anchored on
+    the account's current TVL, so rows are fetched up to now even when `until`
+    is in the past: PnL and transfers after `until` still separate the two.
+    """
+    now = int(time.time())
+    jobs = {f"lighter-{start}-{end}": (lambda s=start, e=end: lighter_partition(api, account, s, e))
+            for start, end in partitions(since, max(until, now))}
+    rows = sorted({r[0]: r for rows in fetch_checkpointed(checkpoint_dir, jobs, workers).values()
+                   for r in rows}.values())
+    if not rows:
+        return []
+    metrics = module.calculate_metrics(module.fetch_account_data(account))
+    if not metrics:
+        raise SystemExit("❌ Could not read the current account value to anchor the history")
+    # Equity at t = current equity minus PnL and net transfers since t
+    _, last_pnl, last_flow = rows[-1]
+    anchor = metrics['tvl']
+    return [(ts, anchor - (last_pnl - pnl) - (last_flow - flow), pnl) for ts, pnl, flow in rows if ts < until]
+
+
+def hyperliquid_samples(strategy, module, account, api, since, until, workers, checkpoint_dir):
+    jobs = {'hyperliquid-portfolio': lambda: hyperliquid_portfolio(api, account)}
+    rows = fetch_checkpointed(checkpoint_dir, jobs, workers)['hyperliquid-portfolio']
+    return [tuple(r) for r in rows if since <= r[0] < until]
+
+# ========== NAV RECONSTRUCTION ==========
+
+def build_points(strategy, samples, live_data):
+    """NAV points for samples before the first live point, chained backwards from it"""
+    first_live = history_store.point_epoch(live_data[0]) if live_data else None
+    samples = [s for s in samples if first_live is None or s[0] < first_live]
+    if len(samples) < 2:
+        return []
+
+    returns = [0.0]
+    for (_, prev_equity, prev_pnl), (_, _, pnl) in zip(samples, samples[1:]):
+        returns.append((pnl - prev_pnl) / prev_equity if prev_equity > 0 else 0.0)
+
+    navs = [0.0] * len(samples)
+    if live_data:
+        # Step from the last sample to the first live point: equity change up to its TVL
+        last_equity = samples[-1][1]
+        live_tvl = live_data[0].get(strategy.get('tvl_key', 'tvl'))
+        link = (live_tvl - last_equity) / last_equity if live_tvl is not None and last_equity > 0 else 0.0
+        navs[-1] = live_data[0]['value'] / (1 + link)
+        for i in range(len(samples) - 1, 0, -1):
+            navs[i - 1] = navs[i] / (1 + returns[i])
+    else:
+        navs[0] = history_store.START_NAV
+        for i in range(1, len(samples)):
+            navs[i] = navs[i - 1] * (1 + returns[i])
+
+    decimals = strategy.get('nav_decimals')
+    points = []
+    for (ts, equity, pnl), nav in zip(samples, navs):
+        when = datetime.fromtimestamp(ts, timezone.utc)
+        point = {
+            "date": when.date().isoformat(),
+            "timestamp": when.strftime("%Y-%m-%d %H:%M:%S"),
+            "year": when.year,
+            "value": round(nav, decimals) if decimals is not None else nav,
+            strategy.get('tvl_key', 'tvl'): equity,
+        }
+        if strategy.get('pnl_metric'):
+            point["pnl"] = pnl
+        point["drawdown"] = 0
+        point["backfill"] = True
+        points.append(point)
+    return points
+
+
+def write_history(strategy, points, output_dir=None):
+    """Prepend backfilled points, recompute drawdown in one pass and write once"""
+    strategy_id = strategy['id']
+    all_data = history_store.load_history(strategy_id, output_dir)
+    strategy_data = all_data.setdefault(strategy_id, {"liveData": [], "tvl": 0, "status": "Offline"})
+    live_data = [p for p in strategy_data.get('liveData', []) if not p.get('backfill')]
+    merged = points + live_data
+
+    peak = None
+    for point in merged:
+        peak = point['value'] if peak is None else max(peak, point['value'])
+        point['drawdown'] = ((point['value'] - peak) / peak) * 100 if peak > 0 else 0
+    strategy_data['liveData'] = merged
+    history_store.write_json_atomic(history_store.live_data_path(strategy_id, output_dir), all_data)
+    time_index.save_index(strategy_id, time_index.TimeIndex.from_points(merged),
+                          time_index.index_root(output_dir))
+
+    # Daily closes of backfilled dates equity-historical-<id>.json does not have yet;
+    # existing rows (backtests, per-poll rows) are never dropped or rewritten
+    historical_path = history_store.live_data_path(strategy_id, output_dir).with_name(
+        f"equity-historical-{strategy_id}.json")
+    if historical_path.exists():
+        with open(historical_path, 'r') as f:
+            rows = json.load(f)
+        known = {row['date'] for row in rows}
+        closes = {}
+        for point in points:
+            if point['date'] not in known:
+                closes[point['date']] = point
+        if closes:
+            added = [{"date": p['date'], "year": p['year'], "value": p['value'], "drawdown": p['drawdown']}
+                     for p in closes.values()]
+            # Stable merge by date: new rows go before the first existing row dated after them
+            merged_rows, i = [], 0
+            for row in rows:
+                while i < len(added) and added[i]['date'] < row['date']:
+                    merged_rows.append(added[i])
+                    i += 1
+                merged_rows.append(row)
+            merged_rows.extend(added[i:])
+            history_store.write_json_atomic(historical_path, merged_rows)
+    return merged
+
+
+def main():
+    """Backfill one strategy"""
+    parser = argparse.ArgumentParser(description="Reconstruct historical NAV from venue history endpoints")
+    parser.add_argument('--strategy', required=True, help="strategy id")
+    parser.add_argument('--venue', choices=['lighter', 'hyperliquid'], help="for unregistered strategies")
+    parser.add_argument('--account', help="account index / wallet for unregistered strategies")
+    parser.add_argument('--since', required=True, help="UTC date to start from")
+    parser.add_argument('--until', help="UTC date to stop at (default: now)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--restart', action='store_true', help="discard checkpoints of a previous run")
+    parser.add_argument('--keep-checkpoints', action='store_true')
+    parser.add_argument('--dry-run', action='store_true', help="fetch and report, do not write")
+    parser.add_argument('--output-dir', help="live-data directory (default: public/data)")
+    args = parser.parse_args()
+
+    strategy, module, account, api = resolve_strategy(args.strategy, args.venue, args.account)
+    to_epoch = lambda value: int(datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp())
+    since = to_epoch(args.since)
+    until = to_epoch(args.until) if args.until else int(time.time())
+    checkpoint_dir = CHECKPOINT_DIR / strategy['id']
+    if args.restart and checkpoint_dir.exists():
+        shutil.rmtree(checkpoint_dir)
+
+    print("="*70)
+    print(f"⏪ BACKFILL {strategy['id']} ({strategy['venue']} {account})")
+    print("="*70)
+    started = time.time()
+    fetch = lighter_samples if strategy['venue'] == 'lighter' else hyperliquid_samples
+    samples = fetch(strategy, module, account, api, since, until, args.workers, checkpoint_dir)
+
+    live_data = [p for p in history_store.load_history(strategy['id'], args.output_dir)
+                 .get(strategy['id'], {}).get('liveData', []) if not p.get('backfill')]
+    points = build_points(strategy, samples, live_data)
+    print(f"📈 {len(samples)} samples -> {len(points)} points before the first live point")
+    if points:
+        print(f"   {points[0]['timestamp']} NAV {points[0]['value']:.2f}  ->  "
+              f"{points[-1]['timestamp']} NAV {points[-1]['value']:.2f}")
+
+    if args.dry_run or not points:
+        return 0
+    merged = write_history(strategy, points, args.output_dir)
+    if not args.keep_checkpoints:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    print(f"💾 Wrote {len(merged)} points in {time.time() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+SENTQUANT CLI
+Single entry point for the pipeline. Only argparse and the strategy registry
+load at start; venue updaters (requests, solders via drift_reader) and
+analytics (NumPy) are imported inside the subcommand that needs them, so a
+Lighter-only collect never pays for Solana or NumPy.
+
+    python cli.py collect --venue lighter
+    python cli.py collect --strategy systemicls --strategy systemic_hyper
+    python cli.py collect --daemon -- --interval 60 --summary
+    python cli.py publish
+    python cli.py rank [--inject]
+    python cli.py backfill -- --strategy sentquant --since 2025-06-01
+    python cli.py compact
+    python cli.py migrate -- --strategy sentquant --rewrite
+    python cli.py rebuild [-- --apply]
+    python cli.py startup-check        # cold start vs STARTUP_BUDGET_MS
+"""
+
+import argparse
+import importlib
+import sys
+import time
+
+from strategies import STRATEGIES, get_strategy, load_updater
+
+# ========== CONFIG ==========
+STARTUP_BUDGET_MS = 150        # Wall time of `cli.py --help` in a fresh interpreter
+STARTUP_RUNS = 5
+# Modules a bare start must not import
+HEAVY_MODULES = ('numpy', 'requests', 'solders', 'solana')
+
+# ========== HELPERS ==========
+
+def run_main(module_name, argv):
+    """Import a script lazily and run its main() with argv as its command line"""
+    module = importlib.import_module(module_name)
+    saved = sys.argv
+    sys.argv = [f"{module_name}.py", *argv]
+    try:
+        return module.main() or 0
+    finally:
+        sys.argv = saved
+
+
+def passthrough(args):
+    """Arguments after `--` belong to the wrapped script"""
+    rest = list(args.rest)
+    return rest[1:] if rest[:1] == ['--'] else rest
+
+# ========== COMMANDS ==========
+
+def cmd_collect(args):
+    """One poll per selected strategy through its updater (or the resident daemon)"""
+    if args.daemon:
+        extra = [flag for sid in args.strategy or [] for flag in ('--strategy', sid)]
+        return run_main('collector_daemon', extra + passthrough(args))
+    strategies = [get_strategy(s) for s in args.strategy] if args.strategy else [
+        s for s in STRATEGIES if not args.venue or s['venue'] in args.venue]
+    if not strategies:
+        print("⚠️ No strategies selected")
+        return 1
+    failed = []
+    for strategy in strategies:
+        started = time.time()
+        try:
+            status = load_updater(strategy).main()
+        except SystemExit as e:
+            status = e.code
+        except Exception as e:
+            print(f"❌ {strategy['id']}: {e}")
+            status = 1
+        if status:
+            failed.append(strategy['id'])
+        print(f"⏱️  {strategy['id']}: {time.time() - started:.1f}s")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+def cmd_publish(args):
+    """Rewrite the landing-page summary from the live-data files"""
+    from arena_summary import write_summary
+    path, summary = write_summary(args.output_dir, args.points)
+    print(f"💾 {path} ({len(summary['strategies'])} strategies)")
+    return 0
+
+
+def cmd_rank(args):
+    """SRS report, optionally injected into App.jsx"""
+    import srs_real
+    raw_results = srs_real.load_raw_results()
+    srs_real.print_report(srs_real.score_results(raw_results))
+    if args.inject:
+        srs_real.inject_app_jsx(raw_results)
+    return 0
+
+
+def cmd_backfill(args):
+    return run_main('backfill', passthrough(args))
+
+
+def cmd_compact(args):
+    """Merge position-store chunks"""
+    import position_store
+    saved = position_store.compact()
+    print(f"✅ Compaction saved {saved} bytes")
+    return 0
+
+
+def cmd_migrate(args):
+    return run_main('history_stream', passthrough(args))
+
+
+def cmd_rebuild(args):
+    return run_main('rebuild', passthrough(args))
+
+
+def imported_modules(argv):
+    """Top-level module names a fresh `cli.py argv` imports (from -X importtime)"""
+    import subprocess
+    result = subprocess.run([sys.executable, '-X', 'importtime', __file__, *argv],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return {line.rsplit('|', 1)[-1].strip().split('.')[0]
+            for line in result.stderr.splitlines() if line.startswith('import time:')}
+
+
+def cmd_startup_check(args):
+    """Fail if a cold `cli.py --help` exceeds the budget or imports heavy modules"""
+    import subprocess
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, __file__, '--help'], check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    median = sorted(timings)[len(timings) // 2]
+    heavy = sorted(imported_modules(['--help']) & set(HEAVY_MODULES))
+    ok = median <= args.budget and not heavy
+    print(f"{'✅' if ok else '❌'} cold start {median:.0f} ms (budget {args.budget:.0f} ms, interpreter included), "
+          f"heavy imports: {', '.join(heavy) or 'none'}")
+    return 0 if ok else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Sentquant pipeline")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    collect = commands.add_parser('collect', help="poll strategies once (or run the daemon)")
+    collect.add_argument('--strategy', action='append', help="strategy id (repeatable)")
+    collect.add_argument('--venue', action='append', help="lighter / hyperliquid / drift (repeatable)")
+    collect.add_argument('--daemon', action='store_true', help="run collector_daemon with the arguments after --")
+    collect.add_argument('rest', nargs=argparse.REMAINDER)
+    collect.set_defaults(handler=cmd_collect)
+
+    publish = commands.add_parser('publish', help="write arena-summary.json")
+    publish.add_argument('--output-dir', help="live-data directory (default: public/data)")
+    publish.add_argument('--points', type=int, default=64, help="sparkline length")
+    publish.set_defaults(handler=cmd_publish)
+
+    rank = commands.add_parser('rank', help="SRS ranking report")
+    rank.add_argument('--inject', action='store_true', help="write the scores into src/App.jsx")
+    rank.set_defaults(handler=cmd_rank)
+
+    backfill = commands.add_parser('backfill', help="backfill.py with the arguments after --")
+    backfill.add_argument('rest', nargs=argparse.REMAINDER)
+    backfill.set_defaults(handler=cmd_backfill)
+
+    compact = commands.add_parser('compact', help="compact the position store")
+    compact.set_defaults(handler=cmd_compact)
+
+    migrate = commands.add_parser('migrate', help="history_stream.py with the arguments after --")
+    migrate.add_argument('rest', nargs=argparse.REMAINDER)
+    migrate.set_defaults(handler=cmd_migrate)
+
+    rebuild = commands.add_parser('rebuild', help="rebuild.py with the arguments after --")
+    rebuild.add_argument('rest', nargs=argparse.REMAINDER)
+    rebuild.set_defaults(handler=cmd_rebuild)
+
+    check = commands.add_parser('startup-check', help="measure cold start against the budget")
+    check.add_argument('--budget', type=float, default=STARTUP_BUDGET_MS, help="milliseconds")
+    check.add_argument('--runs', type=int, default=STARTUP_RUNS)
+    check.set_defaults(handler=cmd_startup_check)
+    return parser
+
+
+def main():
+    """Dispatch a subcommand"""
+    parser = build_parser()
+    args, unknown = parser.parse_known_args()
+    if unknown:
+        if not hasattr(args, 'rest'):
+            parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+        args.rest = unknown + passthrough(args)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+COLLECTOR DAEMON
+Resident asyncio collector: polls every configured Lighter and Hyperliquid
+account on a fixed cadence (with jitter and per-venue concurrency limits),
+buffers samples in memory and flushes them as batched appends.
+
+    python collector_daemon.py --interval 60 --flush-interval 300
+    python collector_daemon.py --push-port 8766     # also serve SSE updates
+    python collector_daemon.py --alerts             # alert on drawdown / TVL drop / offline / stale
+    python collector_daemon.py --adaptive --budget hyperliquid=600   # per-strategy intervals (scheduler.py)
+"""
+
+import argparse
+import asyncio
+import random
+import signal
+import time
+from datetime import datetime
+
+import history_store
+import hyperliquid_ledger
+import lookup_cache
+import position_store
+import raw_archive
+from strategies import STRATEGIES, get_strategy, load_updater
+
+# ========== CONFIG ==========
+DEFAULT_INTERVAL = 60          # Seconds between polls of one strategy
+DEFAULT_JITTER = 5             # Max random delay added to each poll
+DEFAULT_FLUSH_INTERVAL = 300   # Seconds between batched writes
+DEFAULT_CONCURRENCY = {'lighter': 4, 'hyperliquid': 4}
+POLLED_VENUES = ('lighter', 'hyperliquid')
+
+# ========== DAEMON ==========
+
+class CollectorDaemon:
+    """Pollers fill per-strategy buffers; the flusher drains them in batches"""
+
+    def __init__(self, strategies, interval=DEFAULT_INTERVAL, jitter=DEFAULT_JITTER,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, concurrency=None,
+                 capture_positions=False, output_dir=None, ledger=False, archive_raw=False, scheduler=None):
+        self.strategies = strategies
+        self.interval = interval
+        self.jitter = jitter
+        self.flush_interval = flush_interval
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.capture_positions = capture_positions
+        self.output_dir = output_dir
+        self.ledger = ledger  # Net Hyperliquid NAV of deposits / withdrawals
+        self.archive_raw = archive_raw  # Raw venue payloads into raw_archive
+        self.scheduler = scheduler  # AdaptiveScheduler; None = every strategy at `interval`
+        self.lookups = None  # LookupCache for Lighter market symbols, opened on first use
+        self.ledgers = {}  # LedgerStore per wallet, kept so flows are read incrementally
+        self.buffers = {s['id']: [] for s in strategies}
+        self.listeners = []  # Called as listener(strategy, new_points) after each flush
+        self.housekeeping = []  # Called with no arguments after every flush, even an empty one
+        self.status = {}  # Last polled status per strategy
+        self.stats = {'polls': 0, 'failures': 0, 'flushed': 0}
+        self.stop_event = None
+        self.semaphores = {}
+
+    def interval_for(self, strategy):
+        """Seconds until the next poll of a strategy"""
+        if self.scheduler:
+            return self.scheduler.interval_for(strategy['id'])
+        return self.interval
+
+    async def poll_once(self, strategy, module):
+        """Fetch one account snapshot and buffer the derived sample"""
+        account_id = getattr(module, strategy['account_attr'])
+        async with self.semaphores[strategy['venue']]:
+            account = await asyncio.to_thread(module.fetch_account_data, account_id)
+            if account and self.uses_ledger(strategy):
+                since_ms = int((time.time() - 86400) * 1000)
+                await asyncio.to_thread(hyperliquid_ledger.sync_wallet, account_id, module.API_URL,
+                                        since_ms=since_ms, fills=False)
+        self.stats['polls'] += 1
+        metrics = module.calculate_metrics(account) if account else None
+        if not metrics:
+            self.stats['failures'] += 1
+            return None
+        now = datetime.now()
+        self.buffers[strategy['id']].append((now, metrics, account))
+        self.status[strategy['id']] = metrics.get('status')
+        if self.scheduler:
+            flows_between = self.ledger_store(account_id).flows_between \
+                if self.uses_ledger(strategy) else None
+            self.scheduler.observe(strategy['id'], now, metrics, flows_between)
+        return metrics
+
+    async def poller(self, strategy):
+        """Poll one strategy until shutdown"""
+        module = load_updater(strategy)
+        # Spread the first polls so all strategies do not fire at once
+        delay = random.uniform(0, min(self.interval_for(strategy), self.jitter or 1))
+        while not self.stop_event.is_set():
+            if await self.sleep(delay):
+                break
+            started = time.monotonic()
+            try:
+                await self.poll_once(strategy, module)
+            except Exception as e:
+                self.stats['failures'] += 1
+                print(f"❌ {strategy['id']}: poll failed: {e}")
+            elapsed = time.monotonic() - started
+            delay = max(0.0, self.interval_for(strategy) - elapsed) + random.uniform(0, self.jitter)
+
+    async def sleep(self, seconds):
+        """Sleep unless shutdown is requested first. True = stopping"""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def drain(self):
+        """Swap out all buffers"""
+        drained = {}
+        for strategy_id, samples in self.buffers.items():
+            if samples:
+                drained[strategy_id] = samples
+                self.buffers[strategy_id] = []
+        return drained
+
+    def uses_ledger(self, strategy):
+        return self.ledger and strategy['venue'] == 'hyperliquid'
+
+    def ledger_store(self, wallet):
+        if wallet not in self.ledgers:
+            self.ledgers[wallet] = hyperliquid_ledger.LedgerStore(wallet)
+        return self.ledgers[wallet]
+
+    def write_batch(self, strategy, samples):
+        """Blocking part of a flush (runs in a worker thread)"""
+        flows_between = None
+        if self.uses_ledger(strategy):
+            wallet = getattr(load_updater(strategy), strategy['account_attr'])
+            flows_between = self.ledger_store(wallet).flows_between
+        new_points = history_store.append_points(
+            strategy, [(when, metrics) for when, metrics, _ in samples], self.output_dir, flows_between)
+        # The points are written: from here on a failure must not re-buffer the
+        # samples (append_points would chain them twice), so captures are best-effort
+        if self.capture_positions:
+            try:
+                self.write_positions(strategy, samples)
+            except Exception as e:
+                print(f"⚠️  {strategy['id']}: could not capture positions: {e}")
+        if self.archive_raw:
+            try:
+                kind = raw_archive.VENUE_KINDS[strategy['venue']]
+                raw_archive.append_snapshots(strategy['id'], [(when, kind, account) for when, _, account in samples])
+            except Exception as e:
+                print(f"⚠️  {strategy['id']}: could not archive raw snapshots: {e}")
+        return new_points
+
+    def write_positions(self, strategy, samples):
+        for when, _, account in samples:
+            if strategy['venue'] == 'lighter':
+                self.lookups = self.lookups or lookup_cache.LookupCache()
+                base_url = load_updater(strategy).BASE_URL
+                rows = position_store.lighter_position_rows(
+                    account, lookup_cache.lighter_symbols_for(account, base_url, self.lookups))
+            else:
+                rows = position_store.hyperliquid_position_rows(account)
+            position_store.append_positions(strategy['id'], when, rows)
+
+    async def flush(self):
+        """Write every buffered sample, one batched append per strategy"""
+        for strategy_id, samples in self.drain().items():
+            strategy = get_strategy(strategy_id)
+            try:
+                new_points = await asyncio.to_thread(self.write_batch, strategy, samples)
+            except Exception as e:
+                print(f"❌ {strategy_id}: flush failed, re-buffering {len(samples)} samples: {e}")
+                self.buffers[strategy_id] = samples + self.buffers[strategy_id]
+                continue
+            self.stats['flushed'] += len(new_points)
+            last = new_points[-1]
+            print(f"💾 {strategy_id}: +{len(new_points)} points  NAV {last['value']:.2f}  "
+                  f"DD {last['drawdown']:.2f}%")
+            for listener in self.listeners:
+                try:
+                    listener(strategy, new_points)
+                except Exception as e:
+                    print(f"⚠️  Listener failed for {strategy_id}: {e}")
+
+    async def flusher(self):
+        """Flush on an interval until shutdown"""
+        while not await self.sleep(self.flush_interval):
+            await self.flush()
+            for task in self.housekeeping:
+                try:
+                    task()
+                except Exception as e:
+                    print(f"⚠️  Housekeeping failed: {e}")
+
+    async def run(self):
+        """Start pollers and flusher; on shutdown, flush what is left"""
+        self.stop_event = asyncio.Event()
+        self.semaphores = {venue: asyncio.Semaphore(limit) for venue, limit in self.concurrency.items()}
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not available on this platform / thread
+
+        tasks = [asyncio.create_task(self.poller(s)) for s in self.strategies]
+        tasks.append(asyncio.create_task(self.flusher()))
+        await self.stop_event.wait()
+
+        print("\n🛑 Shutting down, flushing buffers...")
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.flush()
+
+    def stop(self):
+        if self.stop_event is not None:
+            self.stop_event.set()
+
+
+def parse_concurrency(values):
+    """['lighter=8', 'hyperliquid=4'] -> {'lighter': 8, 'hyperliquid': 4}"""
+    limits = {}
+    for value in values or []:
+        venue, _, limit = value.partition('=')
+        limits[venue] = int(limit)
+    return limits
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Resident asyncio NAV collector")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    parser.add_argument('--jitter', type=float, default=DEFAULT_JITTER, help="max random extra delay")
+    parser.add_argument('--flush-interval', type=float, default=DEFAULT_FLUSH_INTERVAL)
+    parser.add_argument('--concurrency', action='append', metavar='VENUE=N', help="per-venue request limit")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all)")
+    parser.add_argument('--positions', action='store_true', help="also capture per-position snapshots")
+    parser.add_argument('--raw', action='store_true', help="archive every raw venue payload")
+    parser.add_argument('--ledger', action='store_true', help="net Hyperliquid NAV of deposits / withdrawals")
+    parser.add_argument('--output-dir', help="write live-data files here instead of public/data")
+    parser.add_argument('--push-port', type=int, help="serve new points / ranking changes as SSE on this port")
+    parser.add_argument('--push-host', default='127.0.0.1')
+    parser.add_argument('--analytics', action='store_true',
+                        help="keep portfolio correlation / composite NAVs updated after each flush")
+    parser.add_argument('--summary', action='store_true', help="rewrite arena-summary.json after each flush")
+    parser.add_argument('--alerts', action='store_true',
+                        help="evaluate alert rules on every flushed point and check for stale data")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="interval per strategy from volatility, exposure and status (ignores --interval)")
+    parser.add_argument('--budget', action='append', metavar='VENUE=N', help="adaptive: requests per hour per venue")
+    parser.add_argument('--min-interval', type=float, help="adaptive: fastest poll in seconds")
+    parser.add_argument('--max-interval', type=float, help="adaptive: slowest poll in seconds")
+    args = parser.parse_args()
+
+    if args.strategy:
+        strategies = [get_strategy(s) for s in args.strategy]
+    else:
+        strategies = [s for s in STRATEGIES if s['venue'] in POLLED_VENUES]
+
+    scheduler = None
+    if args.adaptive:
+        import scheduler as adaptive
+        # A poll with a ledger sync costs two Hyperliquid requests
+        costs = {s['id']: 2 for s in strategies if args.ledger and s['venue'] == 'hyperliquid'}
+        scheduler = adaptive.AdaptiveScheduler(
+            strategies, adaptive.parse_budgets(args.budget),
+            min_interval=args.min_interval or adaptive.MIN_INTERVAL,
+            max_interval=args.max_interval or adaptive.MAX_INTERVAL, costs=costs)
+        scheduler.seed(args.output_dir)
+
+    daemon = CollectorDaemon(
+        strategies,
+        interval=args.interval,
+        jitter=args.jitter,
+        flush_interval=args.flush_interval,
+        concurrency=parse_concurrency(args.concurrency),
+        capture_positions=args.positions,
+        output_dir=args.output_dir,
+        ledger=args.ledger,
+        archive_raw=args.raw,
+        scheduler=scheduler,
+    )
+
+    if args.analytics:
+        from portfolio_analytics import PortfolioListener
+        daemon.listeners.append(PortfolioListener(args.output_dir).on_points)
+
+    if args.summary:
+        from arena_summary import write_summary
+        daemon.listeners.append(lambda strategy, new_points: write_summary(args.output_dir))
+
+    if args.alerts:
+        from alerts import AlertEngine
+        alert_engine = AlertEngine(output_dir=args.output_dir)
+        daemon.listeners.append(lambda strategy, new_points: alert_engine.on_points(
+            strategy, new_points, daemon.status.get(strategy['id'])))
+        daemon.housekeeping.append(lambda: alert_engine.check_stale(strategies))
+
+    push_server = None
+    if args.push_port:
+        from push_server import start_push_server
+        push_server, hub = start_push_server(args.push_host, args.push_port, args.output_dir)
+        daemon.listeners.append(hub.on_points)
+
+    print("="*70)
+    print("🛰️  COLLECTOR DAEMON")
+    print("="*70)
+    print(f"Strategies:  {', '.join(s['id'] for s in strategies)}")
+    if scheduler:
+        print(f"Cadence:     adaptive {scheduler.min_interval:.0f}-{scheduler.max_interval:.0f}s, "
+              f"budget {scheduler.budgets} requests/h (+≤{args.jitter:.0f}s jitter)")
+    else:
+        print(f"Cadence:     every {args.interval:.0f}s (+≤{args.jitter:.0f}s jitter)")
+    print(f"Flush:       every {args.flush_interval:.0f}s")
+    print(f"Concurrency: {daemon.concurrency}")
+    if push_server:
+        print(f"Push:        http://{args.push_host}:{args.push_port}/events")
+    print()
+
+    started = time.time()
+    asyncio.run(daemon.run())
+    if push_server:
+        push_server.broadcaster.close()
+        push_server.shutdown()
+
+    print()
+    print("="*70)
+    print(f"✅ Stopped after {time.time() - started:.0f}s: {daemon.stats['polls']} polls, "
+          f"{daemon.stats['failures']} failures, {daemon.stats['flushed']} points written")
+    print("="*70)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
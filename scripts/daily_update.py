@@ -10,9 +10,15 @@ import os
 from datetime import datetime, date
 from pathlib import Path
 
+from alerts import observe
+from lookup_cache import lighter_symbols_for
+from position_store import capture_positions, lighter_position_rows
+from raw_archive import capture_snapshot
+from time_index import index_root, update_index
+
 # ========== CONFIG ==========
 ACCOUNT_INDEX = int(os.getenv('ACCOUNT_INDEX', '505549'))
-BASE_URL = "https://mainnet.zklighter.elliot.ai/api/v1"
+BASE_URL = os.getenv('LIGHTER_BASE_URL', "https://mainnet.zklighter.elliot.ai/api/v1")
 START_NAV = 1000  # Starting NAV for tracking
 
 # Paths (adjust based on where script runs)
@@ -127,9 +133,10 @@ def calculate_drawdown(nav_history):
     return drawdown
 
 
-def update_live_data(metrics):
+def update_live_data(metrics, now=None):
     """Update live-data.json with new data point"""
-    today = date.today().isoformat()
+    now = now or datetime.now()
+    today = now.date().isoformat()
     
     # Load previous data
     live_data_path = OUTPUT_DIR / "live-data-sentquant.json"
@@ -160,7 +167,6 @@ def update_live_data(metrics):
     new_nav = calculate_nav(previous_nav, previous_collateral, current_collateral)
     
    # Create new data point with timestamp
-    now = datetime.now()
     new_point = {
         "date": today,
         "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
@@ -190,6 +196,10 @@ def update_live_data(metrics):
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     with open(live_data_path, 'w') as f:
         json.dump(all_data, f, indent=2)
+    try:
+        update_index("sentquant", live_data, 1, index_root(OUTPUT_DIR))
+    except Exception as e:
+        print(f"⚠️  Could not update time index for sentquant: {e}")
     
     print(f"✅ Updated live-data-sentquant.json")
     print(f"   Date: {today}")
@@ -242,7 +252,11 @@ def main():
     
     # Update live data
     print("💾 Updating live-data-sentquant.json...")
-    new_point = update_live_data(metrics)
+    now = datetime.now()
+    new_point = update_live_data(metrics, now=now)
+    observe("sentquant", new_point, metrics['status'])
+    capture_positions("sentquant", now, lighter_position_rows(account, lighter_symbols_for(account, BASE_URL)))
+    capture_snapshot("sentquant", now, 'lighter.account', account)
     
     print()
     print("="*70)
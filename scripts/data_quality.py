@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+DATA QUALITY
+Batch sweep of every strategy's liveData in one vectorized pass over a padded
+(strategies x points) matrix. Each point gets a flag byte:
+
+    SPIKE         return far outside the trailing median +/- k * MAD
+    DUPLICATE     timestamp already seen earlier in the file
+    OUT_OF_ORDER  timestamp out of sequence with its neighbours
+    BAD_TVL       zero, negative or missing TVL
+    BAD_VALUE     zero, negative or missing NAV
+
+Writes a compact report and, with --masks, one flag file per strategy
+(store/quality/<id>.qmask, aligned with liveData offsets) that downstream
+metrics can load with load_mask() / keep_mask(); clean_series() applies it
+(portfolio_analytics drops flagged points before building its grid).
+
+    python data_quality.py
+    python data_quality.py --masks --window 48 --threshold 8
+"""
+
+import argparse
+import os
+import struct
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import history_store
+from nav_model import NavSeries
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+QUALITY_DIR = STORE_DIR / "quality"
+DEFAULT_WINDOW = 48            # Trailing returns used for the median / MAD
+DEFAULT_THRESHOLD = 8.0        # Spike = |r - median| > threshold * 1.4826 * MAD
+MIN_SPIKE = 0.02               # ...and |r - median| above this (flat series have MAD ~ 0)
+BLOCK = 4096                   # Points per sliding-window block (bounds memory)
+MAX_LISTED = 20                # Flagged points listed per strategy in the report
+
+SPIKE, DUPLICATE, OUT_OF_ORDER, BAD_TVL, BAD_VALUE = 1, 2, 4, 8, 16
+FLAG_NAMES = {SPIKE: 'spike', DUPLICATE: 'duplicate', OUT_OF_ORDER: 'out_of_order',
+              BAD_TVL: 'bad_tvl', BAD_VALUE: 'bad_value'}
+
+MAGIC = b'QMK1'
+HEADER = struct.Struct('<4sI')  # magic, point count
+
+# ========== LOADING ==========
+
+def load_matrix(output_dir=None, strategy_ids=None):
+    """Pad every history into (N, L) arrays: epochs, values, tvls (NaN past each length)"""
+    directory = history_store.live_data_path('x', output_dir).parent
+    if strategy_ids is None:
+        strategy_ids = sorted(p.name[len('live-data-'):-len('.json')] for p in directory.glob('live-data-*.json'))
+    histories = {sid: NavSeries.load(sid, output_dir) for sid in strategy_ids}
+    ids = [sid for sid in strategy_ids if len(histories[sid])]
+    length = max((len(histories[sid]) for sid in ids), default=0)
+    epochs, values, tvls = (np.full((len(ids), length), np.nan) for _ in range(3))
+    for i, sid in enumerate(ids):
+        series = histories[sid]
+        n = len(series)
+        epochs[i, :n] = series.epoch
+        values[i, :n] = series.value
+        tvls[i, :n] = series.tvl
+    lengths = np.array([len(histories[sid]) for sid in ids], dtype=np.int64)
+    return ids, histories, epochs, values, tvls, lengths
+
+# ========== CHECKS ==========
+
+def trailing_median_mad(returns, window):
+    """Median and MAD of the `window` returns strictly before each point"""
+    n, length = returns.shape
+    padded = np.concatenate([np.full((n, window), np.nan), returns], axis=1)
+    median = np.full_like(returns, np.nan)
+    mad = np.full_like(returns, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-NaN windows at the start
+        for start in range(0, length, BLOCK):
+            stop = min(start + BLOCK, length)
+            windows = sliding_window_view(padded[:, start:stop + window - 1], window, axis=1)
+            block_median = np.nanmedian(windows, axis=2)
+            median[:, start:stop] = block_median
+            mad[:, start:stop] = np.nanmedian(np.abs(windows - block_median[..., None]), axis=2)
+    return median, mad
+
+
+def sweep(epochs, values, tvls, lengths, window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD):
+    """Flag byte per point, shape (N, L); padding stays 0"""
+    n, length = values.shape
+    valid = np.arange(length)[None, :] < lengths[:, None]
+    flags = np.zeros((n, length), dtype=np.uint8)
+
+    bad_value = valid & ~(values > 0)
+    flags[bad_value] |= BAD_VALUE
+    flags[valid & ~(tvls > 0)] |= BAD_TVL
+
+    # Ordering: a misplaced point is either later than everything after it or
+    # earlier than everything before it; flag whichever reading is the minority
+    masked = np.where(valid, epochs, np.nan)
+    previous_max = np.full_like(epochs, -np.inf)
+    next_min = np.full_like(epochs, np.inf)
+    if length > 1:
+        previous_max[:, 1:] = np.fmax.accumulate(masked, axis=1)[:, :-1]
+        next_min[:, :-1] = np.fmin.accumulate(masked[:, ::-1], axis=1)[:, ::-1][:, 1:]
+    late = valid & (epochs < previous_max)
+    early = valid & (epochs > next_min)
+    use_early = early.sum(axis=1) < late.sum(axis=1)
+    flags[np.where(use_early[:, None], early, late)] |= OUT_OF_ORDER
+
+    # Duplicates: equal to some other timestamp, flagging all but the first occurrence
+    order = np.argsort(np.where(valid, epochs, np.inf), axis=1, kind='stable')
+    ordered = np.take_along_axis(epochs, order, axis=1)
+    repeat = np.zeros_like(valid)
+    repeat[:, 1:] = ordered[:, 1:] == ordered[:, :-1]
+    duplicate = np.zeros_like(valid)
+    np.put_along_axis(duplicate, order, repeat, axis=1)
+    flags[valid & duplicate] |= DUPLICATE
+
+    # Return spikes against the trailing median / MAD (in file order)
+    clean = np.where(valid & ~bad_value, values, np.nan)
+    returns = np.full_like(values, np.nan)
+    returns[:, 1:] = clean[:, 1:] / clean[:, :-1] - 1
+    median, mad = trailing_median_mad(returns, window)
+    deviation = np.abs(returns - median)
+    with np.errstate(invalid='ignore'):
+        spike = (deviation > threshold * 1.4826 * mad) & (deviation > MIN_SPIKE)
+    flags[valid & spike] |= SPIKE
+    return flags, returns
+
+
+def flag_names(flag):
+    return [name for bit, name in FLAG_NAMES.items() if flag & bit]
+
+
+def build_report(ids, histories, flags, returns, lengths, window, threshold):
+    report = {
+        'generated': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'window': window,
+        'threshold': threshold,
+        'strategies': {},
+    }
+    for i, sid in enumerate(ids):
+        row = flags[i, :lengths[i]]
+        counts = {name: int(np.count_nonzero(row & bit)) for bit, name in FLAG_NAMES.items()}
+        flagged = np.flatnonzero(row)
+        listed = []
+        for offset in flagged[:MAX_LISTED]:
+            point = histories[sid][int(offset)].to_legacy()
+            r = returns[i, offset]
+            listed.append({
+                'offset': int(offset),
+                'timestamp': point.get('timestamp', point.get('date')),
+                'flags': flag_names(int(row[offset])),
+                'return': None if np.isnan(r) else round(float(r), 6),
+            })
+        report['strategies'][sid] = {
+            'points': int(lengths[i]),
+            'flagged': int(len(flagged)),
+            **counts,
+            'first_flagged': listed,
+        }
+    return report
+
+# ========== MASKS ==========
+
+def mask_path(strategy_id, root=QUALITY_DIR):
+    return Path(root) / f"{strategy_id}.qmask"
+
+
+def save_mask(strategy_id, flags, root=QUALITY_DIR):
+    path = mask_path(strategy_id, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(flags)) + np.asarray(flags, dtype=np.uint8).tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_mask(strategy_id, count=None, root=QUALITY_DIR):
+    """Flag bytes for a strategy, or None if missing or not for `count` points"""
+    try:
+        with open(mask_path(strategy_id, root), 'rb') as f:
+            data = f.read()
+        magic, stored = HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC or (count is not None and stored != count):
+        return None
+    return np.frombuffer(data, dtype=np.uint8, offset=HEADER.size, count=stored)
+
+
+def keep_mask(flags, exclude=SPIKE | DUPLICATE | BAD_TVL | BAD_VALUE):
+    """Boolean array of points to keep"""
+    return (flags & exclude) == 0
+
+
+def clean_series(history, root=QUALITY_DIR):
+    """
+    NavSeries without the points its mask flags. liveData is append-only, so a
+    mask written before newer points still covers its prefix; points past it
+    are kept, and a mask longer than the history is ignored.
+    """
+    flags = load_mask(history.strategy_id, root=root)
+    if flags is None or len(flags) > len(history):
+        return history
+    keep = np.ones(len(history), dtype=bool)
+    keep[:len(flags)] = keep_mask(flags)
+    return history if keep.all() else history[keep]
+
+
+def run(output_dir=None, strategy_ids=None, window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD,
+        masks=False, mask_root=QUALITY_DIR):
+    """Sweep, optionally write masks, return the report"""
+    ids, histories, epochs, values, tvls, lengths = load_matrix(output_dir, strategy_ids)
+    flags, returns = sweep(epochs, values, tvls, lengths, window, threshold)
+    if masks:
+        for i, sid in enumerate(ids):
+            save_mask(sid, flags[i, :lengths[i]], mask_root)
+    return build_report(ids, histories, flags, returns, lengths, window, threshold)
+
+
+def main():
+    """Sweep every strategy and print / save the report"""
+    parser = argparse.ArgumentParser(description="Vectorized data-quality sweep over all NAV histories")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all files)")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--masks', action='store_true', help="write per-strategy flag masks")
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    parser.add_argument('--output', default=str(QUALITY_DIR / "report.json"))
+    args = parser.parse_args()
+
+    report = run(args.data_dir, args.strategy, args.window, args.threshold, args.masks)
+    history_store.write_json_atomic(args.output, report, indent=1)
+
+    print("="*78)
+    print("🧪 DATA QUALITY")
+    print("="*78)
+    print(f"{'STRATEGY':<16} {'POINTS':>7} {'SPIKE':>6} {'DUP':>5} {'ORDER':>6} {'TVL':>5} {'NAV':>5}")
+    for sid, s in report['strategies'].items():
+        print(f"{sid:<16} {s['points']:>7} {s['spike']:>6} {s['duplicate']:>5} {s['out_of_order']:>6} "
+              f"{s['bad_tvl']:>5} {s['bad_value']:>5}")
+    print(f"\n💾 Saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
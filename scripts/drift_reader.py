@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+DRIFT VAULT READER
+Reads a Drift vault's trading user and the markets it touches in a single
+getMultipleAccounts call, decodes positions in place and computes net equity.
+"""
+
+import base64
+import struct
+
+import requests
+
+# ========== CONFIG ==========
+DRIFT_PROGRAM_ID = "dRiftyHA39MWEi3m9aunc5MzRF1JYuBsbn6VPcn33UH"
+
+# Account layouts (Drift protocol-v2, zero_copy / repr(C))
+VAULT_USER_OFFSET = 168                 # Vault.user: Pubkey
+
+USER_SPOT_POSITIONS_OFFSET = 104        # User.spot_positions: [SpotPosition; 8]
+USER_PERP_POSITIONS_OFFSET = 424        # User.perp_positions: [PerpPosition; 8]
+SPOT_POSITION = struct.Struct('<QqqqHBB4x')       # 40 bytes
+PERP_POSITION = struct.Struct('<qqqqqqqqQqqiHBb')  # 96 bytes
+MAX_POSITIONS = 8
+
+SPOT_MARKET_NAME_OFFSET = 136           # SpotMarket.name: [u8; 32]
+SPOT_MARKET_PRICE_OFFSET = 168          # historical_oracle_data.last_oracle_price
+SPOT_MARKET_INTEREST_OFFSET = 464       # cumulative_deposit_interest, cumulative_borrow_interest (u128)
+SPOT_MARKET_DECIMALS_OFFSET = 680       # decimals: u32, market_index: u16
+PERP_MARKET_PRICE_OFFSET = 72           # amm.historical_oracle_data.last_oracle_price
+
+PRICE_PRECISION = 1e6
+QUOTE_PRECISION = 1e6
+BASE_PRECISION = 1e9
+SPOT_BALANCE_PRECISION_EXP = 19         # scaled_balance (1e9) * cumulative interest (1e10)
+
+PERP_MARKET_SYMBOLS = {0: 'SOL-PERP', 1: 'BTC-PERP', 2: 'ETH-PERP'}
+
+# ========== RPC ==========
+
+def get_multiple_accounts(rpc_url, addresses, timeout=30):
+    """One JSON-RPC round trip; returns raw account bytes (or None) per address"""
+    response = requests.post(
+        rpc_url,
+        json={
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [addresses, {"encoding": "base64", "commitment": "confirmed"}],
+        },
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    body = response.json()
+    if 'error' in body:
+        raise Exception(f"RPC error: {body['error']}")
+    return [base64.b64decode(acc['data'][0]) if acc else None for acc in body['result']['value']]
+
+
+def market_address(kind, market_index):
+    """PDA of a spot_market / perp_market account"""
+    from solders.pubkey import Pubkey
+
+    seeds = [f"{kind}_market".encode(), market_index.to_bytes(2, 'little')]
+    address, _ = Pubkey.find_program_address(seeds, Pubkey.from_string(DRIFT_PROGRAM_ID))
+    return str(address)
+
+# ========== DECODERS ==========
+
+def _u128(view, offset):
+    lo, hi = struct.unpack_from('<QQ', view, offset)
+    return lo | (hi << 64)
+
+
+def decode_vault_user(data):
+    """Trading user pubkey stored in a vault account"""
+    from solders.pubkey import Pubkey
+
+    view = memoryview(data)
+    return str(Pubkey.from_bytes(bytes(view[VAULT_USER_OFFSET:VAULT_USER_OFFSET + 32])))
+
+
+def decode_spot_positions(data):
+    """Non-empty spot positions of a User account"""
+    view = memoryview(data)
+    end = USER_SPOT_POSITIONS_OFFSET + SPOT_POSITION.size * MAX_POSITIONS
+    positions = []
+    for scaled_balance, _, _, _, market_index, balance_type, open_orders in \
+            SPOT_POSITION.iter_unpack(view[USER_SPOT_POSITIONS_OFFSET:end]):
+        if scaled_balance == 0 and open_orders == 0:
+            continue
+        positions.append({
+            'market_index': market_index,
+            'scaled_balance': scaled_balance,
+            'is_borrow': balance_type == 1,
+        })
+    return positions
+
+
+def decode_perp_positions(data):
+    """Non-empty perp positions of a User account"""
+    view = memoryview(data)
+    end = USER_PERP_POSITIONS_OFFSET + PERP_POSITION.size * MAX_POSITIONS
+    positions = []
+    for (_, base, quote, _, quote_entry, _, _, _, lp_shares, _, _, _,
+         market_index, open_orders, _) in PERP_POSITION.iter_unpack(view[USER_PERP_POSITIONS_OFFSET:end]):
+        if base == 0 and quote == 0 and open_orders == 0 and lp_shares == 0:
+            continue
+        positions.append({
+            'market_index': market_index,
+            'base_asset_amount': base,
+            'quote_asset_amount': quote,
+            'quote_entry_amount': quote_entry,
+        })
+    return positions
+
+
+def decode_spot_market(data, expected_index=None):
+    """Interest indexes, decimals and last oracle price of a SpotMarket"""
+    view = memoryview(data)
+    decimals, market_index = struct.unpack_from('<IH', view, SPOT_MARKET_DECIMALS_OFFSET)
+    if expected_index is not None and market_index != expected_index:
+        raise ValueError(f"SpotMarket layout mismatch: expected index {expected_index}, got {market_index}")
+    name = bytes(view[SPOT_MARKET_NAME_OFFSET:SPOT_MARKET_NAME_OFFSET + 32]).decode('utf-8', 'ignore')
+    return {
+        'market_index': market_index,
+        'symbol': name.replace('\x00', '').strip() or f"SPOT-{market_index}",
+        'decimals': decimals,
+        'price': struct.unpack_from('<q', view, SPOT_MARKET_PRICE_OFFSET)[0] / PRICE_PRECISION,
+        'cumulative_deposit_interest': _u128(view, SPOT_MARKET_INTEREST_OFFSET),
+        'cumulative_borrow_interest': _u128(view, SPOT_MARKET_INTEREST_OFFSET + 16),
+    }
+
+
+def decode_perp_market(data, market_index):
+    """Last oracle price cached on a PerpMarket"""
+    view = memoryview(data)
+    return {
+        'market_index': market_index,
+        'symbol': PERP_MARKET_SYMBOLS.get(market_index, f"PERP-{market_index}"),
+        'price': struct.unpack_from('<q', view, PERP_MARKET_PRICE_OFFSET)[0] / PRICE_PRECISION,
+    }
+
+# ========== EQUITY ==========
+
+def compute_net_equity(spot_positions, perp_positions, spot_markets, perp_markets):
+    """Net USD equity: signed spot balances plus perp unrealized PnL"""
+    rows = []
+    net_equity = 0.0
+
+    for pos in spot_positions:
+        market = spot_markets[pos['market_index']]
+        interest = market['cumulative_borrow_interest' if pos['is_borrow'] else 'cumulative_deposit_interest']
+        token_amount = pos['scaled_balance'] * interest // 10 ** (SPOT_BALANCE_PRECISION_EXP - market['decimals'])
+        size = token_amount / 10 ** market['decimals'] * (-1 if pos['is_borrow'] else 1)
+        value = size * market['price']
+        net_equity += value
+        rows.append({
+            'kind': 'spot',
+            'market': market['symbol'],
+            'size': size,
+            'notional': value,
+            'entry_price': None,
+            'unrealized_pnl': 0.0,
+        })
+
+    for pos in perp_positions:
+        market = perp_markets[pos['market_index']]
+        size = pos['base_asset_amount'] / BASE_PRECISION
+        quote = pos['quote_asset_amount'] / QUOTE_PRECISION
+        pnl = size * market['price'] + quote
+        net_equity += pnl
+        rows.append({
+            'kind': 'perp',
+            'market': market['symbol'],
+            'size': size,
+            'notional': size * market['price'],
+            'entry_price': abs(pos['quote_entry_amount'] / QUOTE_PRECISION / size) if size else None,
+            'unrealized_pnl': pnl,
+        })
+
+    return net_equity, rows
+
+
+def equity_from_accounts(user_address, accounts):
+    """Net equity and rows recomputed from the base64 accounts read_vault_equity returned"""
+    data = {address: base64.b64decode(encoded) for address, encoded in accounts.items()}
+    user_data = data[user_address]
+    spot_positions = decode_spot_positions(user_data)
+    perp_positions = decode_perp_positions(user_data)
+    spot_markets = {p['market_index']: decode_spot_market(data[market_address('spot', p['market_index'])],
+                                                          expected_index=p['market_index'])
+                    for p in spot_positions}
+    perp_markets = {p['market_index']: decode_perp_market(data[market_address('perp', p['market_index'])],
+                                                          p['market_index'])
+                    for p in perp_positions}
+    return compute_net_equity(spot_positions, perp_positions, spot_markets, perp_markets)
+
+
+def fetch_vault_user(rpc_url, vault_address):
+    """Resolve a vault's trading user with a single account fetch"""
+    data = get_multiple_accounts(rpc_url, [vault_address])[0]
+    if data is None:
+        raise Exception(f"Vault {vault_address} not found")
+    return decode_vault_user(data)
+
+
+def read_vault_equity(rpc_url, vault_address, user_hint=None, spot_indexes=(), perp_indexes=(),
+                      verify_vault=True):
+    """
+    Fetch vault, user and market accounts in one batch and compute net equity.
+    Extra round trips only happen when the hint or market lists are stale.
+    With verify_vault=False a (cached) user_hint is trusted and the vault is skipped.
+    """
+    spot_indexes, perp_indexes = set(spot_indexes), set(perp_indexes)
+    spot_markets, perp_markets = {}, {}
+    raw_accounts = {}  # address -> base64 account data, for raw_archive
+    round_trips = 0
+
+    def fetch_markets(spot_needed, perp_needed, extra):
+        nonlocal round_trips
+        spot_list, perp_list = sorted(spot_needed), sorted(perp_needed)
+        addresses = list(extra)
+        addresses += [market_address('spot', i) for i in spot_list]
+        addresses += [market_address('perp', i) for i in perp_list]
+        accounts = get_multiple_accounts(rpc_url, addresses)
+        round_trips += 1
+        raw_accounts.update({address: base64.b64encode(data).decode()
+                             for address, data in zip(addresses, accounts) if data is not None})
+        extra_data, rest = accounts[:len(extra)], accounts[len(extra):]
+        for i, data in zip(spot_list, rest[:len(spot_list)]):
+            if data is None:
+                raise Exception(f"Spot market {i} not found")
+            spot_markets[i] = decode_spot_market(data, expected_index=i)
+        for i, data in zip(perp_list, rest[len(spot_list):]):
+            if data is None:
+                raise Exception(f"Perp market {i} not found")
+            perp_markets[i] = decode_perp_market(data, i)
+        return extra_data
+
+    if user_hint and not verify_vault:
+        user_address = user_hint
+        user_data = fetch_markets(spot_indexes, perp_indexes, [user_hint])[0]
+    else:
+        batch = [vault_address] + ([user_hint] if user_hint else [])
+        fetched = fetch_markets(spot_indexes, perp_indexes, batch)
+        if fetched[0] is None:
+            raise Exception(f"Vault {vault_address} not found")
+        user_address = decode_vault_user(fetched[0])
+        user_data = fetched[1] if user_hint == user_address else None
+
+    if user_data is None:
+        user_data = fetch_markets((), (), [user_address])[0]
+        if user_data is None:
+            raise Exception(f"User {user_address} not found")
+
+    spot_positions = decode_spot_positions(user_data)
+    perp_positions = decode_perp_positions(user_data)
+
+    missing_spot = {p['market_index'] for p in spot_positions} - set(spot_markets)
+    missing_perp = {p['market_index'] for p in perp_positions} - set(perp_markets)
+    if missing_spot or missing_perp:
+        fetch_markets(missing_spot, missing_perp, [])
+
+    net_equity, rows = compute_net_equity(spot_positions, perp_positions, spot_markets, perp_markets)
+    return {
+        'vault': vault_address,
+        'user': user_address,
+        'net_equity': net_equity,
+        'positions': rows,
+        'spot_indexes': sorted({p['market_index'] for p in spot_positions}),
+        'perp_indexes': sorted({p['market_index'] for p in perp_positions}),
+        'round_trips': round_trips,
+        'accounts': raw_accounts,
+    }
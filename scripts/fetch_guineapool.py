@@ -10,10 +10,16 @@ import os
 from datetime import datetime, date
 from pathlib import Path
 
+from alerts import observe
+from lookup_cache import lighter_symbols_for
+from position_store import capture_positions, lighter_position_rows
+from raw_archive import capture_snapshot
+from time_index import index_root, update_index
+
 # ========== CONFIG ==========
 # Menggunakan Account Index Guinea Pool Anda
 ACCOUNT_INDEX = int(os.getenv('GUINEAPOOL_ACCOUNT_INDEX', '281474976694250'))
-BASE_URL = "https://mainnet.zklighter.elliot.ai/api/v1"
+BASE_URL = os.getenv('LIGHTER_BASE_URL', "https://mainnet.zklighter.elliot.ai/api/v1")
 START_NAV = 1000 
 
 # Paths
@@ -94,9 +100,10 @@ def calculate_drawdown(nav_history):
     current = nav_values[-1]
     return ((current - peak) / peak) * 100 if peak > 0 else 0
 
-def update_live_data(metrics):
+def update_live_data(metrics, now=None):
     """Update live-data-guineapool.json"""
-    today = date.today().isoformat()
+    now = now or datetime.now()
+    today = now.date().isoformat()
     live_data_path = OUTPUT_DIR / "live-data-guineapool.json"
     all_data = load_previous_data(live_data_path)
     
@@ -113,7 +120,6 @@ def update_live_data(metrics):
         previous_tvl = metrics['tvl']
     
     new_nav = calculate_nav(previous_nav, previous_tvl, metrics['tvl'])
-    now = datetime.now()
     
     new_point = {
         "date": today,
@@ -141,6 +147,10 @@ def update_live_data(metrics):
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     with open(live_data_path, 'w') as f:
         json.dump(all_data, f, indent=2)
+    try:
+        update_index("guineapool", live_data, 1, index_root(OUTPUT_DIR))
+    except Exception as e:
+        print(f"⚠️  Could not update time index for guineapool: {e}")
     
     return new_point
 
@@ -155,7 +165,11 @@ def main():
     metrics = calculate_metrics(account)
     if not metrics: return 1
     
-    new_point = update_live_data(metrics)
+    now = datetime.now()
+    new_point = update_live_data(metrics, now=now)
+    observe("guineapool", new_point, metrics['status'])
+    capture_positions("guineapool", now, lighter_position_rows(account, lighter_symbols_for(account, BASE_URL)))
+    capture_snapshot("guineapool", now, 'lighter.account', account)
     
     print(f"✅ Success! Net Equity (TVL): ${metrics['tvl']:,.2f}")
     print(f"📈 New NAV: {new_point['value']}")
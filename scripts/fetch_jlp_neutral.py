@@ -1,41 +1,51 @@
 #!/usr/bin/env python3
 """
 JLP Neutral Vault Sync - FULL HISTORY VERSION
-Logika: NAV Start 1000, Multi-row History (Tanpa Overwrite), & Manual Fallback
+Logika: NAV Start 1000, Multi-row History (Tanpa Overwrite), Equity otomatis dari Drift & Manual Fallback
 """
 import json
 import struct
 import os
+import sys
 from datetime import datetime, date
 from pathlib import Path
 
-try:
-    from solana.rpc.api import Client
-    from solders.pubkey import Pubkey
-except ImportError:
-    print("❌ Library belum terinstall. Jalankan: pip install solana solders requests")
-    exit(1)
+from alerts import observe
+from lookup_cache import LookupCache, TTL_VAULT_USER, TTL_VAULT_MARKETS
+from position_store import capture_positions, drift_position_rows
+from raw_archive import capture_snapshot
+from time_index import index_root, update_index
 
 # ========== CONFIG ==========
 VAULT_ADDRESS_STR = "9omhWDzVxpX1vPBxAhJpVao7baoVzZpNib32vozZLxGm"
-RPC_URL = "https://api.mainnet-beta.solana.com" 
+RPC_URL = os.getenv('SOLANA_RPC_URL', "https://api.mainnet-beta.solana.com")
+
+# Market awal yang diambil bersama user dalam satu batch RPC (JLP + USDC, SOL/BTC/ETH hedge).
+# Setelah run pertama, daftar market aktual vault diambil dari lookup cache.
+SPOT_MARKET_INDEXES = [int(i) for i in os.getenv('DRIFT_SPOT_MARKETS', '0,19').split(',') if i]
+PERP_MARKET_INDEXES = [int(i) for i in os.getenv('DRIFT_PERP_MARKETS', '0,1,2').split(',') if i]
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 OUTPUT_DIR = SCRIPT_DIR.parent / "public" / "data"
 START_NAV = 1000.0
 
-def get_vault_user_address(vault_str):
-    """Membongkar Vault untuk mencari alamat User Trading (Offset 168)"""
+def get_vault_user_address(vault_str, cache):
+    """Alamat User Trading dari Vault (Offset 168), di-cache karena tidak pernah berubah"""
+    import drift_reader
+
+    user_addr = cache.get('drift.vault_user', vault_str)
+    if user_addr:
+        return user_addr
     try:
-        client = Client(RPC_URL, timeout=60)
-        vault_pk = Pubkey.from_string(vault_str)
-        res = client.get_account_info(vault_pk)
-        if not res.value: return None
-        user_pk_bytes = res.value.data[168:200]
-        return str(Pubkey.from_bytes(user_pk_bytes))
-    except Exception:
-        return "8ue2xNfN5fXVvkFjDiWdmWERPbHEvkWgdq4bZD7FdrwF" # Fallback Manual
+        user_addr = drift_reader.fetch_vault_user(RPC_URL, vault_str)
+    except Exception as e:
+        # Pakai nilai cache lama (kalau ada) daripada alamat hard-coded
+        user_addr = cache.get('drift.vault_user', vault_str, allow_stale=True)
+        print(f"⚠️  Gagal membaca vault ({e}); cache lama: {user_addr}")
+        return user_addr
+    cache.set('drift.vault_user', vault_str, user_addr, TTL_VAULT_USER)
+    return user_addr
 
 def calculate_drawdown(nav_history):
     if not nav_history: return 0.0
@@ -44,10 +54,16 @@ def calculate_drawdown(nav_history):
     current = nav_values[-1]
     return ((current - peak) / peak) * 100 if peak > 0 else 0.0
 
-def update_live_data(net_equity):
+def calculate_nav(prev_nav, prev_equity, net_equity):
+    """Rumus Pertumbuhan Proporsional (equity 0 / negatif: NAV tetap)"""
+    if prev_equity > 0:
+        return prev_nav * (net_equity / prev_equity)
+    return prev_nav
+
+def update_live_data(net_equity, now=None):
     """Logika utama pembaruan data dan kalkulasi NAV"""
     # Gunakan ISO format untuk tanggal, tapi tambahkan jam agar unik jika di-update berkali-kali
-    now = datetime.now()
+    now = now or datetime.now()
     today_str = now.strftime("%Y-%m-%d")
     timestamp_str = now.strftime("%Y-%m-%d %H:%M:%S")
     
@@ -68,14 +84,7 @@ def update_live_data(net_equity):
         new_nav = START_NAV
     else:
         prev_point = live_data[-1]
-        prev_nav = prev_point['value']
-        prev_equity = prev_point.get('collateral', net_equity)
-        
-        # Rumus Pertumbuhan Proporsional
-        if prev_equity > 0:
-            new_nav = prev_nav * (net_equity / prev_equity)
-        else:
-            new_nav = prev_nav
+        new_nav = calculate_nav(prev_point['value'], prev_point.get('collateral', net_equity), net_equity)
 
     new_point = {
         "date": today_str,
@@ -105,36 +114,88 @@ def update_live_data(net_equity):
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     with open(file_path, 'w') as f:
         json.dump(all_data, f, indent=2)
+    try:
+        update_index("jlp_neutral", live_data, 1, index_root(OUTPUT_DIR))
+    except Exception as e:
+        print(f"⚠️  Could not update time index for jlp_neutral: {e}")
     
     return new_point
 
+def read_equity_from_drift(cache):
+    """Net equity, posisi dan akun mentah vault dihitung lokal dari akun Drift (1 round trip RPC)"""
+    import drift_reader
+
+    # User & market dari cache: kalau masih segar, vault tidak perlu diambil lagi
+    user_hint = cache.get('drift.vault_user', VAULT_ADDRESS_STR)
+    markets = cache.get('drift.vault_markets', VAULT_ADDRESS_STR) or {
+        'spot': SPOT_MARKET_INDEXES, 'perp': PERP_MARKET_INDEXES,
+    }
+    reading = drift_reader.read_vault_equity(
+        RPC_URL,
+        VAULT_ADDRESS_STR,
+        user_hint=user_hint or cache.get('drift.vault_user', VAULT_ADDRESS_STR, allow_stale=True),
+        spot_indexes=markets['spot'],
+        perp_indexes=markets['perp'],
+        verify_vault=user_hint is None,
+    )
+    if user_hint is None:
+        cache.set('drift.vault_user', VAULT_ADDRESS_STR, reading['user'], TTL_VAULT_USER)
+    if markets != {'spot': reading['spot_indexes'], 'perp': reading['perp_indexes']}:
+        cache.set('drift.vault_markets', VAULT_ADDRESS_STR,
+                  {'spot': reading['spot_indexes'], 'perp': reading['perp_indexes']}, TTL_VAULT_MARKETS)
+    print(f"👤 User Trading: {reading['user']}")
+    print(f"🔗 View Dashboard: https://app.drift.trade/view/{reading['user']}")
+    for row in reading['positions']:
+        print(f"   {row['kind']:<4} {row['market']:<10} size {row['size']:>16,.4f}  notional ${row['notional']:>16,.2f}")
+    print(f"📡 RPC round trips: {reading['round_trips']}")
+    # Akun mentah (base64) supaya equity bisa dihitung ulang kalau rumusnya berubah
+    raw = {'vault': reading['vault'], 'user': reading['user'], 'accounts': reading['accounts']}
+    return reading['net_equity'], drift_position_rows(reading), raw
+
+def read_equity_manually(cache):
+    """Fallback: input Net Equity dari Drift Dashboard"""
+    user_addr = get_vault_user_address(VAULT_ADDRESS_STR, cache)
+    print(f"👤 User Trading: {user_addr}")
+    print(f"🔗 View Dashboard: https://app.drift.trade/view/{user_addr}")
+    print("\n" + "-"*30)
+    val = input(f"Masukkan Net Equity dari Drift Dashboard: $")
+    return float(val.replace(",", "").replace("$", "").strip()), [], None
+
 def main():
     print("="*60)
     print("🚀 SENTQUANT | JLP NEUTRAL SYNC V3 (HISTORY MODE)")
     print("="*60)
 
-    user_addr = get_vault_user_address(VAULT_ADDRESS_STR)
-    print(f"👤 User Trading: {user_addr}")
-    print(f"🔗 View Dashboard: https://app.drift.trade/view/{user_addr}")
-
-    # Step: Input Equity (Gunakan angka $2,308,787.32 dari screenshot Drift)
-    print("\n" + "-"*30)
+    cache = LookupCache()
     try:
-        val = input(f"Masukkan Net Equity dari Drift Dashboard: $")
-        equity = float(val.replace(",", "").replace("$", "").strip())
+        equity, positions, raw = read_equity_from_drift(cache)
     except Exception as e:
-        print(f"❌ Input salah: {e}")
-        return
+        print(f"❌ Gagal membaca Drift otomatis: {e}")
+        # Input manual hanya kalau dijalankan di terminal (bukan cron/CI)
+        if not sys.stdin.isatty():
+            return 1
+        try:
+            equity, positions, raw = read_equity_manually(cache)
+        except Exception as e:
+            print(f"❌ Input salah: {e}")
+            return 1
+    finally:
+        cache.save()
 
     # Update dan Simpan
-    result = update_live_data(equity)
+    now = datetime.now()
+    result = update_live_data(equity, now=now)
+    observe("jlp_neutral", result, "Live")
+    capture_positions("jlp_neutral", now, positions)
+    if raw:
+        capture_snapshot("jlp_neutral", now, 'drift.accounts', raw)
 
     print("\n" + "="*60)
     print(f"✅ DATA BERHASIL DITAMBAHKAN")
     print(f"📈 NAV Sekarang: {result['value']}")
     print(f"💰 TVL:          ${result['collateral']:,.2f}")
-    print(f"📊 Total Baris:  {len(update_live_data.__globals__['all_data']['jlp_neutral']['liveData'] if 'all_data' in update_live_data.__globals__ else [])}") 
     print("="*60)
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    exit(main())
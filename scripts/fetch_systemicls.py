@@ -10,10 +10,17 @@ import os
 from datetime import datetime, date
 from pathlib import Path
 
+import hyperliquid_ledger
+from alerts import observe
+from history_store import flow_adjusted_nav, point_epoch
+from position_store import capture_positions, hyperliquid_position_rows
+from raw_archive import capture_snapshot
+from time_index import index_root, update_index
+
 # ========== CONFIG ==========
 # Menggunakan wallet address baru yang kamu berikan
 WALLET_ADDRESS = os.getenv('WALLET_ADDRESS_LS', '0x07fd993f0fa3a185f7207adccd29f7a87404689d')
-API_URL = "https://api.hyperliquid.xyz/info"
+API_URL = os.getenv('HYPERLIQUID_API_URL', "https://api.hyperliquid.xyz/info")
 START_NAV = 1000  # Starting NAV untuk tracking perdana
 STRATEGY_ID = "systemicls"  # ID strategi untuk dashboard
 
@@ -126,9 +133,10 @@ def calculate_drawdown(nav_history):
     current = nav_values[-1]
     return ((current - peak) / peak) * 100 if peak > 0 else 0
 
-def update_live_data(metrics):
+def update_live_data(metrics, now=None, flows_between=None):
     """Update live-data.json with new data point"""
-    today = date.today().isoformat()
+    now = now or datetime.now()
+    today = now.date().isoformat()
     live_data_path = OUTPUT_DIR / f"live-data-{STRATEGY_ID}.json"
     all_data = load_previous_data(live_data_path)
     
@@ -146,9 +154,14 @@ def update_live_data(metrics):
         previous_tvl = metrics['tvl']
     
     current_tvl = metrics['tvl']
-    new_nav = calculate_nav(previous_nav, previous_tvl, current_tvl)
+    if flows_between and len(live_data) > 0:
+        # Net out deposits / withdrawals made since the previous point
+        start, end = point_epoch(live_data[-1]), hyperliquid_ledger.naive_epoch(now)
+        new_nav = flow_adjusted_nav(previous_nav, previous_tvl, current_tvl,
+                                    flows_between(start, end), start, end)
+    else:
+        new_nav = calculate_nav(previous_nav, previous_tvl, current_tvl)
     
-    now = datetime.now()
     new_point = {
         "date": today,
         "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
@@ -171,10 +184,27 @@ def update_live_data(metrics):
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     with open(live_data_path, 'w') as f:
         json.dump(all_data, f, indent=2)
+    try:
+        update_index(STRATEGY_ID, live_data, 1, index_root(OUTPUT_DIR))
+    except Exception as e:
+        print(f"⚠️  Could not update time index for {STRATEGY_ID}: {e}")
     
     print(f"✅ Updated live-data-{STRATEGY_ID}.json")
     return new_point
 
+def sync_flows(now):
+    """Pull ledger updates since the last sync; returns a flows_between lookup or None"""
+    try:
+        # A wallet synced for the first time only needs flows since the last poll
+        since_ms = int((hyperliquid_ledger.naive_epoch(now) - 86400) * 1000)
+        counts = hyperliquid_ledger.sync_wallet(WALLET_ADDRESS, API_URL, since_ms=since_ms)
+        print(f"📒 Ledger: +{counts['flows']} flows, +{counts['fills']} fills")
+        return hyperliquid_ledger.LedgerStore(WALLET_ADDRESS).flows_between
+    except Exception as e:
+        print(f"⚠️  Ledger sync failed, NAV uses the raw account value change: {e}")
+        return None
+
+
 def update_historical_data(metrics):
     """Update equity-historical.json with new data point"""
     historical_path = OUTPUT_DIR / f"equity-historical-{STRATEGY_ID}.json"
@@ -215,7 +245,11 @@ def main():
     metrics = calculate_metrics(account)
     if not metrics: return 1
     
-    update_live_data(metrics)
+    now = datetime.now()
+    new_point = update_live_data(metrics, now=now, flows_between=sync_flows(now))
+    observe(STRATEGY_ID, new_point, metrics['status'])
+    capture_positions(STRATEGY_ID, now, hyperliquid_position_rows(account))
+    capture_snapshot(STRATEGY_ID, now, 'hyperliquid.clearinghouseState', account)
     update_historical_data(metrics)
     
     print("="*70)
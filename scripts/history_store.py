@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+HISTORY STORE
+Batched appends to public/data/live-data-<id>.json in the same schema the
+updaters write, with NAV chaining and running-peak drawdown done once per batch.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+OUTPUT_DIR = SCRIPT_DIR.parent / "public" / "data"
+START_NAV = 1000
+
+# ========== FUNCTIONS ==========
+
+def live_data_path(strategy_id, output_dir=None):
+    """Path of a strategy's live-data file"""
+    return Path(output_dir or OUTPUT_DIR) / f"live-data-{strategy_id}.json"
+
+
+def load_history(strategy_id, output_dir=None):
+    """Whole live-data document ({id: {liveData, tvl, status}})"""
+    path = live_data_path(strategy_id, output_dir)
+    try:
+        if path.exists():
+            with open(path, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"⚠️  Could not load previous data: {e}")
+    return {strategy_id: {"liveData": [], "tvl": 0, "status": "Offline"}}
+
+
+def point_epoch(point):
+    """Unix seconds of a liveData point (naive timestamps are UTC; date-only points at 00:00)"""
+    stamp = point.get('timestamp') or point['date']
+    fmt = "%Y-%m-%d %H:%M:%S" if ' ' in stamp else "%Y-%m-%d"
+    return int(datetime.strptime(stamp, fmt).replace(tzinfo=timezone.utc).timestamp())
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON via a temp file + rename so readers never see a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def calculate_nav(previous_nav, previous_tvl, current_tvl):
+    """Chain NAV by the TVL ratio (same rule as the updaters)"""
+    if previous_tvl == 0:
+        return START_NAV
+    return previous_nav * (1 + (current_tvl - previous_tvl) / previous_tvl)
+
+
+def flow_adjusted_nav(previous_nav, previous_tvl, current_tvl, flows, start, end):
+    """
+    Chain NAV over [start, end] net of capital flows (Modified Dietz): each
+    flow (unix seconds, amount) is weighted by the share of the interval it
+    was invested for, so deposits and withdrawals do not show up as returns.
+    """
+    if previous_tvl == 0:
+        return START_NAV
+    span = max(end - start, 1)
+    net = sum(amount for _, amount in flows)
+    invested = previous_tvl + sum(amount * (end - t) / span for t, amount in flows)
+    if invested <= 0:
+        return previous_nav  # Capital base wiped out by withdrawals: no meaningful return
+    return previous_nav * (1 + (current_tvl - previous_tvl - net) / invested)
+
+
+def append_points(strategy, samples, output_dir=None, flows_between=None):
+    """
+    Append [(datetime, metrics), ...] to a strategy's liveData in one read/write.
+    flows_between(start, end) -> [(unix seconds, amount)] makes NAV net of
+    deposits / withdrawals. Returns the new points.
+    """
+    if not samples:
+        return []
+    strategy_id = strategy['id']
+    tvl_key = strategy.get('tvl_key', 'tvl')
+    decimals = strategy.get('nav_decimals')
+
+    all_data = load_history(strategy_id, output_dir)
+    strategy_data = all_data.get(strategy_id, {"liveData": [], "tvl": 0, "status": "Offline"})
+    live_data = strategy_data.get("liveData", [])
+
+    peak = max((p['value'] for p in live_data), default=None)
+    if live_data:
+        previous_nav = live_data[-1]['value']
+        previous_tvl = live_data[-1].get(tvl_key, samples[0][1]['tvl'])
+        previous_time = point_epoch(live_data[-1])
+    else:
+        previous_nav = START_NAV
+        previous_tvl = samples[0][1]['tvl']
+        previous_time = None
+
+    new_points = []
+    for when, metrics in sorted(samples, key=lambda s: s[0]):
+        now = when.replace(tzinfo=timezone.utc).timestamp()
+        if flows_between and previous_time is not None:
+            nav = flow_adjusted_nav(previous_nav, previous_tvl, metrics['tvl'],
+                                    flows_between(previous_time, now), previous_time, now)
+        else:
+            nav = calculate_nav(previous_nav, previous_tvl, metrics['tvl'])
+        value = round(nav, decimals) if decimals is not None else nav
+        peak = value if peak is None else max(peak, value)
+        point = {
+            "date": when.date().isoformat(),
+            "timestamp": when.strftime("%Y-%m-%d %H:%M:%S"),
+            "year": when.year,
+            "value": value,
+            tvl_key: metrics['tvl'],
+        }
+        if strategy.get('pnl_metric'):
+            point["pnl"] = metrics.get(strategy['pnl_metric'], 0)
+        point["drawdown"] = ((value - peak) / peak) * 100 if peak > 0 else 0
+        new_points.append(point)
+        previous_nav, previous_tvl, previous_time = value, metrics['tvl'], now
+
+    live_data.extend(new_points)
+    last_metrics = max(samples, key=lambda s: s[0])[1]
+    strategy_data['liveData'] = live_data
+    strategy_data['tvl'] = last_metrics['tvl']
+    strategy_data['status'] = last_metrics.get('status', strategy_data.get('status', 'Offline'))
+    all_data[strategy_id] = strategy_data
+
+    write_json_atomic(live_data_path(strategy_id, output_dir), all_data)
+    try:
+        from time_index import index_root, update_index
+        update_index(strategy_id, live_data, len(new_points), index_root(output_dir))
+    except Exception as e:
+        print(f"⚠️  Could not update time index for {strategy_id}: {e}")
+    return new_points
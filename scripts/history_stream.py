@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+HISTORY STREAM
+Bounded-memory reader and migrator for legacy live-data files
+({"<id>": {"liveData": [...], "tvl": ..., "status": ...}}).
+
+LiveDataReader walks the document with a fixed-size text buffer and decodes
+one liveData record at a time (json's C scanner per record), so it holds one
+text chunk plus one record whatever the file size. The migrator normalizes
+--batch records at a time to the nav_model schema and writes them to:
+
+    store/nav/<id>/<seq>.npz   NavSeries columns, one file per --batch records
+    store/index/<id>.tix       time_index offsets (16 bytes per record)
+    live-data-<id>.json        with --rewrite: the same document re-serialized
+                               in the canonical legacy schema (written via tmp)
+
+Drift normalized on the way: 'collateral' vs 'tvl' (strategy tvl_key wins),
+points without 'timestamp' (DATE_ONLY flag), 'year' stored as a string or
+disagreeing with the date (always re-derived from the epoch).
+
+    python history_stream.py --strategy sentquant
+    python history_stream.py --synthetic 2000000 --batch 100000     # scale check
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+import history_store
+from nav_model import FIELDS, NavSeries, tvl_key_for
+from strategies import STRATEGIES
+from time_index import TimeIndex, index_path, save_index, INDEX_DIR
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+NAV_DIR = STORE_DIR / "nav"
+CHUNK_CHARS = 1 << 16          # Text read per refill
+DEFAULT_BATCH = 50_000         # Records per .npz chunk
+WHITESPACE = ' \t\n\r'
+DELIMITERS = WHITESPACE + ',:]}'
+
+# ========== READER ==========
+
+class LiveDataReader:
+    """
+    Iterate (strategy_id, record) over every liveData array of a legacy
+    document; the other per-strategy keys (tvl, status) land in `meta`
+    """
+
+    def __init__(self, path, chunk_chars=CHUNK_CHARS):
+        self.path = Path(path)
+        self.chunk_chars = chunk_chars
+        self.decoder = json.JSONDecoder()
+        self.meta = {}
+        self.bytes_read = 0
+
+    # ----- buffer -----
+
+    def _fill(self):
+        """Drop the consumed prefix and read one more chunk; False at EOF"""
+        chunk = self.file.read(self.chunk_chars)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.bytes_read += len(chunk)
+        return bool(chunk)
+
+    def _peek(self):
+        """Next non-whitespace character (None at EOF)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return None
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char is None or char not in chars:
+            raise ValueError(f"{self.path}: expected {chars!r} at offset ~{self.bytes_read}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next JSON value, refilling until it is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut at the buffer edge ("12" of "12.5") decodes too; only a
+            # delimiter after the value proves it is complete
+            if (end == len(self.buf) or self.buf[end] not in DELIMITERS) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    # ----- document -----
+
+    def _object_keys(self):
+        """Keys of the object starting at the cursor; the caller consumes each value"""
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            yield key
+            if self._expect(',}') == '}':
+                return
+
+    def __iter__(self):
+        self.buf, self.pos = '', 0
+        with open(self.path, 'r', encoding='utf-8') as self.file:
+            for strategy_id in self._object_keys():
+                meta = self.meta.setdefault(strategy_id, {})
+                for key in self._object_keys():
+                    if key != 'liveData' or self._peek() != '[':
+                        meta[key] = self._value()
+                        continue
+                    self._expect('[')
+                    if self._peek() == ']':
+                        self.pos += 1
+                        continue
+                    while True:
+                        yield strategy_id, self._value()
+                        if self._expect(',]') == ']':
+                            break
+        self.buf = ''
+
+# ========== NORMALIZATION ==========
+
+def count_drift(record, tvl_key, drift):
+    """Tally the schema drift one legacy record carries (cheap key checks only)"""
+    if tvl_key not in record and ('tvl' in record or 'collateral' in record):
+        drift['tvl_key'] += 1
+    if not record.get('timestamp'):
+        drift['date_only'] += 1
+    if isinstance(record.get('year'), str):
+        drift['year_string'] += 1
+    if record.get('value') is None:
+        drift['missing_value'] += 1
+
+
+def normalize_batch(records, strategy_id, drift):
+    """
+    NavSeries of a batch of legacy records; timestamps are parsed column-wise
+    by NumPy (per-record strptime would dominate the migration)
+    """
+    series = NavSeries.from_points(records, strategy_id)
+    stored = np.array([int(r['year']) if str(r.get('year', '')).isdigit() else -1 for r in records])
+    years = series.epoch.astype('datetime64[s]').astype('datetime64[Y]').astype(np.int64) + 1970
+    drift['year_mismatch'] += int(np.count_nonzero((stored != -1) & (stored != years)))
+    return series
+
+# ========== STORE WRITERS ==========
+
+def nav_dir(strategy_id, root=NAV_DIR):
+    return Path(root) / strategy_id
+
+
+def write_chunk(directory, seq, series):
+    """One .npz of NavSeries columns"""
+    path = directory / f"{seq:06d}.npz"
+    tmp_path = directory / f"{seq:06d}.tmp.npz"
+    np.savez(tmp_path, **{name: getattr(series, name) for name in FIELDS})
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_migrated(strategy_id, root=NAV_DIR):
+    """NavSeries of a migrated strategy (all chunks, in order)"""
+    chunks = sorted(nav_dir(strategy_id, root).glob('[0-9]*.npz'))
+    if not chunks:
+        return NavSeries(strategy_id)
+    parts = [np.load(path) for path in chunks]
+    return NavSeries.from_columns(strategy_id, **{name: np.concatenate([p[name] for p in parts])
+                                                  for name in FIELDS})
+
+
+class LegacyRewriter:
+    """Streams the canonical legacy document out, one record at a time"""
+
+    def __init__(self, path, strategy_id, tvl_key):
+        self.path = Path(path)
+        self.tvl_key = tvl_key
+        self.tmp = tempfile.NamedTemporaryFile('w', dir=self.path.parent, suffix='.tmp', delete=False)
+        self.tmp.write(f'{{{json.dumps(strategy_id)}: {{"liveData": [')
+        self.count = 0
+
+    def write(self, series):
+        for point in series.to_points(self.tvl_key):
+            self.tmp.write((',\n' if self.count else '\n') + json.dumps(point))
+            self.count += 1
+
+    def close(self, meta):
+        tail = ''.join(f', {json.dumps(k)}: {json.dumps(v)}' for k, v in meta.items())
+        self.tmp.write(f'\n]{tail}}}}}\n')
+        self.tmp.close()
+        os.replace(self.tmp.name, self.path)
+
+    def abort(self):
+        self.tmp.close()
+        os.unlink(self.tmp.name)
+
+# ========== MIGRATION ==========
+
+def migrate(path, strategy_id, nav_root=NAV_DIR, index_root=INDEX_DIR, batch=DEFAULT_BATCH,
+            rewrite=False, chunk_chars=CHUNK_CHARS):
+    """
+    Stream one live-data file into the NAV chunk store and time index
+    (optionally rewriting it normalized). Returns a stats dict.
+    """
+    tvl_key = tvl_key_for(strategy_id)
+    reader = LiveDataReader(path, chunk_chars)
+    drift = dict.fromkeys(('tvl_key', 'date_only', 'year_string', 'year_mismatch', 'missing_value'), 0)
+
+    # Build the chunks next to the old ones and swap the directory at the end
+    target = nav_dir(strategy_id, nav_root)
+    staging = target.with_name(f".{strategy_id}.migrating")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    rewriter = LegacyRewriter(path, strategy_id, tvl_key) if rewrite else None
+
+    index = TimeIndex()
+    records, count, chunks, other = [], 0, 0, 0
+
+    def flush():
+        nonlocal count, chunks
+        series = normalize_batch(records, strategy_id, drift)
+        for offset, epoch in enumerate(series.epoch.tolist(), count):
+            index.append(epoch, offset)
+        if rewriter:
+            rewriter.write(series)
+        write_chunk(staging, chunks, series)
+        count, chunks = count + len(series), chunks + 1
+        records.clear()
+
+    started = time.time()
+    try:
+        for record_strategy, record in reader:
+            if record_strategy != strategy_id:
+                other += 1
+                continue
+            count_drift(record, tvl_key, drift)
+            records.append(record)
+            if len(records) >= batch:
+                flush()
+        if records:
+            flush()
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        if rewriter:
+            rewriter.abort()
+        raise
+
+    if rewriter and other:
+        # Other strategies in the same document would be lost; leave it as it is
+        print(f"⚠️  {path} holds other strategies, not rewritten")
+        rewriter.abort()
+    elif rewriter:
+        rewriter.close(reader.meta.get(strategy_id, {}))
+    retired = target.with_name(f".{strategy_id}.old")
+    shutil.rmtree(retired, ignore_errors=True)
+    if target.exists():
+        os.replace(target, retired)
+    os.replace(staging, target)
+    shutil.rmtree(retired, ignore_errors=True)
+    save_index(strategy_id, index, index_root)
+    elapsed = time.time() - started
+    return {
+        'strategy': strategy_id,
+        'records': count,
+        'skipped_other_strategies': other,
+        'chunks': chunks,
+        'seconds': round(elapsed, 3),
+        'records_per_second': round(count / elapsed) if elapsed else None,
+        'mb_per_second': round(reader.bytes_read / 1e6 / elapsed, 1) if elapsed else None,
+        'drift': drift,
+        'meta': reader.meta.get(strategy_id, {}),
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# ========== SYNTHETIC ==========
+
+def write_synthetic(path, strategy_id, count, start=1_700_000_000, step=60):
+    """A legacy document of `count` minute points with the usual drift, written streaming"""
+    tvl_key = tvl_key_for(strategy_id)
+    other_key = 'tvl' if tvl_key == 'collateral' else 'collateral'
+    nav, peak = 1000.0, 1000.0
+    with open(path, 'w') as f:
+        f.write(f'{{{json.dumps(strategy_id)}: {{"liveData": [')
+        for i in range(count):
+            when = datetime.fromtimestamp(start + i * step, timezone.utc)
+            nav *= 1 + ((i * 7919) % 201 - 100) * 1e-5
+            peak = max(peak, nav)
+            point = {'date': when.date().isoformat(), 'timestamp': when.strftime("%Y-%m-%d %H:%M:%S"),
+                     'year': when.year, 'value': round(nav, 2), tvl_key: nav * 10,
+                     'pnl': nav - 1000, 'drawdown': (nav - peak) / peak * 100}
+            if i % 97 == 0:
+                point[other_key] = point.pop(tvl_key)
+            if i % 89 == 0:
+                point['year'] = str(when.year)
+            if i % 83 == 0:
+                del point['timestamp']
+            f.write((',\n' if i else '\n') + json.dumps(point, indent=2))
+        f.write('\n], "tvl": 10000, "status": "Live"}}\n')
+
+
+def main():
+    """Migrate legacy live-data files into the NAV chunk store"""
+    parser = argparse.ArgumentParser(description="Streaming legacy live-data migrator")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all)")
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help="records per .npz chunk")
+    parser.add_argument('--rewrite', action='store_true', help="also rewrite each file in the canonical schema")
+    parser.add_argument('--synthetic', type=int, metavar='N',
+                        help="generate an N-record legacy file in a temp dir and migrate it")
+    args = parser.parse_args()
+
+    jobs, scratch = [], None
+    if args.synthetic:
+        scratch = Path(tempfile.mkdtemp(prefix='history-stream-'))
+        path = scratch / "live-data-synthetic.json"
+        print(f"📝 Writing {args.synthetic:,} synthetic records...")
+        write_synthetic(path, 'sentquant', args.synthetic)
+        jobs.append((path, 'sentquant', scratch / "nav", scratch / "index"))
+    else:
+        ids = args.strategy or [s['id'] for s in STRATEGIES]
+        for strategy_id in ids:
+            path = history_store.live_data_path(strategy_id, args.data_dir)
+            if path.exists():
+                jobs.append((path, strategy_id, NAV_DIR, INDEX_DIR))
+            else:
+                print(f"⚠️  {strategy_id}: no live-data file")
+
+    try:
+        for path, strategy_id, nav_root, index_root in jobs:
+            size = path.stat().st_size / 1e6
+            stats = migrate(path, strategy_id, nav_root, index_root, args.batch, args.rewrite)
+            drift = ', '.join(f"{k} {v}" for k, v in stats['drift'].items() if v) or 'none'
+            print(f"✅ {strategy_id:<16} {stats['records']:>10,} records  {size:8.1f} MB  "
+                  f"{stats['records_per_second']:>9,} rec/s  {stats['mb_per_second']:>5} MB/s  "
+                  f"{stats['chunks']} chunks")
+            print(f"   drift: {drift}")
+            print(f"   → {nav_dir(strategy_id, nav_root)}, {index_path(strategy_id, index_root)}")
+        print(f"📈 Peak RSS {peak_rss_mb():.0f} MB")
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
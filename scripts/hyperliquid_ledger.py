@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+HYPERLIQUID LEDGER
+Incremental ingestion of a wallet's non-funding ledger updates (deposits,
+withdrawals, transfers) and fills, so NAV can be computed net of capital flows
+(history_store.flow_adjusted_nav).
+
+Each poll only asks for events since a persisted per-wallet cursor (last seen
+time plus the ids seen at that exact millisecond), so its cost follows the
+number of new events, not the account's age. Events are stored as fixed-size
+binary records:
+
+    store/ledger/<wallet>/cursor.json   cursors + coin dictionary
+    store/ledger/<wallet>/flows.bin     time_ms, signed USDC amount, kind
+    store/ledger/<wallet>/fills.bin     time_ms, tid, px, signed size, closed PnL, fee, coin
+
+    python hyperliquid_ledger.py --wallet 0x... --sync
+    python hyperliquid_ledger.py --wallet 0x... --flows
+"""
+
+import argparse
+import json
+import os
+import struct
+import threading
+from bisect import bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+LEDGER_DIR = STORE_DIR / "ledger"
+API_URL = os.getenv('HYPERLIQUID_API_URL', "https://api.hyperliquid.xyz/info")
+LEDGER_PAGE = 500                       # Max updates per userNonFundingLedgerUpdates response
+FILLS_PAGE = 2000                       # Max fills per userFillsByTime response
+
+FLOW = struct.Struct('<qdB')            # time_ms, signed amount, kind code
+FILL = struct.Struct('<qqddddH')        # time_ms, tid, px, signed size, closed pnl, fee, coin code
+FLOW_KINDS = ['deposit', 'withdraw', 'internalTransfer', 'subAccountTransfer', 'accountClassTransfer',
+              'spotTransfer', 'vaultCreate', 'vaultDeposit', 'vaultWithdraw', 'vaultDistribution',
+              'vaultLeaderCommission', 'other']
+MAX_PAGES = 100                         # Safety stop for one sync call
+
+# ========== FLOWS ==========
+
+def flow_amount(delta, wallet):
+    """Signed USDC moved into (+) or out of (-) the perp account, None if not a capital flow"""
+    kind = delta.get('type')
+    wallet = wallet.lower()
+    usdc = float(delta.get('usdc') or delta.get('usdcValue') or 0)
+    if kind == 'deposit':
+        return usdc
+    if kind == 'withdraw':
+        return -(usdc + float(delta.get('fee', 0)))
+    if kind in ('internalTransfer', 'subAccountTransfer', 'spotTransfer'):
+        incoming = str(delta.get('destination', '')).lower() == wallet
+        outgoing = str(delta.get('user', '')).lower() == wallet
+        if kind == 'spotTransfer' or incoming == outgoing:
+            return None  # Spot-side or self transfer: perp equity unchanged
+        return usdc if incoming else -(usdc + float(delta.get('fee', 0)))
+    if kind == 'accountClassTransfer':
+        return usdc if delta.get('toPerp') else -usdc
+    if kind in ('vaultDeposit', 'vaultCreate'):
+        return -usdc
+    if kind == 'vaultWithdraw':
+        return float(delta.get('netWithdrawnUsd', delta.get('requestedUsd', usdc)))
+    if kind in ('vaultDistribution', 'vaultLeaderCommission'):
+        return usdc
+    return None
+
+
+# ========== STORE ==========
+
+class LedgerStore:
+    """Cursor + append-only record files for one wallet"""
+
+    def __init__(self, wallet, root=LEDGER_DIR):
+        self.wallet = wallet.lower()
+        self.directory = Path(root) / self.wallet
+        self.cursor_path = self.directory / "cursor.json"
+        self.cursor = {'ledger_time': None, 'ledger_seen': [], 'fills_time': None, 'fills_seen': [], 'coins': []}
+        if self.cursor_path.exists():
+            with open(self.cursor_path, 'r') as f:
+                self.cursor.update(json.load(f))
+        # flows.bin folded into time-sorted columns, read on from flows_offset as it grows
+        self.flow_times = []  # Seconds
+        self.flow_amounts = []
+        self.flows_offset = 0
+        self.flows_lock = threading.Lock()
+
+    def save_cursor(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cursor_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cursor, f, indent=1)
+        os.replace(tmp_path, self.cursor_path)
+
+    def append(self, name, records):
+        if not records:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / name, 'ab') as f:
+            f.write(b''.join(records))
+
+    def read(self, name, record):
+        path = self.directory / name
+        if not path.exists():
+            return []
+        with open(path, 'rb') as f:
+            return list(record.iter_unpack(f.read()))
+
+    def coin_code(self, coin):
+        coins = self.cursor['coins']
+        if coin not in coins:
+            coins.append(coin)
+        return coins.index(coin)
+
+    def flows(self):
+        """[(time_ms, amount, kind)] in ledger order"""
+        return [(t, amount, FLOW_KINDS[kind]) for t, amount, kind in self.read('flows.bin', FLOW)]
+
+    def fills(self):
+        coins = self.cursor['coins']
+        return [{'time': t, 'tid': tid, 'px': px, 'size': size, 'closed_pnl': pnl, 'fee': fee, 'coin': coins[c]}
+                for t, tid, px, size, pnl, fee, c in self.read('fills.bin', FILL)]
+
+    def load_flows(self):
+        """Fold records appended to flows.bin since the last call into the sorted columns"""
+        path = self.directory / 'flows.bin'
+        if not path.exists():
+            return
+        with open(path, 'rb') as f:
+            f.seek(self.flows_offset)
+            data = f.read()
+        data = data[:len(data) - len(data) % FLOW.size]  # A record still being written
+        self.flows_offset += len(data)
+        for t, amount, _ in FLOW.iter_unpack(data):
+            t = t / 1000
+            if not self.flow_times or t >= self.flow_times[-1]:
+                self.flow_times.append(t)
+                self.flow_amounts.append(amount)
+            else:
+                i = bisect_right(self.flow_times, t)
+                self.flow_times.insert(i, t)
+                self.flow_amounts.insert(i, amount)
+
+    def flows_between(self, start, end):
+        """[(unix seconds, amount)] for flows with start < time <= end (seconds)"""
+        with self.flows_lock:
+            self.load_flows()
+            i, j = bisect_right(self.flow_times, start), bisect_right(self.flow_times, end)
+            return list(zip(self.flow_times[i:j], self.flow_amounts[i:j]))
+
+# ========== INGESTION ==========
+
+def post_info(api_url, payload):
+    response = requests.post(api_url, json=payload, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_since(api_url, info_type, wallet, cursor_time, seen, event_id, page_size):
+    """
+    Page through events with time >= cursor_time, skipping ids already seen at
+    cursor_time. Returns (new events oldest first, new cursor time, ids at it)
+    """
+    events = []
+    start = cursor_time or 0
+    seen = set(seen)
+    for _ in range(MAX_PAGES):
+        batch = post_info(api_url, {'type': info_type, 'user': wallet, 'startTime': start})
+        fresh = [e for e in sorted(batch, key=lambda e: e['time'])
+                 if e['time'] > start or (e['time'] == start and event_id(e) not in seen)]
+        if not fresh:
+            break
+        events.extend(fresh)
+        last = fresh[-1]['time']
+        seen = {event_id(e) for e in fresh if e['time'] == last} | (seen if last == start else set())
+        start = last
+        if len(batch) < page_size:
+            break
+    return events, (start if events else cursor_time), sorted(seen)
+
+
+def ledger_id(update):
+    return f"{update.get('hash')}:{update.get('delta', {}).get('type')}"
+
+
+def sync_wallet(wallet, api_url=API_URL, since_ms=None, root=LEDGER_DIR, fills=True):
+    """
+    Pull new ledger updates (and fills) since the wallet's cursor and store them.
+    since_ms only seeds the cursor of a wallet seen for the first time.
+    Returns {'flows': n, 'fills': n}
+    """
+    store = LedgerStore(wallet, root)
+    counts = {'flows': 0, 'fills': 0}
+
+    cursor_time = store.cursor['ledger_time'] if store.cursor['ledger_time'] is not None else since_ms
+    updates, cursor_time, seen = fetch_since(api_url, 'userNonFundingLedgerUpdates', wallet,
+                                             cursor_time, store.cursor['ledger_seen'], ledger_id, LEDGER_PAGE)
+    records = []
+    for update in updates:
+        delta = update.get('delta', {})
+        amount = flow_amount(delta, wallet)
+        if amount is None or amount == 0:
+            continue
+        kind = delta.get('type')
+        code = FLOW_KINDS.index(kind) if kind in FLOW_KINDS else FLOW_KINDS.index('other')
+        records.append(FLOW.pack(update['time'], amount, code))
+    store.append('flows.bin', records)
+    store.cursor['ledger_time'], store.cursor['ledger_seen'] = cursor_time, seen
+    counts['flows'] = len(records)
+
+    if fills:
+        cursor_time = store.cursor['fills_time'] if store.cursor['fills_time'] is not None else since_ms
+        new_fills, cursor_time, seen = fetch_since(api_url, 'userFillsByTime', wallet, cursor_time,
+                                                   store.cursor['fills_seen'], lambda fill: fill['tid'],
+                                                   FILLS_PAGE)
+        records = []
+        for fill in new_fills:
+            size = float(fill['sz']) * (1 if fill.get('side') == 'B' else -1)
+            records.append(FILL.pack(fill['time'], fill['tid'], float(fill['px']), size,
+                                     float(fill.get('closedPnl', 0)), float(fill.get('fee', 0)),
+                                     store.coin_code(fill['coin'])))
+        store.append('fills.bin', records)
+        store.cursor['fills_time'], store.cursor['fills_seen'] = cursor_time, seen
+        counts['fills'] = len(records)
+
+    # Records first, cursor last: a crash in between re-fetches, it never skips
+    store.save_cursor()
+    return counts
+
+
+def naive_epoch(when):
+    """Unix seconds of a naive timestamp as written in liveData (UTC)"""
+    return when.replace(tzinfo=timezone.utc).timestamp()
+
+
+def main():
+    """Sync or inspect one wallet"""
+    parser = argparse.ArgumentParser(description="Incremental Hyperliquid ledger / fills ingestion")
+    parser.add_argument('--wallet', required=True)
+    parser.add_argument('--sync', action='store_true', help="pull new events since the cursor")
+    parser.add_argument('--since', help="first sync only: start at this UTC date")
+    parser.add_argument('--no-fills', action='store_true', help="only ledger updates")
+    parser.add_argument('--flows', action='store_true', help="print stored flows")
+    args = parser.parse_args()
+
+    if args.sync:
+        since_ms = int(naive_epoch(datetime.fromisoformat(args.since)) * 1000) if args.since else None
+        counts = sync_wallet(args.wallet, since_ms=since_ms, fills=not args.no_fills)
+        print(f"✅ {args.wallet}: +{counts['flows']} flows, +{counts['fills']} fills")
+
+    store = LedgerStore(args.wallet)
+    flows = store.flows()
+    if args.flows:
+        for t, amount, kind in flows:
+            stamp = datetime.fromtimestamp(t / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"   {stamp}  {kind:<22} {amount:>+14,.2f}")
+    print(f"📒 {len(flows)} flows (net {sum(a for _, a, _ in flows):+,.2f}), "
+          f"{len(store.read('fills.bin', FILL))} fills stored")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
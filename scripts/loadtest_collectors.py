@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+COLLECTOR LOAD TEST
+Drives the updaters' fetch functions against the mock venue server and
+reports throughput and tail latency for many accounts at once.
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import daily_update
+import daily_update_hyperliquid
+import mock_venue_server
+
+# ========== FUNCTIONS ==========
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def timed_fetch(fetch, key):
+    """Run one fetch, returning (latency_seconds, succeeded)"""
+    start = time.perf_counter()
+    result = fetch(key)
+    return time.perf_counter() - start, result is not None
+
+
+def run_venue(name, fetch, keys, workers):
+    """Fetch every key with a thread pool and summarise latency"""
+    start = time.perf_counter()
+    # The fetchers print per call; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda k: timed_fetch(fetch, k), keys))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r[0] * 1000 for r in results)
+    failures = sum(1 for r in results if not r[1])
+    return {
+        'venue': name,
+        'requests': len(results),
+        'failures': failures,
+        'elapsed': elapsed,
+        'throughput': len(results) / elapsed if elapsed > 0 else 0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1] if latencies else 0,
+    }
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Load-test collectors against the mock venue server")
+    parser.add_argument('--accounts', type=int, default=1000, help="accounts per venue")
+    parser.add_argument('--workers', type=int, default=32, help="concurrent fetches")
+    parser.add_argument('--url', help="base URL of an already running mock (default: start one in-process)")
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--jitter-ms', type=float, default=30)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0)
+    args = parser.parse_args()
+
+    server = None
+    base = args.url
+    if not base:
+        server = mock_venue_server.start_server(
+            port=0,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+        )
+        base = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    daily_update.BASE_URL = f"{base.rstrip('/')}/api/v1"
+    daily_update_hyperliquid.API_URL = f"{base.rstrip('/')}/info"
+
+    print("="*70)
+    print("🏋️  COLLECTOR LOAD TEST")
+    print("="*70)
+    print(f"Target:   {base}")
+    print(f"Accounts: {args.accounts} per venue")
+    print(f"Workers:  {args.workers}")
+    print()
+
+    lighter_keys = [100_000 + i for i in range(args.accounts)]
+    hyper_keys = [f"0x{i:040x}" for i in range(args.accounts)]
+
+    reports = [
+        run_venue('lighter', daily_update.fetch_account_data, lighter_keys, args.workers),
+        run_venue('hyperliquid', daily_update_hyperliquid.fetch_account_data, hyper_keys, args.workers),
+    ]
+
+    print(f"{'VENUE':<12} | {'REQ':>6} | {'FAIL':>5} | {'REQ/S':>8} | {'P50':>8} | {'P95':>8} | {'P99':>8} | {'MAX':>8}")
+    print("-" * 86)
+    for r in reports:
+        print(f"{r['venue']:<12} | {r['requests']:>6} | {r['failures']:>5} | {r['throughput']:>8.1f} | "
+              f"{r['p50']:>6.1f}ms | {r['p95']:>6.1f}ms | {r['p99']:>6.1f}ms | {r['max']:>6.1f}ms")
+
+    if server:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
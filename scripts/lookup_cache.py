@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+LOOKUP CACHE
+Persistent cache for static or slowly changing venue metadata
+(vault -> user addresses, market indexes, Lighter market symbols).
+
+Entries carry a TTL and can be invalidated explicitly, so a poll only spends
+round trips on data that actually changes:
+
+    python lookup_cache.py --list
+    python lookup_cache.py --invalidate drift.vault_user
+    python lookup_cache.py --invalidate drift.vault_user:9omhWDz...
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import requests
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+CACHE_PATH = Path(os.getenv('LOOKUP_CACHE_PATH', SCRIPT_DIR / "cache" / "lookups.json"))
+
+# TTLs in seconds per namespace
+TTL_VAULT_USER = 7 * 24 * 3600        # A vault's trading user never changes in practice
+TTL_VAULT_MARKETS = 24 * 3600         # Markets a vault trades change rarely
+TTL_LIGHTER_MARKETS = 24 * 3600       # Lighter market_id -> symbol listing
+
+# ========== CACHE ==========
+
+class LookupCache:
+    """JSON-backed {namespace: {key: {value, expires}}} store"""
+
+    def __init__(self, path=CACHE_PATH, clock=time.time):
+        self.path = Path(path)
+        self.clock = clock
+        self.entries = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            if self.path.exists():
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            print(f"⚠️  Could not load lookup cache: {e}")
+            self.entries = {}
+
+    def _entry(self, namespace, key):
+        return self.entries.get(namespace, {}).get(str(key))
+
+    def get(self, namespace, key, allow_stale=False):
+        """Cached value, or None when missing or expired"""
+        entry = self._entry(namespace, key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if not allow_stale and entry['expires'] is not None and entry['expires'] <= self.clock():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['value']
+
+    def set(self, namespace, key, value, ttl=None):
+        """Store a value; ttl=None keeps it until invalidated"""
+        expires = self.clock() + ttl if ttl is not None else None
+        self.entries.setdefault(namespace, {})[str(key)] = {'value': value, 'expires': expires}
+        self.dirty = True
+
+    def get_or_fetch(self, namespace, key, fetch, ttl=None):
+        """Cached value, otherwise fetch(), store and return it"""
+        value = self.get(namespace, key)
+        if value is None:
+            value = fetch()
+            if value is not None:
+                self.set(namespace, key, value, ttl)
+        return value
+
+    def invalidate(self, namespace, key=None):
+        """Drop one key or a whole namespace"""
+        if namespace not in self.entries:
+            return
+        if key is None:
+            del self.entries[namespace]
+        else:
+            self.entries[namespace].pop(str(key), None)
+        self.dirty = True
+
+    def save(self):
+        """Atomically write the cache if anything changed"""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+# ========== VENUE LOOKUPS ==========
+
+def lighter_market_symbols(cache, base_url):
+    """market_id -> symbol for Lighter, refreshed once per TTL"""
+    def fetch():
+        try:
+            response = requests.get(f"{base_url}/orderBooks", timeout=10)
+            response.raise_for_status()
+            books = response.json().get('order_books', [])
+            return {str(b['market_id']): b['symbol'] for b in books}
+        except Exception as e:
+            print(f"⚠️  Could not fetch Lighter markets: {e}")
+            return None
+
+    return cache.get_or_fetch('lighter.markets', base_url, fetch, TTL_LIGHTER_MARKETS) or {}
+
+
+def lighter_symbols_for(account, base_url, cache=None):
+    """Symbols for an account's positions; no lookup at all when every position carries one"""
+    if all(p.get('symbol') for p in account.get('positions', [])):
+        return {}
+    cache = cache or LookupCache()
+    symbols = lighter_market_symbols(cache, base_url)
+    cache.save()
+    return symbols
+
+
+def main():
+    """Inspect or invalidate cache entries"""
+    parser = argparse.ArgumentParser(description="Inspect or invalidate the venue lookup cache")
+    parser.add_argument('--list', action='store_true', help="show all entries and their expiry")
+    parser.add_argument('--invalidate', action='append', default=[], metavar='NAMESPACE[:KEY]')
+    args = parser.parse_args()
+
+    cache = LookupCache()
+    for target in args.invalidate:
+        namespace, _, key = target.partition(':')
+        cache.invalidate(namespace, key or None)
+        print(f"🗑️  Invalidated {target}")
+    cache.save()
+
+    if args.list or not args.invalidate:
+        now = time.time()
+        print(f"📦 {cache.path}")
+        for namespace, entries in sorted(cache.entries.items()):
+            for key, entry in sorted(entries.items()):
+                if entry['expires'] is None:
+                    ttl = "never"
+                elif entry['expires'] <= now:
+                    ttl = "expired"
+                else:
+                    ttl = f"{(entry['expires'] - now) / 3600:.1f}h"
+                print(f"   {namespace:<20} {key:<46} {ttl:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
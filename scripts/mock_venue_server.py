@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+MOCK VENUE SERVER
+Local stand-in for the Lighter and Hyperliquid APIs used by the updaters.
+
+Serves recorded or synthetic account states so collectors can be load-tested
+offline. Point the updaters at it with:
+
+    LIGHTER_BASE_URL=http://127.0.0.1:8765/api/v1
+    HYPERLIQUID_API_URL=http://127.0.0.1:8765/info
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# ========== CONFIG ==========
+DEFAULT_HOST = os.getenv('MOCK_HOST', '127.0.0.1')
+DEFAULT_PORT = int(os.getenv('MOCK_PORT', '8765'))
+TICK_SECONDS = 60  # Synthetic state advances one step per tick
+EPOCH_TICK = 1735689600 // TICK_SECONDS  # 2025-01-01, where synthetic drift starts
+
+LIGHTER_MARKETS = ['ETH', 'BTC', 'SOL', 'HYPE', 'DOGE', 'XRP']
+HYPERLIQUID_COINS = ['BTC', 'ETH', 'SOL', 'HYPE', 'AVAX', 'ARB']
+LEDGER_SLOT_TICKS = 360  # At most one deposit / withdrawal per 6 hours
+FILL_SLOT_TICKS = 10     # At most one fill per 10 minutes
+LEDGER_PAGE = 500        # Hyperliquid caps userNonFundingLedgerUpdates responses
+PNL_PAGE = 1000          # Lighter caps /pnl responses
+RESOLUTIONS = {'1m': 60, '5m': 300, '15m': 900, '1h': 3600, '4h': 14400, '1d': 86400}
+PORTFOLIO_PERIODS = {'day': (86400, 900), 'week': (7 * 86400, 3600),
+                     'month': (30 * 86400, 14400), 'allTime': (None, 86400)}
+FILLS_PAGE = 2000        # ...and userFillsByTime responses
+
+# ========== SYNTHETIC STATE ==========
+
+def _rng(*parts):
+    """Deterministic RNG seeded from the given parts"""
+    digest = hashlib.sha256(":".join(str(p) for p in parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def synthetic_equity(key, tick):
+    """Equity curve for an account: base size, slow drift, a cycle and noise"""
+    base = 1_000 * (10 ** _rng(key, 'size').uniform(0, 3))
+    drift = _rng(key, 'drift').uniform(-2e-7, 5e-7)
+    wave = 0.03 * math.sin(tick / 240 + _rng(key, 'phase').uniform(0, 6.28))
+    noise = _rng(key, tick).gauss(0, 0.002)
+    return base * math.exp(drift * (tick - EPOCH_TICK) + wave + noise)
+
+
+def synthetic_positions(key, tick, symbols, equity):
+    """A handful of open positions sized against equity"""
+    rng = _rng(key, 'positions', tick // 60)
+    positions = []
+    for market_id, symbol in enumerate(symbols):
+        if rng.random() < 0.5:
+            continue
+        sign = 1 if rng.random() < 0.5 else -1
+        entry = 10 ** rng.uniform(-1, 5)
+        notional = equity * rng.uniform(0.1, 1.5)
+        size = notional / entry
+        mark = entry * (1 + _rng(key, symbol, tick).gauss(0, 0.01))
+        positions.append({
+            'market_id': market_id,
+            'symbol': symbol,
+            'sign': sign,
+            'size': size,
+            'entry': entry,
+            'notional': size * mark,
+            'upnl': sign * size * (mark - entry),
+        })
+    return positions
+
+
+def lighter_account(account_index, tick):
+    """Account payload in the shape of Lighter /account?by=index"""
+    key = f"lighter:{account_index}"
+    collateral = synthetic_equity(key, tick)
+    positions = synthetic_positions(key, tick, LIGHTER_MARKETS, collateral)
+    used = sum(p['notional'] for p in positions) * 0.1
+    return {
+        'code': 200,
+        'total': 1,
+        'accounts': [{
+            'index': account_index,
+            'l1_address': '0x' + hashlib.sha1(key.encode()).hexdigest(),
+            'status': 1 if positions else 0,
+            'collateral': f"{collateral:.6f}",
+            'available_balance': f"{max(collateral - used, 0):.6f}",
+            'positions': [{
+                'market_id': p['market_id'],
+                'symbol': p['symbol'],
+                'sign': p['sign'],
+                'position': f"{p['size']:.6f}",
+                'avg_entry_price': f"{p['entry']:.6f}",
+                'position_value': f"{p['notional']:.6f}",
+                'unrealized_pnl': f"{p['upnl']:.6f}",
+                'realized_pnl': "0.000000",
+            } for p in positions],
+        }],
+    }
+
+
+def lighter_pnl(account_index, resolution, start, end, count_back):
+    """Cumulative PnL / flows in the shape of Lighter /pnl (no synthetic transfers)"""
+    key = f"lighter:{account_index}"
+    step = RESOLUTIONS[resolution]
+    base = synthetic_equity(key, EPOCH_TICK)
+    end = min(end, int(time.time()))
+    start = max(start, EPOCH_TICK * TICK_SECONDS, end - step * min(count_back or PNL_PAGE, PNL_PAGE))
+    return {
+        'code': 200,
+        'resolution': resolution,
+        'pnl': [{
+            'timestamp': ts,
+            'trade_pnl': round(synthetic_equity(key, ts // TICK_SECONDS) - base, 6),
+            'inflow': 0,
+            'outflow': 0,
+        } for ts in range(-(-start // step) * step, end + 1, step)],
+    }
+
+
+def hyperliquid_portfolio(user, tick):
+    """accountValueHistory / pnlHistory per period in the shape of info type=portfolio"""
+    key = f"hyperliquid:{user.lower()}"
+    now = tick * TICK_SECONDS
+    base = synthetic_equity(key, EPOCH_TICK)
+    periods = []
+    for period, (span, step) in PORTFOLIO_PERIODS.items():
+        first = EPOCH_TICK * TICK_SECONDS if span is None else now - span
+        times = range(-(-first // step) * step, now + 1, step)
+        values = [synthetic_equity(key, t // TICK_SECONDS) for t in times]
+        periods.append([period, {
+            'accountValueHistory': [[t * 1000, f"{v:.6f}"] for t, v in zip(times, values)],
+            'pnlHistory': [[t * 1000, f"{v - base:.6f}"] for t, v in zip(times, values)],
+            'vlm': "0.0",
+        }])
+    return periods
+
+
+def lighter_order_books():
+    """Market listing in the shape of Lighter /orderBooks"""
+    return {
+        'code': 200,
+        'order_books': [{'symbol': symbol, 'market_id': market_id, 'status': 'active'}
+                        for market_id, symbol in enumerate(LIGHTER_MARKETS)],
+    }
+
+
+def hyperliquid_clearinghouse_state(user, tick):
+    """Payload in the shape of Hyperliquid info type=clearinghouseState"""
+    key = f"hyperliquid:{user.lower()}"
+    account_value = synthetic_equity(key, tick)
+    positions = synthetic_positions(key, tick, HYPERLIQUID_COINS, account_value)
+    total_ntl = sum(p['notional'] for p in positions)
+    summary = {
+        'accountValue': f"{account_value:.6f}",
+        'totalNtlPos': f"{total_ntl:.6f}",
+        'totalRawUsd': f"{account_value - sum(p['upnl'] for p in positions):.6f}",
+        'totalMarginUsed': f"{total_ntl * 0.1:.6f}",
+    }
+    return {
+        'marginSummary': summary,
+        'crossMarginSummary': dict(summary),
+        'withdrawable': f"{max(account_value - total_ntl * 0.1, 0):.6f}",
+        'assetPositions': [{
+            'type': 'oneWay',
+            'position': {
+                'coin': p['symbol'],
+                'szi': f"{p['sign'] * p['size']:.6f}",
+                'entryPx': f"{p['entry']:.6f}",
+                'positionValue': f"{p['notional']:.6f}",
+                'unrealizedPnl': f"{p['upnl']:.6f}",
+                'leverage': {'type': 'cross', 'value': 10},
+            },
+        } for p in positions],
+        'time': int(time.time() * 1000),
+    }
+
+def _slots(request, tick, slot_ticks):
+    """Slot numbers covered by a request's startTime / endTime (ms), oldest first"""
+    first_tick = max(int(request.get('startTime', 0)) // 1000 // TICK_SECONDS, EPOCH_TICK)
+    last_tick = min(int(request.get('endTime') or tick * TICK_SECONDS * 1000) // 1000 // TICK_SECONDS, tick)
+    return range(-(-first_tick // slot_ticks), last_tick // slot_ticks + 1)
+
+
+def hyperliquid_ledger_updates(user, tick, request):
+    """Sparse deposits / withdrawals in the shape of userNonFundingLedgerUpdates"""
+    key = f"hyperliquid:{user.lower()}"
+    updates = []
+    for slot in _slots(request, tick, LEDGER_SLOT_TICKS):
+        rng = _rng(key, 'ledger', slot)
+        if rng.random() > 0.1:
+            continue
+        amount = round(synthetic_equity(key, slot * LEDGER_SLOT_TICKS) * rng.uniform(0.01, 0.1), 2)
+        kind = 'deposit' if rng.random() < 0.6 else 'withdraw'
+        delta = {'type': kind, 'usdc': f"{amount:.2f}"}
+        if kind == 'withdraw':
+            delta.update({'nonce': slot, 'fee': '1.0'})
+        updates.append({
+            'time': slot * LEDGER_SLOT_TICKS * TICK_SECONDS * 1000,
+            'hash': '0x' + hashlib.sha256(f"{key}:{slot}".encode()).hexdigest(),
+            'delta': delta,
+        })
+        if len(updates) == LEDGER_PAGE:
+            break
+    return updates
+
+
+def hyperliquid_fills(user, tick, request):
+    """Synthetic fills in the shape of userFillsByTime"""
+    key = f"hyperliquid:{user.lower()}"
+    fills = []
+    for slot in _slots(request, tick, FILL_SLOT_TICKS):
+        rng = _rng(key, 'fill', slot)
+        if rng.random() > 0.3:
+            continue
+        coin = rng.choice(HYPERLIQUID_COINS)
+        px = round(rng.uniform(1, 100000), 4)
+        fills.append({
+            'coin': coin,
+            'px': f"{px}",
+            'sz': f"{rng.uniform(0.01, 5):.4f}",
+            'side': rng.choice(['A', 'B']),
+            'time': slot * FILL_SLOT_TICKS * TICK_SECONDS * 1000,
+            'closedPnl': f"{rng.gauss(0, 20):.6f}",
+            'fee': f"{rng.uniform(0, 2):.6f}",
+            'tid': int(hashlib.sha256(f"{key}:fill:{slot}".encode()).hexdigest()[:12], 16),
+            'oid': slot,
+            'crossed': True,
+            'dir': 'Open Long',
+        })
+        if len(fills) == FILLS_PAGE:
+            break
+    return fills
+
+# ========== SERVER ==========
+
+class TokenBucket:
+    """Global request budget; returns False when a request should get a 429"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class MockVenueHandler(BaseHTTPRequestHandler):
+    """Routes Lighter GETs and Hyperliquid info POSTs"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _pre_response(self):
+        """Apply latency, rate limiting and injected errors. True = handled"""
+        server = self.server
+        server.count_request()
+        if server.latency_ms or server.jitter_ms:
+            delay = server.latency_ms + random.uniform(0, server.jitter_ms)
+            time.sleep(delay / 1000)
+        if not server.bucket.take():
+            self._send_json(429, {'error': 'rate limited'}, {'Retry-After': '1'})
+            return True
+        if server.error_rate and random.random() < server.error_rate:
+            self._send_json(500, {'error': 'injected failure'})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') == '/api/v1/orderBooks':
+            if not self._pre_response():
+                self._send_json(200, lighter_order_books())
+            return
+        if url.path.rstrip('/') == '/api/v1/pnl':
+            if not self._pre_response():
+                self._send_pnl(parse_qs(url.query))
+            return
+        if url.path.rstrip('/') != '/api/v1/account':
+            self._send_json(404, {'error': f'unknown path {url.path}'})
+            return
+        if self._pre_response():
+            return
+
+        query = parse_qs(url.query)
+        if query.get('by', [''])[0] != 'index':
+            self._send_json(400, {'code': 400, 'message': 'only by=index is supported'})
+            return
+        try:
+            account_index = int(query.get('value', [''])[0])
+        except ValueError:
+            self._send_json(400, {'code': 400, 'message': 'invalid account index'})
+            return
+
+        recorded = self.server.recorded.get('lighter', {}).get(str(account_index))
+        if recorded is not None:
+            self._send_json(200, recorded)
+        else:
+            self._send_json(200, lighter_account(account_index, self.server.tick()))
+
+    def _send_pnl(self, query):
+        arg = lambda name, default=None: query.get(name, [default])[0]
+        try:
+            account_index = int(arg('value', ''))
+            start, end = int(arg('start_timestamp', 0)), int(arg('end_timestamp', time.time()))
+            count_back = int(arg('count_back', 0))
+        except ValueError:
+            self._send_json(400, {'code': 400, 'message': 'invalid pnl query'})
+            return
+        if arg('by') != 'index' or arg('resolution') not in RESOLUTIONS:
+            self._send_json(400, {'code': 400, 'message': 'by=index and a valid resolution are required'})
+            return
+        self._send_json(200, lighter_pnl(account_index, arg('resolution'), start, end, count_back))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/info':
+            self._send_json(404, {'error': f'unknown path {url.path}'})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': 'invalid json'})
+            return
+        if self._pre_response():
+            return
+
+        handler = self.server.info_handlers.get(request.get('type'))
+        if handler is None:
+            self._send_json(422, {'error': f"unsupported info type {request.get('type')}"})
+            return
+
+        user = str(request.get('user', ''))
+        recorded = self.server.recorded.get('hyperliquid', {}).get(user.lower(), {})
+        if request.get('type') in recorded:
+            self._send_json(200, recorded[request['type']])
+        else:
+            self._send_json(200, handler(user, self.server.tick(), request))
+
+
+class MockVenueServer(ThreadingHTTPServer):
+    """HTTP server carrying the fault-injection settings"""
+
+    daemon_threads = True
+    request_queue_size = 1024  # Thousands of concurrent collectors, not the default 5
+
+    def __init__(self, address, latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 rate_limit=0, recorded=None, verbose=False):
+        super().__init__(address, MockVenueHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit)
+        self.recorded = recorded or {}
+        self.verbose = verbose
+        self.started = time.time()
+        self.requests_served = 0
+        self._count_lock = threading.Lock()
+        self.info_handlers = {
+            'clearinghouseState': lambda user, tick, request: hyperliquid_clearinghouse_state(user, tick),
+            'userNonFundingLedgerUpdates': hyperliquid_ledger_updates,
+            'userFillsByTime': hyperliquid_fills,
+            'portfolio': lambda user, tick, request: hyperliquid_portfolio(user, tick),
+        }
+
+    def tick(self):
+        return int(time.time() // TICK_SECONDS)
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests_served += 1
+
+
+def load_recorded(path):
+    """Load recorded responses: {"lighter": {index: body}, "hyperliquid": {user: {type: body}}}"""
+    if not path:
+        return {}
+    with open(path, 'r') as f:
+        recorded = json.load(f)
+    recorded['hyperliquid'] = {k.lower(): v for k, v in recorded.get('hyperliquid', {}).items()}
+    return recorded
+
+
+def start_server(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """Start the server on a background thread and return it"""
+    server = MockVenueServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Local mock of the Lighter and Hyperliquid APIs")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency-ms', type=float, default=0, help="fixed delay added to every response")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="uniform random extra delay")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument('--rate-limit', type=float, default=0, help="requests/sec before 429s (0 = unlimited)")
+    parser.add_argument('--recorded', help="JSON file of recorded responses to serve verbatim")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = MockVenueServer(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        recorded=load_recorded(args.recorded),
+        verbose=args.verbose,
+    )
+    base = f"http://{args.host}:{server.server_address[1]}"
+
+    print("="*70)
+    print("🧪 MOCK VENUE SERVER")
+    print("="*70)
+    print(f"Lighter:      LIGHTER_BASE_URL={base}/api/v1")
+    print(f"Hyperliquid:  HYPERLIQUID_API_URL={base}/info")
+    print(f"Latency:      {args.latency_ms}ms (+{args.jitter_ms}ms jitter)")
+    print(f"Error rate:   {args.error_rate:.1%}")
+    print(f"Rate limit:   {args.rate_limit or 'unlimited'} req/s")
+    print()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        elapsed = time.time() - server.started
+        print(f"\n✅ Served {server.requests_served} requests in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+NAV MODEL
+One typed history model shared by the scripts, instead of lists of dicts with
+repeated string keys:
+
+    NavPoint   a single point (__slots__, no per-instance dict)
+    NavSeries  struct-of-arrays for whole histories (one NumPy column per field)
+
+Canonical schema (SCHEMA): epoch (UTC seconds), value (NAV), tvl, pnl,
+drawdown (%) and a flags byte. The legacy JSON drift is resolved at the edges:
+`collateral` and `tvl` both load into `tvl`, `year` is derived from the epoch
+(always an int), date-only points keep a DATE_ONLY flag so they write back
+without a timestamp, and backfilled points keep BACKFILL.
+
+    python nav_model.py --benchmark --strategies 100 --points 100000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+
+import history_store
+from strategies import STRATEGIES
+
+# ========== CONFIG ==========
+SCHEMA = (
+    ('epoch', np.int64),
+    ('value', np.float64),
+    ('tvl', np.float64),        # Legacy key: 'tvl' or 'collateral' (strategy tvl_key)
+    ('pnl', np.float64),        # NaN when the updater records none
+    ('drawdown', np.float64),   # Percent below the running peak (<= 0), NaN if missing
+    ('flags', np.uint8),
+)
+FIELDS = tuple(name for name, _ in SCHEMA)
+DATE_ONLY, BACKFILL = 1, 2
+TVL_KEYS = {s['id']: s.get('tvl_key', 'tvl') for s in STRATEGIES}
+NAN = float('nan')
+
+# ========== LEGACY HELPERS ==========
+
+def tvl_key_for(strategy_id):
+    return TVL_KEYS.get(strategy_id, 'tvl')
+
+
+def _number(value):
+    return NAN if value is None else float(value)
+
+
+def _legacy_fields(point, tvl_key=None):
+    """Canonical field tuple of a liveData / equity-historical dict"""
+    tvl = point.get(tvl_key) if tvl_key else None
+    if tvl is None:
+        tvl = point.get('tvl', point.get('collateral'))
+    flags = (0 if point.get('timestamp') else DATE_ONLY) | (BACKFILL if point.get('backfill') else 0)
+    return (history_store.point_epoch(point), _number(point.get('value')), _number(tvl),
+            _number(point.get('pnl')), _number(point.get('drawdown')), flags)
+
+
+def _legacy_dict(epoch, value, tvl, pnl, drawdown, flags, tvl_key='tvl', historical=False):
+    when = datetime.fromtimestamp(epoch, timezone.utc)
+    point = {'date': when.date().isoformat()}
+    if not historical and not flags & DATE_ONLY:
+        point['timestamp'] = when.strftime("%Y-%m-%d %H:%M:%S")
+    point['year'] = when.year
+    point['value'] = value
+    if not historical:
+        if tvl == tvl:
+            point[tvl_key] = tvl
+        if pnl == pnl:
+            point['pnl'] = pnl
+    if drawdown == drawdown:
+        point['drawdown'] = drawdown
+    if not historical and flags & BACKFILL:
+        point['backfill'] = True
+    return point
+
+# ========== POINT ==========
+
+class NavPoint:
+    """One history point in the canonical schema"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, epoch, value, tvl=NAN, pnl=NAN, drawdown=NAN, flags=0):
+        self.epoch = int(epoch)
+        self.value = float(value)
+        self.tvl = float(tvl)
+        self.pnl = float(pnl)
+        self.drawdown = float(drawdown)
+        self.flags = int(flags)
+
+    @classmethod
+    def from_legacy(cls, point, tvl_key=None):
+        return cls(*_legacy_fields(point, tvl_key))
+
+    def to_legacy(self, tvl_key='tvl', historical=False):
+        return _legacy_dict(*self.astuple(), tvl_key=tvl_key, historical=historical)
+
+    def astuple(self):
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    @property
+    def datetime(self):
+        return datetime.fromtimestamp(self.epoch, timezone.utc).replace(tzinfo=None)
+
+    @property
+    def year(self):
+        return self.datetime.year
+
+    def __eq__(self, other):
+        return isinstance(other, NavPoint) and all(
+            a == b or (a != a and b != b) for a, b in zip(self.astuple(), other.astuple()))
+
+    def __repr__(self):
+        return (f"NavPoint({self.datetime:%Y-%m-%d %H:%M:%S}, value={self.value}, tvl={self.tvl}, "
+                f"pnl={self.pnl}, drawdown={self.drawdown}, flags={self.flags})")
+
+# ========== SERIES ==========
+
+class NavSeries:
+    """Struct-of-arrays history: one NumPy column per SCHEMA field, grown by doubling"""
+
+    def __init__(self, strategy_id=None, capacity=0):
+        self.strategy_id = strategy_id
+        self._size = 0
+        self._columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in SCHEMA}
+
+    # ---------- construction ----------
+
+    @classmethod
+    def from_columns(cls, strategy_id=None, **columns):
+        series = cls(strategy_id)
+        size = len(columns['epoch'])
+        for name, dtype in SCHEMA:
+            default = 0 if name in ('epoch', 'flags') else np.nan
+            column = columns.get(name)
+            series._columns[name] = (np.asarray(column, dtype=dtype).copy() if column is not None
+                                     else np.full(size, default, dtype=dtype))
+        series._size = size
+        return series
+
+    @classmethod
+    def from_points(cls, points, strategy_id=None, tvl_key=None):
+        """From liveData dicts (or NavPoints)"""
+        if tvl_key is None and strategy_id is not None:
+            tvl_key = tvl_key_for(strategy_id)
+        if any(isinstance(p, NavPoint) for p in points):
+            rows = [p.astuple() if isinstance(p, NavPoint) else _legacy_fields(p, tvl_key) for p in points]
+            return cls.from_columns(strategy_id, **dict(zip(FIELDS, map(list, zip(*rows)))))
+        if not points:
+            return cls(strategy_id)
+        # Column by column: NumPy parses the timestamps, None becomes NaN
+        stamps = [p.get('timestamp') or p['date'] for p in points]
+        tvls = [p.get(tvl_key) if tvl_key else None for p in points]
+        tvls = [p.get('tvl', p.get('collateral')) if t is None else t for p, t in zip(points, tvls)]
+        flags = np.where([not p.get('timestamp') for p in points], DATE_ONLY, 0)
+        flags |= np.where([bool(p.get('backfill')) for p in points], BACKFILL, 0)
+        return cls.from_columns(
+            strategy_id,
+            epoch=np.array(stamps, dtype='datetime64[s]').astype(np.int64),
+            value=np.array([p.get('value') for p in points], dtype=np.float64),
+            tvl=np.array(tvls, dtype=np.float64),
+            pnl=np.array([p.get('pnl') for p in points], dtype=np.float64),
+            drawdown=np.array([p.get('drawdown') for p in points], dtype=np.float64),
+            flags=flags,
+        )
+
+    @classmethod
+    def from_historical(cls, rows, strategy_id=None):
+        """From equity-historical-<id>.json rows (year may be an int or a string there)"""
+        return cls.from_points(rows, strategy_id)
+
+    @classmethod
+    def load(cls, strategy_id, output_dir=None):
+        """liveData of public/data/live-data-<id>.json"""
+        points = history_store.load_history(strategy_id, output_dir).get(strategy_id, {}).get('liveData', [])
+        return cls.from_points(points, strategy_id)
+
+    # ---------- legacy output ----------
+
+    def to_points(self, tvl_key=None):
+        """liveData dicts in the schema the updaters write"""
+        tvl_key = tvl_key or tvl_key_for(self.strategy_id)
+        return [_legacy_dict(*row, tvl_key=tvl_key) for row in self._rows()]
+
+    def to_historical(self):
+        """equity-historical rows (date, year, value, drawdown)"""
+        return [_legacy_dict(*row, historical=True) for row in self._rows()]
+
+    def _rows(self):
+        return zip(*(self._columns[name][:self._size].tolist() for name in FIELDS))
+
+    # ---------- access ----------
+
+    def __len__(self):
+        return self._size
+
+    def __getattr__(self, name):
+        # Columns as read-only views trimmed to the current length
+        columns = self.__dict__.get('_columns')
+        if columns is None or name not in columns:
+            raise AttributeError(name)
+        view = columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def __getitem__(self, key):
+        if isinstance(key, (slice, np.ndarray)):  # Slice, boolean mask or index array
+            return NavSeries.from_columns(self.strategy_id,
+                                          **{name: self._columns[name][:self._size][key] for name in FIELDS})
+        if key < 0:
+            key += self._size
+        if not 0 <= key < self._size:
+            raise IndexError(key)
+        return NavPoint(*(self._columns[name][key].item() for name in FIELDS))
+
+    def __iter__(self):
+        for row in self._rows():
+            yield NavPoint(*row)
+
+    def append(self, point, tvl_key=None):
+        """Add a NavPoint or legacy dict; amortized O(1)"""
+        row = point.astuple() if isinstance(point, NavPoint) else _legacy_fields(
+            point, tvl_key or tvl_key_for(self.strategy_id))
+        if self._size == len(self._columns['epoch']):
+            capacity = max(16, 2 * self._size)
+            for name in FIELDS:
+                grown = np.zeros(capacity, dtype=self._columns[name].dtype)
+                grown[:self._size] = self._columns[name][:self._size]
+                self._columns[name] = grown
+        for name, value in zip(FIELDS, row):
+            self._columns[name][self._size] = value
+        self._size += 1
+
+    def extend(self, points, tvl_key=None):
+        for point in points:
+            self.append(point, tvl_key)
+
+    @property
+    def nbytes(self):
+        return sum(column[:self._size].nbytes for column in self._columns.values())
+
+    # ---------- derived ----------
+
+    def returns(self):
+        """Simple NAV returns between consecutive points"""
+        value = self.value
+        return value[1:] / value[:-1] - 1 if len(value) > 1 else np.zeros(0)
+
+    def time_index(self):
+        """time_index.TimeIndex over the epochs (stable for equal timestamps)"""
+        from time_index import TimeIndex
+        order = np.argsort(self.epoch, kind='stable')
+        return TimeIndex(array('q', self.epoch[order].tolist()), array('q', order.tolist()))
+
+# ========== BENCHMARK ==========
+
+def synthetic_points(count, start=1_700_000_000, step=900):
+    """liveData-shaped dicts, as the updaters write them"""
+    points, nav = [], 1000.0
+    for i in range(count):
+        when = datetime.fromtimestamp(start + i * step, timezone.utc)
+        nav *= 1 + ((i * 7919) % 201 - 100) * 1e-5
+        points.append({
+            'date': when.date().isoformat(),
+            'timestamp': when.strftime("%Y-%m-%d %H:%M:%S"),
+            'year': when.year,
+            'value': nav,
+            'tvl': nav * 10,
+            'pnl': nav - 1000,
+            'drawdown': 0.0,
+        })
+    return points
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.time()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, time.time() - started
+
+
+def main():
+    """Compare memory of dict histories and NavSeries, or check legacy round-trips"""
+    parser = argparse.ArgumentParser(description="Typed NAV history model")
+    parser.add_argument('--benchmark', action='store_true', help="memory of dict lists vs NavSeries")
+    parser.add_argument('--strategies', type=int, default=100)
+    parser.add_argument('--points', type=int, default=100000)
+    parser.add_argument('--check', action='store_true', help="round-trip every live-data file")
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    args = parser.parse_args()
+
+    if args.check:
+        directory = history_store.live_data_path('x', args.data_dir).parent
+        for path in sorted(directory.glob('live-data-*.json')):
+            strategy_id = path.name[len('live-data-'):-len('.json')]
+            with open(path, 'r') as f:
+                points = json.load(f).get(strategy_id, {}).get('liveData', [])
+            series = NavSeries.from_points(points, strategy_id)
+            same = series.to_points() == points
+            print(f"{'✅' if same else '❌'} {strategy_id:<16} {len(series):>7} points, "
+                  f"{series.nbytes / 1024:,.0f} KiB as columns")
+
+    if args.benchmark:
+        template = synthetic_points(args.points)
+        text = json.dumps(template)
+        dicts, dict_bytes, dict_time = measure(lambda: [json.loads(text) for _ in range(args.strategies)])
+        del dicts
+        series, series_bytes, series_time = measure(
+            lambda: [NavSeries.from_points(json.loads(text)) for _ in range(args.strategies)])
+        total = args.strategies * args.points
+        print(f"📦 {args.strategies} strategies x {args.points:,} points")
+        print(f"   dict lists : {dict_bytes / 2**20:>9,.1f} MiB ({dict_bytes / total:.0f} B/point, {dict_time:.1f}s)")
+        print(f"   NavSeries  : {series_bytes / 2**20:>9,.1f} MiB ({series_bytes / total:.0f} B/point, {series_time:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
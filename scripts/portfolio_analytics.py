@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+PORTFOLIO ANALYTICS
+Cross-strategy analytics on one aligned NumPy matrix: every strategy's NAV is
+sampled on a shared hourly grid (last point per bucket, forward-filled), so
+returns are a (T, N) matrix and correlation / covariance / composite NAVs are
+matrix products instead of nested loops.
+
+    python portfolio_analytics.py --window 720
+    python portfolio_analytics.py --rolling-step 168 --output store/analytics/portfolio.json
+
+Composite weightings: equal, tvl (by current TVL) and inverse_vol (1 / trailing
+return volatility). Weights observed at the close of one bucket are applied to
+the next bucket's returns, so a composite never uses information from the
+future. PortfolioEngine.update() folds in new points incrementally (the
+collector daemon registers a PortfolioListener with --analytics).
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import numpy as np
+
+import history_store
+from data_quality import clean_series
+from nav_model import NavSeries
+from strategies import STRATEGIES
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+OUTPUT_PATH = STORE_DIR / "analytics" / "portfolio.json"
+BUCKET = 3600                  # Grid resolution in seconds
+DEFAULT_WINDOW = 24 * 30       # Rolling window in buckets (30 days hourly)
+SCHEMES = ('equal', 'tvl', 'inverse_vol')
+MIN_VOL = 1e-8                 # Below this a series is flat (avoids 1/rounding-noise weights)
+START_NAV = history_store.START_NAV
+TVL_KEYS = {s['id']: s.get('tvl_key', 'tvl') for s in STRATEGIES}
+
+# ========== LOADING ==========
+
+def point_tvl(strategy_id, point):
+    value = point.get(TVL_KEYS.get(strategy_id, 'tvl'), point.get('collateral', point.get('tvl')))
+    return float(value) if value is not None else np.nan
+
+
+def load_series(output_dir=None, bucket=BUCKET):
+    """{id: (bucket numbers, navs, tvls)} using the last point of each bucket, flagged points dropped"""
+    directory = history_store.live_data_path('x', output_dir).parent
+    series = {}
+    for path in sorted(directory.glob('live-data-*.json')):
+        strategy_id = path.name[len('live-data-'):-len('.json')]
+        history = clean_series(NavSeries.load(strategy_id, output_dir))
+        if len(history) < 2:
+            continue
+        index = history.time_index()
+        positions = index.bucket_positions(bucket)
+        closes = np.array([index.offsets[p] for p in positions], dtype=np.int64)
+        series[strategy_id] = (history.epoch[closes] // bucket, history.value[closes], history.tvl[closes])
+    return series
+
+
+def align(series):
+    """Stack series on a shared bucket grid -> (buckets, ids, nav[T, N], tvl[T, N]), forward-filled"""
+    ids = sorted(series)
+    first = min(s[0][0] for s in series.values())
+    last = max(s[0][-1] for s in series.values())
+    buckets = np.arange(first, last + 1, dtype=np.int64)
+    nav = np.full((len(buckets), len(ids)), np.nan)
+    tvl = np.full_like(nav, np.nan)
+    for j, strategy_id in enumerate(ids):
+        rows, navs, tvls = series[strategy_id]
+        nav[rows - first, j] = navs
+        tvl[rows - first, j] = tvls
+    return buckets, ids, forward_fill(nav), forward_fill(tvl)
+
+
+def forward_fill(matrix):
+    """Carry the last observation down each column (leading NaNs stay NaN)"""
+    rows = np.where(np.isnan(matrix), 0, np.arange(len(matrix))[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = matrix[rows, np.arange(matrix.shape[1])]
+    started = np.maximum.accumulate(~np.isnan(matrix), axis=0)
+    return np.where(started, filled, np.nan)
+
+
+def to_returns(nav):
+    """Simple returns; row 0 and rows before a strategy starts are NaN"""
+    returns = np.full_like(nav, np.nan)
+    returns[1:] = nav[1:] / nav[:-1] - 1
+    return returns
+
+# ========== MATRIX STATISTICS ==========
+
+def window_sums(returns):
+    """Pairwise-complete sums of a window of returns: (n, sx, sxx, sxy), each N x N"""
+    present = (~np.isnan(returns)).astype(float)
+    x = np.nan_to_num(returns)
+    return present.T @ present, x.T @ present, (x * x).T @ present, x.T @ x
+
+
+def cov_corr(sums):
+    """Covariance and correlation from pairwise window sums (NaN where < 2 overlaps)"""
+    n, sx, sxx, sxy = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        valid = n >= 2
+        denominator = np.where(valid, n - 1, np.nan)
+        cov = (sxy - sx * sx.T / n) / denominator
+        var_i = (sxx - sx * sx / n) / denominator
+        corr = cov / np.sqrt(var_i * var_i.T)
+    return np.where(valid, cov, np.nan), np.clip(np.where(valid, corr, np.nan), -1, 1)
+
+
+def rolling_cov_corr(returns, window, step=1):
+    """[(row, cov, corr)] for windows ending at every `step` rows"""
+    out = []
+    for end in range(len(returns), 1, -step):
+        out.append((end - 1, *cov_corr(window_sums(returns[max(1, end - window):end]))))
+    return out[::-1]
+
+
+def rolling_vol(returns, window):
+    """Trailing sample std per column over `window` rows (NaN when < 2 observations)"""
+    present = ~np.isnan(returns)
+    x = np.nan_to_num(returns)
+    def trailing(values):
+        csum = np.cumsum(values, axis=0)
+        csum[window:] = csum[window:] - csum[:-window]
+        return csum
+    n = trailing(present.astype(float))
+    s = trailing(x)
+    ss = trailing(x * x)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (ss - s * s / n) / (n - 1)
+    return np.where(n >= 2, np.sqrt(np.maximum(var, 0)), np.nan)
+
+
+def scheme_weights(scheme, nav, tvl, vol):
+    """Raw (unnormalized) weight of every strategy at each row's close"""
+    live = ~np.isnan(nav)
+    if scheme == 'equal':
+        return live.astype(float)
+    if scheme == 'tvl':
+        return np.where(live & (tvl > 0), tvl, 0.0)
+    if scheme == 'inverse_vol':
+        with np.errstate(divide='ignore'):
+            return np.where(live & (vol > MIN_VOL), 1 / vol, 0.0)
+    raise ValueError(f"Unknown weighting scheme: {scheme}")
+
+
+def composite_returns(weights, returns):
+    """Return of a portfolio rebalanced to weights[t-1] over bucket t"""
+    held = weights[:-1] * ~np.isnan(returns[1:])
+    total = held.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        blended = (held * np.nan_to_num(returns[1:])).sum(axis=1) / total
+    return np.concatenate([[0.0], np.where(total > 0, blended, 0.0)])
+
+# ========== ENGINE ==========
+
+class PortfolioEngine:
+    """Aligned NAV/TVL matrix with window sums and composite NAVs kept up to date"""
+
+    def __init__(self, buckets, ids, nav, tvl, window=DEFAULT_WINDOW, bucket=BUCKET, schemes=SCHEMES):
+        self.bucket = bucket
+        self.window = window
+        self.schemes = schemes
+        self.ids = list(ids)
+        self.columns = {strategy_id: j for j, strategy_id in enumerate(self.ids)}
+        self.first_bucket = int(buckets[0])
+        self.rows = len(buckets)
+        capacity = max(16, 2 * self.rows)
+        self.nav = self._grow(nav, capacity)
+        self.tvl = self._grow(tvl, capacity)
+        self.returns = self._grow(to_returns(nav), capacity)
+        self.late_points = 0
+
+        # Bulk pass over the closed rows (all but the last, which stays open
+        # for updates): composites, latest weights and the trailing window sums
+        closed = self.rows - 1
+        returns = self.returns[:closed]
+        vol = rolling_vol(returns, window)
+        self.composite = {}
+        self.weights = {}
+        for scheme in schemes:
+            weights = scheme_weights(scheme, self.nav[:closed], self.tvl[:closed], vol)
+            navs = START_NAV * np.cumprod(1 + composite_returns(weights, returns)) if closed else [START_NAV]
+            self.composite[scheme] = list(navs)
+            self.weights[scheme] = weights[-1] if closed else np.zeros(len(self.ids))
+        self.sums = list(window_sums(returns[max(1, closed - window):]))
+
+    @classmethod
+    def from_files(cls, output_dir=None, **options):
+        bucket = options.get('bucket', BUCKET)
+        series = load_series(output_dir, bucket)
+        if not series:
+            raise ValueError("No strategy has enough history")
+        return cls(*align(series), **options)
+
+    @staticmethod
+    def _grow(matrix, capacity):
+        grown = np.full((capacity, matrix.shape[1]), np.nan)
+        grown[:len(matrix)] = matrix
+        return grown
+
+    # ---------- incremental updates ----------
+
+    def _add_column(self, strategy_id):
+        self.columns[strategy_id] = len(self.ids)
+        self.ids.append(strategy_id)
+        pad = lambda m: np.hstack([m, np.full((len(m), 1), np.nan)])
+        self.nav, self.tvl, self.returns = pad(self.nav), pad(self.tvl), pad(self.returns)
+        self.sums = [np.pad(s, ((0, 1), (0, 1))) for s in self.sums]
+        for scheme in self.schemes:
+            self.weights[scheme] = np.append(self.weights[scheme], 0.0)
+
+    def _open_row(self):
+        """Close the current row and start the next one (forward-filled)"""
+        self._close_row()
+        if self.rows == len(self.nav):
+            self.nav, self.tvl, self.returns = (self._grow(m[:self.rows], 2 * self.rows)
+                                                for m in (self.nav, self.tvl, self.returns))
+        self.nav[self.rows] = self.nav[self.rows - 1]
+        self.tvl[self.rows] = self.tvl[self.rows - 1]
+        self.rows += 1
+
+    def _close_row(self):
+        """Fold the (final) current row into window sums, weights and composites"""
+        t = self.rows - 1
+        if t >= 1:
+            self.returns[t] = self.nav[t] / self.nav[t - 1] - 1
+            self._add_to_window(self.returns[t], 1)
+            if t - self.window >= 1:
+                self._add_to_window(self.returns[t - self.window], -1)
+        row_returns = self.returns[t:t + 1]
+        vol = np.sqrt(np.maximum(np.diag(cov_corr(self.sums)[0]), 0))
+        for scheme in self.schemes:
+            if t >= 1:
+                blended = composite_returns(np.vstack([self.weights[scheme], self.weights[scheme]]),
+                                            np.vstack([row_returns, row_returns]))[1]
+                self.composite[scheme].append(self.composite[scheme][-1] * (1 + blended))
+            self.weights[scheme] = scheme_weights(scheme, self.nav[t], self.tvl[t], vol)
+
+    def _add_to_window(self, row, sign):
+        for total, part in zip(self.sums, window_sums(row[None, :])):
+            total += sign * part
+
+    def update(self, strategy_id, epoch, nav, tvl=np.nan):
+        """Fold one new point in. Points older than the open bucket are counted and skipped"""
+        if strategy_id not in self.columns:
+            self._add_column(strategy_id)
+        row = epoch // self.bucket - self.first_bucket
+        if row < self.rows - 1:
+            self.late_points += 1
+            return False
+        while self.rows - 1 < row:
+            self._open_row()
+        self.nav[row, self.columns[strategy_id]] = nav
+        self.tvl[row, self.columns[strategy_id]] = tvl
+        return True
+
+    def on_points(self, strategy, new_points):
+        """Collector daemon listener: listener(strategy, new_points)"""
+        for point in new_points:
+            self.update(strategy['id'], history_store.point_epoch(point), float(point['value']),
+                        point_tvl(strategy['id'], point))
+
+    # ---------- results ----------
+
+    def latest_cov_corr(self):
+        """Covariance / correlation over the last `window` closed buckets"""
+        return cov_corr(self.sums)
+
+    def rolling(self, step):
+        return rolling_cov_corr(self.returns[:self.rows - 1], self.window, step)
+
+    def composite_navs(self):
+        """{scheme: NAV as of the last closed bucket}"""
+        return {scheme: navs[-1] for scheme, navs in self.composite.items()}
+
+    def snapshot(self, rolling_step=None, decimals=4):
+        cov, corr = self.latest_cov_corr()
+        as_of = (self.first_bucket + self.rows - 2) * self.bucket
+        rounded = lambda m: [[None if np.isnan(v) else round(float(v), decimals) for v in row] for row in m]
+        result = {
+            'as_of': as_of,
+            'bucket': self.bucket,
+            'window': self.window,
+            'strategies': self.ids,
+            'correlation': rounded(corr),
+            'covariance': rounded(cov * 1e4),  # In basis points squared
+            'composite': {
+                scheme: {
+                    'nav': round(float(navs[-1]), 2),
+                    'weights': dict(zip(self.ids, (round(float(w), 4) for w in
+                                                   self.weights[scheme] / max(self.weights[scheme].sum(), 1e-12)))),
+                    'daily': [round(float(v), 2) for v in navs[::max(1, 86400 // self.bucket)]],
+                }
+                for scheme, navs in self.composite.items()
+            },
+        }
+        if rolling_step:
+            result['rolling_correlation'] = [
+                {'as_of': int((self.first_bucket + row) * self.bucket), 'correlation': rounded(c)}
+                for row, _, c in self.rolling(rolling_step)
+            ]
+        return result
+
+
+def write_snapshot(engine, path=OUTPUT_PATH, rolling_step=None):
+    history_store.write_json_atomic(path, engine.snapshot(rolling_step), indent=None)
+
+
+class PortfolioListener:
+    """Collector daemon listener; builds the engine once some strategy has enough history"""
+
+    def __init__(self, output_dir=None, path=OUTPUT_PATH):
+        self.output_dir = output_dir
+        self.path = path
+        self.engine = None
+
+    def on_points(self, strategy, new_points):
+        if self.engine is None:
+            series = load_series(self.output_dir)
+            if not series:
+                return
+            # Built from the files, which already hold new_points
+            self.engine = PortfolioEngine(*align(series))
+        else:
+            self.engine.on_points(strategy, new_points)
+        write_snapshot(self.engine, self.path)
+
+
+def main():
+    """Build the engine from the live-data files and report"""
+    parser = argparse.ArgumentParser(description="Correlation, covariance and composite NAVs across strategies")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="rolling window in buckets")
+    parser.add_argument('--bucket', type=int, default=BUCKET, help="grid resolution in seconds")
+    parser.add_argument('--rolling-step', type=int, help="also emit rolling correlation every N buckets")
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    parser.add_argument('--output', default=str(OUTPUT_PATH))
+    args = parser.parse_args()
+
+    engine = PortfolioEngine.from_files(args.data_dir, window=args.window, bucket=args.bucket)
+    _, corr = engine.latest_cov_corr()
+    write_snapshot(engine, args.output, args.rolling_step)
+
+    print("="*70)
+    print(f"📊 PORTFOLIO ANALYTICS  ({engine.rows} buckets x {len(engine.ids)} strategies, window {args.window})")
+    print("="*70)
+    width = max(len(i) for i in engine.ids)
+    print(" " * (width + 2) + " ".join(f"{i[:8]:>8}" for i in engine.ids))
+    for strategy_id, row in zip(engine.ids, corr):
+        print(f"{strategy_id:<{width}}  " + " ".join("     n/a" if np.isnan(v) else f"{v:>8.2f}" for v in row))
+    print()
+    for scheme, nav in engine.composite_navs().items():
+        print(f"   Composite {scheme:<12} NAV {nav:>10.2f}")
+    print(f"\n💾 Saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+POSITION STORE
+Compact columnar store for per-position snapshots taken on every poll.
+
+Layout: store/positions/<strategy>/<YYYY-MM>.sqp, a sequence of appended chunks.
+Each chunk is self-describing:
+
+    header   MAGIC | n_rows u32 | base_time i64 | dict_len u32 | payload_len u32
+    dict     market symbols used in the chunk, '\\n'-joined (dictionary encoding)
+    payload  zlib( time deltas i64 | market codes u16 | size | notional | entry | upnl f64 )
+
+Timestamps are delta-encoded against the previous row (the first against
+base_time). A poll with no open positions is stored as a chunk of zero rows at
+base_time, so going flat is a snapshot too. Per-chunk dictionaries keep each strategy's partition independent,
+so collectors running in separate workflows never write to the same file.
+
+    python position_store.py --report
+    python position_store.py --compact
+"""
+
+import argparse
+import os
+import struct
+import zlib
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+POSITIONS_DIR = STORE_DIR / "positions"
+
+MAGIC = b'SQP1'
+HEADER = struct.Struct('<4sIqII')
+FLOAT_COLUMNS = ('size', 'notional', 'entry_price', 'unrealized_pnl')
+
+# ========== ROW EXTRACTION ==========
+
+def lighter_position_rows(account, symbols=None):
+    """Per-position rows from a Lighter account payload (symbols: market_id -> symbol)"""
+    symbols = symbols or {}
+    rows = []
+    for pos in account.get('positions', []):
+        size = float(pos.get('position', 0)) * (1 if int(pos.get('sign', 1)) >= 0 else -1)
+        if size == 0:
+            continue
+        rows.append({
+            'market': pos.get('symbol') or symbols.get(str(pos.get('market_id'))) or f"MARKET-{pos.get('market_id')}",
+            'size': size,
+            'notional': float(pos.get('position_value', 0)) * (1 if size > 0 else -1),
+            'entry_price': float(pos.get('avg_entry_price', 'nan')),
+            'unrealized_pnl': float(pos.get('unrealized_pnl', 0)),
+        })
+    return rows
+
+
+def hyperliquid_position_rows(account_data):
+    """Per-position rows from a Hyperliquid clearinghouseState payload"""
+    rows = []
+    for asset in account_data.get('assetPositions', []):
+        pos = asset.get('position', {})
+        size = float(pos.get('szi', 0))
+        if size == 0:
+            continue
+        rows.append({
+            'market': pos.get('coin', '?'),
+            'size': size,
+            'notional': float(pos.get('positionValue', 0)) * (1 if size > 0 else -1),
+            'entry_price': float(pos.get('entryPx') or 'nan'),
+            'unrealized_pnl': float(pos.get('unrealizedPnl', 0)),
+        })
+    return rows
+
+
+def drift_position_rows(reading):
+    """Per-position rows from a drift_reader.read_vault_equity result"""
+    return [{
+        'market': row['market'],
+        'size': row['size'],
+        'notional': row['notional'],
+        'entry_price': row['entry_price'] if row['entry_price'] is not None else float('nan'),
+        'unrealized_pnl': row['unrealized_pnl'],
+    } for row in reading['positions']]
+
+# ========== WRITE ==========
+
+def partition_path(strategy_id, epoch, root=POSITIONS_DIR):
+    """Monthly partition file for a strategy"""
+    month = datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m')
+    return Path(root) / strategy_id / f"{month}.sqp"
+
+
+def encode_chunk(times, markets, columns, base_time=None):
+    """Encode one chunk from parallel lists (times must be sorted)"""
+    symbols = sorted(set(markets))
+    codes = {s: i for i, s in enumerate(symbols)}
+    if base_time is None:
+        base_time = times[0] if times else 0
+
+    deltas = array('q', [0] * len(times))
+    previous = base_time
+    for i, t in enumerate(times):
+        deltas[i] = t - previous
+        previous = t
+
+    payload = deltas.tobytes() + array('H', [codes[m] for m in markets]).tobytes()
+    for name in FLOAT_COLUMNS:
+        payload += array('d', columns[name]).tobytes()
+    payload = zlib.compress(payload, 6)
+    dictionary = "\n".join(symbols).encode('utf-8')
+    return HEADER.pack(MAGIC, len(times), base_time, len(dictionary), len(payload)) + dictionary + payload
+
+
+def append_positions(strategy_id, when, rows, root=POSITIONS_DIR):
+    """Append one poll's positions as a chunk (empty when flat); returns bytes written"""
+    # Naive datetimes are UTC, as in history_store and raw_archive
+    if isinstance(when, datetime):
+        epoch = int((when.replace(tzinfo=timezone.utc) if when.tzinfo is None else when).timestamp())
+    else:
+        epoch = int(when)
+    chunk = encode_chunk(
+        [epoch] * len(rows),
+        [r['market'] for r in rows],
+        {name: [float(r[name]) for r in rows] for name in FLOAT_COLUMNS},
+        base_time=epoch,
+    )
+    path = partition_path(strategy_id, epoch, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(chunk)
+    return len(chunk)
+
+
+def capture_positions(strategy_id, when, rows):
+    """Collector hook: never let position capture break the NAV update"""
+    try:
+        written = append_positions(strategy_id, when, rows)
+        print(f"🧾 Captured {len(rows)} positions ({written} bytes)")
+    except Exception as e:
+        print(f"⚠️  Could not capture positions: {e}")
+
+# ========== READ ==========
+
+def iter_chunks(path):
+    """Yield (n_rows, base_time, symbols, decompressed payload) per chunk"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        magic, n_rows, base_time, dict_len, payload_len = HEADER.unpack_from(view, offset)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: bad chunk at byte {offset}")
+        offset += HEADER.size
+        symbols = bytes(view[offset:offset + dict_len]).decode('utf-8').split("\n") if dict_len else []
+        offset += dict_len
+        payload = zlib.decompress(view[offset:offset + payload_len])
+        offset += payload_len
+        yield n_rows, base_time, symbols, payload
+
+
+def scan(strategies=None, start=None, end=None, root=POSITIONS_DIR):
+    """
+    Load matching rows into NumPy columns:
+    time (epoch s), strategy / market codes with their dictionaries, and float columns.
+    snapshot_time / snapshot_strategy list every poll, including flat ones with no rows.
+    """
+    import numpy as np
+
+    root = Path(root)
+    strategy_dirs = sorted(p for p in root.iterdir() if p.is_dir()) if root.exists() else []
+    if strategies:
+        strategy_dirs = [p for p in strategy_dirs if p.name in set(strategies)]
+
+    strategy_names, market_names, market_codes = [], [], {}
+    parts = {'time': [], 'strategy': [], 'market': [], **{name: [] for name in FLOAT_COLUMNS}}
+    snapshots = {'snapshot_time': [], 'snapshot_strategy': []}
+
+    for s_code, s_dir in enumerate(strategy_dirs):
+        strategy_names.append(s_dir.name)
+        for path in sorted(s_dir.glob('*.sqp')):
+            for n_rows, base_time, symbols, payload in iter_chunks(path):
+                if n_rows == 0:
+                    snapshots['snapshot_time'].append(np.array([base_time], dtype=np.int64))
+                    snapshots['snapshot_strategy'].append(np.array([s_code], dtype=np.uint16))
+                    continue
+                times = base_time + np.cumsum(np.frombuffer(payload, dtype='<i8', count=n_rows))
+                polls = np.unique(times)
+                snapshots['snapshot_time'].append(polls)
+                snapshots['snapshot_strategy'].append(np.full(len(polls), s_code, dtype=np.uint16))
+                local = np.frombuffer(payload, dtype='<u2', count=n_rows, offset=8 * n_rows)
+                remap = np.array([market_codes.setdefault(s, len(market_codes)) for s in symbols], dtype=np.uint16)
+                parts['time'].append(times)
+                parts['strategy'].append(np.full(n_rows, s_code, dtype=np.uint16))
+                parts['market'].append(remap[local])
+                float_offset = 10 * n_rows
+                for i, name in enumerate(FLOAT_COLUMNS):
+                    parts[name].append(np.frombuffer(payload, dtype='<f8', count=n_rows,
+                                                     offset=float_offset + 8 * n_rows * i))
+
+    market_names = sorted(market_codes, key=market_codes.get)
+    empty = {'time': np.int64, 'strategy': np.uint16, 'market': np.uint16,
+             'snapshot_time': np.int64, 'snapshot_strategy': np.uint16}
+
+    def columns(parts, time_key):
+        table = {k: (np.concatenate(v) if v else np.array([], dtype=empty.get(k, np.float64)))
+                 for k, v in parts.items()}
+        mask = np.ones(len(table[time_key]), dtype=bool)
+        if start is not None:
+            mask &= table[time_key] >= start
+        if end is not None:
+            mask &= table[time_key] <= end
+        return {k: v[mask] for k, v in table.items()}
+
+    result = {**columns(parts, 'time'), **columns(snapshots, 'snapshot_time')}
+    result['strategies'] = strategy_names
+    result['markets'] = market_names
+    return result
+
+# ========== ANALYTICS ==========
+
+def latest_exposure(table):
+    """Signed notional per (strategy, market) at each strategy's latest snapshot"""
+    import numpy as np
+
+    exposure = {}
+    for s_code, name in enumerate(table['strategies']):
+        polls = table['snapshot_time'][table['snapshot_strategy'] == s_code]
+        if not len(polls):
+            continue
+        sel = (table['strategy'] == s_code) & (table['time'] == polls.max())
+        sums = np.bincount(table['market'][sel], weights=table['notional'][sel], minlength=len(table['markets']))
+        exposure[name] = {table['markets'][m]: float(v) for m, v in enumerate(sums) if v}
+    return exposure
+
+
+def concentration(table):
+    """Herfindahl index of |notional| across markets per (strategy, time) snapshot"""
+    import numpy as np
+
+    if len(table['time']) == 0:
+        return {}
+    keys = np.stack([table['strategy'].astype(np.int64), table['time']])
+    uniq, inverse = np.unique(keys, axis=1, return_inverse=True)
+    inverse = inverse.ravel()
+    gross = np.abs(table['notional'])
+    totals = np.bincount(inverse, weights=gross)
+    shares = gross / np.where(totals[inverse] > 0, totals[inverse], 1)
+    hhi = np.bincount(inverse, weights=shares ** 2)
+    result = {}
+    for (s_code, t), value in zip(uniq.T, hhi):
+        result.setdefault(table['strategies'][s_code], []).append((int(t), float(value)))
+    return result
+
+
+def turnover(table):
+    """
+    Sum of |change in gross notional| between consecutive snapshots, per strategy.
+    A market missing from a snapshot (or a flat snapshot with no rows) counts
+    as notional 0, so opening and closing positions are turnover too.
+    """
+    import numpy as np
+
+    result = {}
+    for s_code, name in enumerate(table['strategies']):
+        sel = table['strategy'] == s_code
+        times = np.unique(table['snapshot_time'][table['snapshot_strategy'] == s_code])
+        if not sel.any():
+            result[name] = 0.0
+            continue
+        snapshot = np.searchsorted(times, table['time'][sel])
+        markets, column = np.unique(table['market'][sel], return_inverse=True)
+        # Dense snapshot x market grid of gross notional, zero where a market is absent
+        grid = np.zeros((len(times), len(markets)))
+        np.add.at(grid, (snapshot, column.ravel()), np.abs(table['notional'][sel]))
+        result[name] = float(np.abs(np.diff(grid, axis=0)).sum())
+    return result
+
+
+def compact(root=POSITIONS_DIR):
+    """Rewrite every partition as one chunk, plus one empty chunk per flat snapshot"""
+    import numpy as np
+
+    saved = 0
+    for path in sorted(Path(root).glob('*/*.sqp')):
+        times, markets, flat = [], [], set()
+        columns = {name: [] for name in FLOAT_COLUMNS}
+        chunks = 0
+        for n_rows, base_time, symbols, payload in iter_chunks(path):
+            chunks += 1
+            if n_rows == 0:
+                flat.add(base_time)
+                continue
+            times.extend((base_time + np.cumsum(np.frombuffer(payload, dtype='<i8', count=n_rows))).tolist())
+            local = np.frombuffer(payload, dtype='<u2', count=n_rows, offset=8 * n_rows)
+            markets.extend(symbols[c] for c in local)
+            for i, name in enumerate(FLOAT_COLUMNS):
+                columns[name].extend(np.frombuffer(payload, dtype='<f8', count=n_rows,
+                                                   offset=10 * n_rows + 8 * n_rows * i).tolist())
+        if chunks <= 1 + len(flat):
+            continue
+        order = sorted(range(len(times)), key=times.__getitem__)
+        chunk = encode_chunk([times[i] for i in order], [markets[i] for i in order],
+                             {name: [columns[name][i] for i in order] for name in FLOAT_COLUMNS})
+        chunk += b''.join(encode_chunk([], [], {name: [] for name in FLOAT_COLUMNS}, base_time=t)
+                          for t in sorted(flat))
+        before = path.stat().st_size
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(chunk)
+        os.replace(tmp_path, path)
+        saved += before - len(chunk)
+        print(f"🗜️  {path.relative_to(root)}: {chunks} chunks, {before} -> {len(chunk)} bytes")
+    return saved
+
+
+def main():
+    """Report or compact the position store"""
+    parser = argparse.ArgumentParser(description="Per-position snapshot store")
+    parser.add_argument('--report', action='store_true', help="exposure, concentration and turnover")
+    parser.add_argument('--compact', action='store_true', help="merge chunks in every partition")
+    parser.add_argument('--strategy', action='append')
+    args = parser.parse_args()
+
+    if args.compact:
+        saved = compact()
+        print(f"✅ Compaction saved {saved} bytes")
+
+    if args.report or not args.compact:
+        table = scan(args.strategy)
+        print(f"📦 {len(table['time'])} position rows, {len(table['strategies'])} strategies, "
+              f"{len(table['markets'])} markets")
+        turnovers, hhis = turnover(table), concentration(table)
+        for name, exposure in latest_exposure(table).items():
+            gross = sum(abs(v) for v in exposure.values())
+            print(f"\n📊 {name}  gross ${gross:,.0f}  turnover ${turnovers.get(name, 0):,.0f}")
+            hhi = hhis.get(name, [])
+            if hhi:
+                print(f"   Concentration (HHI, latest): {hhi[-1][1]:.3f}")
+            for market, notional in sorted(exposure.items(), key=lambda kv: -abs(kv[1])):
+                print(f"   {market:<12} ${notional:>16,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+PUSH SERVER
+Server-Sent Events channel that broadcasts every newly appended NAV point and
+every ranking change, so open dashboards stay current without re-downloading
+the histories.
+
+Each event is serialized once into a shared fan-out ring buffer; subscribers
+only keep a cursor into it (and resume from Last-Event-ID after a reconnect).
+
+Runs inside the collector daemon (python collector_daemon.py --push-port 8766)
+or as a companion that watches the live-data files the hourly updaters write:
+
+    python push_server.py --port 8766 --watch-interval 10
+
+    GET /events   ->  event: nav       data: {"strategy": id, "points": [...]}
+                      event: rankings  data: {"rankings": [...]}
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import history_store
+
+# ========== CONFIG ==========
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+BUFFER_SIZE = 1024             # Events kept for slow / reconnecting subscribers
+HEARTBEAT_SECONDS = 15         # Comment line that keeps idle connections open
+DEFAULT_WATCH_INTERVAL = 10    # Seconds between live-data file checks (companion mode)
+
+# ========== FAN-OUT BUFFER ==========
+
+class Broadcaster:
+    """Ring buffer of pre-serialized SSE frames with monotonically increasing ids"""
+
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self.frames = deque(maxlen=buffer_size)
+        self.next_id = 1
+        self.cond = threading.Condition()
+        self.closed = False
+
+    @property
+    def last_id(self):
+        return self.next_id - 1
+
+    def publish(self, event, payload):
+        """Serialize once and wake every subscriber"""
+        data = json.dumps(payload, separators=(',', ':'))
+        with self.cond:
+            frame = f"id: {self.next_id}\nevent: {event}\ndata: {data}\n\n".encode()
+            self.frames.append(frame)
+            self.next_id += 1
+            self.cond.notify_all()
+
+    def read(self, after, timeout):
+        """Frames with id > after, waiting up to timeout for new ones. Returns (frames, cursor)"""
+        with self.cond:
+            if self.last_id <= after and not self.closed:
+                self.cond.wait(timeout)
+            first_id = self.next_id - len(self.frames)
+            # A subscriber that fell behind the buffer resumes at the oldest frame kept
+            start = max(after + 1, first_id) - first_id
+            frames = [self.frames[i] for i in range(start, len(self.frames))]
+            return frames, self.last_id
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+# ========== EVENT SOURCES ==========
+
+class RankingTracker:
+    """Publishes the SRS ranking whenever the order or a score changes"""
+
+    def __init__(self, broadcaster, output_dir=None):
+        self.broadcaster = broadcaster
+        self.output_dir = output_dir
+        self.last = None
+
+    def check(self):
+        from query_api import rankings_payload
+        payload = rankings_payload(self.output_dir)
+        signature = [(r['id'], r['srs']) for r in payload['rankings']]
+        if signature != self.last:
+            if self.last is not None:
+                self.broadcaster.publish('rankings', payload)
+            self.last = signature
+
+
+class PushHub:
+    """Turns appended points into nav events (and ranking checks)"""
+
+    def __init__(self, broadcaster, output_dir=None):
+        self.broadcaster = broadcaster
+        self.rankings = RankingTracker(broadcaster, output_dir)
+        try:
+            self.rankings.check()
+        except Exception as e:
+            print(f"⚠️  Could not compute initial rankings: {e}")
+
+    def on_points(self, strategy, new_points):
+        """Collector daemon listener: listener(strategy, new_points)"""
+        if not new_points:
+            return
+        self.broadcaster.publish('nav', {'strategy': strategy['id'], 'points': new_points})
+        try:
+            self.rankings.check()
+        except Exception as e:
+            print(f"⚠️  Ranking check failed: {e}")
+
+
+class HistoryWatcher:
+    """Companion mode: diff live-data files on change and push the new tail"""
+
+    def __init__(self, hub, output_dir=None):
+        self.hub = hub
+        self.directory = history_store.live_data_path('x', output_dir).parent
+        self.versions = {}
+        self.last_epoch = {}
+        self.poll(publish=False)
+
+    def poll(self, publish=True):
+        for path in sorted(Path(self.directory).glob('live-data-*.json')):
+            strategy_id = path.name[len('live-data-'):-len('.json')]
+            try:
+                stat = path.stat()
+                version = (stat.st_mtime_ns, stat.st_size)
+                if self.versions.get(strategy_id) == version:
+                    continue
+                with open(path, 'r') as f:
+                    points = json.load(f).get(strategy_id, {}).get('liveData', [])
+            except (OSError, ValueError) as e:
+                print(f"⚠️  {path.name}: {e}")
+                continue
+            self.versions[strategy_id] = version
+            last = self.last_epoch.get(strategy_id)
+            new_points = [p for p in points if last is None or history_store.point_epoch(p) > last]
+            if points:
+                self.last_epoch[strategy_id] = max(history_store.point_epoch(p) for p in points)
+            if publish and last is not None and new_points:
+                self.hub.on_points({'id': strategy_id}, new_points)
+
+    def run(self, interval, stop_event):
+        while not stop_event.wait(interval):
+            self.poll()
+
+# ========== SERVER ==========
+
+class PushHandler(BaseHTTPRequestHandler):
+    server_version = "SentquantPush/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/events':
+            body = b'{"error": "not found"}'
+            self.send_response(404)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        broadcaster = self.server.broadcaster
+        try:
+            cursor = int(self.headers.get('Last-Event-ID'))
+        except (TypeError, ValueError):
+            cursor = broadcaster.last_id  # New subscribers only get events from now on
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.server.subscribers += 1
+        try:
+            self.wfile.write(b"retry: 5000\n\n")
+            self.wfile.flush()
+            while not broadcaster.closed:
+                frames, cursor = broadcaster.read(cursor, HEARTBEAT_SECONDS)
+                self.wfile.write(b''.join(frames) if frames else b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.subscribers -= 1
+
+
+class PushServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, broadcaster, verbose=False):
+        super().__init__(address, PushHandler)
+        self.broadcaster = broadcaster
+        self.subscribers = 0
+        self.verbose = verbose
+
+
+def start_push_server(host=DEFAULT_HOST, port=DEFAULT_PORT, output_dir=None, verbose=False):
+    """Serve /events in a background thread. Returns (server, hub)"""
+    broadcaster = Broadcaster()
+    hub = PushHub(broadcaster, output_dir)
+    server = PushServer((host, port), broadcaster, verbose)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, hub
+
+
+def main():
+    """Companion mode: watch live-data files and push what the updaters append"""
+    parser = argparse.ArgumentParser(description="SSE push channel for NAV points and rankings")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    parser.add_argument('--watch-interval', type=float, default=DEFAULT_WATCH_INTERVAL)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    server, hub = start_push_server(args.host, args.port, args.data_dir, args.verbose)
+    watcher = HistoryWatcher(hub, args.data_dir)
+    print(f"📡 Push server on http://{args.host}:{args.port}/events  "
+          f"(watching {watcher.directory} every {args.watch_interval:.0f}s)")
+
+    stop_event = threading.Event()
+    started = time.time()
+    try:
+        watcher.run(args.watch_interval, stop_event)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.broadcaster.close()
+        server.shutdown()
+        server.server_close()
+    print(f"\n✅ Stopped after {time.time() - started:.0f}s: {server.broadcaster.last_id} events published")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+QUERY API
+Small local read API over the history store, so chart zooms and third-party
+consumers can pull a slice of a NAV history instead of the whole
+live-data-<id>.json:
+
+    GET /strategies
+    GET /nav/<id>?from=2025-06-01&to=2025-07-01&resolution=auto
+    GET /rankings
+
+'from' / 'to' accept unix seconds or ISO dates/timestamps (UTC). 'resolution'
+is raw, 1h, 1d or auto (finest one that fits in MAX_POINTS); rollups keep the
+last point of each bucket. Files are reloaded when they change, ranges are
+bisected on the time index (time_index.py) and hot responses are kept in an
+LRU with ETag / If-None-Match support.
+
+    python query_api.py --port 8767
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import history_store
+import time_index
+
+# ========== CONFIG ==========
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8767
+MAX_POINTS = 1000              # 'auto' picks the finest resolution under this
+CACHE_ENTRIES = 256            # Responses kept in the LRU
+RESOLUTIONS = {'raw': None, '1h': 3600, '1d': 86400}
+STRATEGY_ID = re.compile(r'^[a-z0-9_]+$')
+
+# ========== INDEX ==========
+
+class NavIndex:
+    """One strategy's liveData plus its time index"""
+
+    def __init__(self, strategy_id, document, version, index_dir=None):
+        self.strategy_id = strategy_id
+        self.version = version
+        strategy_data = document.get(strategy_id, {})
+        self.tvl = strategy_data.get('tvl', 0)
+        self.status = strategy_data.get('status', 'Offline')
+        self.points = strategy_data.get('liveData', [])
+        self.index = time_index.load_index(strategy_id, self.points, index_dir or time_index.INDEX_DIR)
+
+    def __len__(self):
+        return len(self.points)
+
+    def positions(self, resolution, start, end):
+        """Index positions in [start, end] at a resolution (rollups = last point per bucket)"""
+        bucket = RESOLUTIONS[resolution]
+        if bucket is None:
+            return range(*self.index.span(start, end))
+        return self.index.bucket_positions(bucket, start, end)
+
+    def pick_resolution(self, start, end, max_points=MAX_POINTS):
+        """Finest resolution whose range fits in max_points"""
+        for name in RESOLUTIONS:
+            if len(self.positions(name, start, end)) <= max_points:
+                return name
+        return list(RESOLUTIONS)[-1]
+
+    def query(self, start=None, end=None, resolution='auto'):
+        if resolution == 'auto':
+            resolution = self.pick_resolution(start, end)
+        offsets = self.index.offsets
+        return resolution, [self.points[offsets[p]] for p in self.positions(resolution, start, end)]
+
+    def first_last(self):
+        if not self.points:
+            return None, None
+        offsets = self.index.offsets
+        return self.points[offsets[0]], self.points[offsets[-1]]
+
+
+class HistoryIndex:
+    """Lazily (re)builds a NavIndex when a live-data file's mtime or size changes"""
+
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def strategy_ids(self):
+        directory = history_store.live_data_path('x', self.output_dir).parent
+        ids = []
+        for name in sorted(os.listdir(directory)) if directory.exists() else []:
+            if name.startswith('live-data-') and name.endswith('.json'):
+                ids.append(name[len('live-data-'):-len('.json')])
+        return ids
+
+    def get(self, strategy_id):
+        """Current NavIndex, or None if the strategy has no file"""
+        path = history_store.live_data_path(strategy_id, self.output_dir)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            index = self.indexes.get(strategy_id)
+            if index is None or index.version != version:
+                with open(path, 'r') as f:
+                    index = NavIndex(strategy_id, json.load(f), version,
+                                     time_index.index_root(self.output_dir))
+                self.indexes[strategy_id] = index
+            return index
+
+    def version(self):
+        """Combined version of every file (changes when any history does)"""
+        return tuple((sid, self.get(sid).version) for sid in self.strategy_ids())
+
+
+class ResponseCache:
+    """LRU of serialized bodies keyed by (request, data version)"""
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body):
+        """Store a body and return (body, etag)"""
+        entry = (body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+# ========== QUERIES ==========
+
+class BadRequest(ValueError):
+    """Invalid query parameters (HTTP 400); any other failure is a server error"""
+
+
+def finite(value):
+    """float, or None for NaN / infinity (not valid JSON)"""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def parse_time(value, end=False):
+    """Unix seconds or ISO date/timestamp -> unix seconds (date-only 'to' = end of day)"""
+    if value is None or value == '':
+        return None
+    if re.fullmatch(r'-?\d+(\.\d+)?', value):
+        return int(float(value))
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    epoch = int(parsed.timestamp())
+    if end and len(value) == 10:
+        epoch += 86400 - 1
+    return epoch
+
+
+def nav_payload(index, params):
+    resolution = params.get('resolution', 'auto')
+    if resolution != 'auto' and resolution not in RESOLUTIONS:
+        raise BadRequest(f"resolution must be auto or one of {', '.join(RESOLUTIONS)}")
+    try:
+        start = parse_time(params.get('from'))
+        end = parse_time(params.get('to'), end=True)
+    except ValueError as e:
+        raise BadRequest(f"invalid time: {e}")
+    resolution, points = index.query(start, end, resolution)
+    return {
+        'strategy': index.strategy_id,
+        'resolution': resolution,
+        'from': start,
+        'to': end,
+        'count': len(points),
+        'tvl': index.tvl,
+        'status': index.status,
+        'points': points,
+    }
+
+
+def strategies_payload(history):
+    strategies = []
+    for strategy_id in history.strategy_ids():
+        index = history.get(strategy_id)
+        first, last = index.first_last()
+        strategies.append({
+            'id': strategy_id,
+            'points': len(index),
+            'first': first.get('timestamp', first['date']) if first else None,
+            'last': last.get('timestamp', last['date']) if last else None,
+            'status': index.status,
+        })
+    return {'strategies': strategies}
+
+
+def rankings_payload(output_dir=None):
+    """SRS ranking as computed by srs_real.py (without touching App.jsx)"""
+    import srs_real
+    base_path = str(history_store.live_data_path('x', output_dir).parent)
+    ranked = srs_real.score_results(srs_real.load_raw_results(base_path=base_path))
+    return {'rankings': [
+        {
+            'rank': rank,
+            'id': r['id'],
+            'name': r['name'],
+            'srs': r['srs'],
+            'roi': finite(r['roi']),
+            'sortino': finite(r['sortino']),
+            'calmar': finite(r['calmar']),
+            'stability': finite(r['stability']),
+            'history_len': r['history_len'],
+            'new_entry': r['history_len'] < srs_real.MIN_DATA_POINTS,
+        }
+        for rank, r in enumerate(ranked, 1)
+    ]}
+
+# ========== SERVER ==========
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = "SentquantQuery/1.0"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split('/') if p]
+        try:
+            if parts == ['strategies']:
+                version = self.server.history.version()
+                build = lambda: strategies_payload(self.server.history)
+            elif parts == ['rankings']:
+                version = self.server.history.version()
+                build = lambda: rankings_payload(self.server.history.output_dir)
+            elif len(parts) == 2 and parts[0] == 'nav' and STRATEGY_ID.match(parts[1]):
+                index = self.server.history.get(parts[1])
+                if index is None:
+                    return self.send_json(404, {'error': f"unknown strategy: {parts[1]}"})
+                version = index.version
+                build = lambda: nav_payload(index, params)
+            else:
+                return self.send_json(404, {'error': 'not found'})
+
+            key = (url.path, tuple(sorted(params.items())), version)
+            entry = self.server.cache.get(key)
+            if entry is None:
+                body = json.dumps(build(), separators=(',', ':')).encode()
+                entry = self.server.cache.put(key, body)
+        except BadRequest as e:
+            return self.send_json(400, {'error': str(e)})
+        except Exception as e:
+            print(f"❌ {url.path}: {e}")
+            return self.send_json(500, {'error': 'internal error'})
+
+        body, etag = entry
+        if etag in (self.headers.get('If-None-Match') or ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_common_headers()
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_common_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_common_headers(self):
+        self.send_header('Cache-Control', 'no-cache')  # Always revalidate via ETag
+        self.send_header('Access-Control-Allow-Origin', '*')
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_common_headers()
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class QueryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, output_dir=None, cache_entries=CACHE_ENTRIES, verbose=False):
+        super().__init__(address, QueryHandler)
+        self.history = HistoryIndex(output_dir)
+        self.cache = ResponseCache(cache_entries)
+        self.verbose = verbose
+
+
+def main():
+    """Serve the query API until interrupted"""
+    parser = argparse.ArgumentParser(description="Local read API over the NAV history store")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    parser.add_argument('--cache-entries', type=int, default=CACHE_ENTRIES)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    server = QueryServer((args.host, args.port), args.data_dir, args.cache_entries, args.verbose)
+    print(f"🔎 Query API on http://{args.host}:{args.port}  (data: {args.data_dir or history_store.OUTPUT_DIR})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(f"\n✅ Stopped. Cache: {server.cache.hits} hits, {server.cache.misses} misses")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
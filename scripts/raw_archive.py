@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+RAW ARCHIVE
+Append-only, content-addressed archive of the raw venue payloads the
+updaters derive their numbers from, so history can be recomputed when a
+formula changes (calculate_metrics runs on the archived payload as it did live).
+
+Layout per strategy and UTC year, both files append-only:
+
+    store/raw/<strategy>/<YYYY>.blobs   blob records, each
+        MAGIC | codec u8 | depth u8 | sha256 | base_offset u64 | raw_len u32 | data_len u32 | data
+    store/raw/<strategy>/<YYYY>.idx     (epoch i64, blob offset u64) per snapshot
+
+A snapshot whose canonical JSON hashes to a blob already in the segment only
+adds an index entry. New blobs are zlib-compressed with the previous blob as
+preset dictionary (consecutive polls differ by a few numbers), restarting
+from a plain keyframe every KEYFRAME_EVERY blobs so a read never chains far.
+Reading a year is one sequential pass over both files.
+
+    python raw_archive.py --report
+    python raw_archive.py --scan --strategy systemic_hyper --since 2026-01-01
+    python raw_archive.py --recompute --strategy sentquant
+    python raw_archive.py --benchmark 8760
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+RAW_DIR = STORE_DIR / "raw"
+
+MAGIC = b'SQR1'
+HEADER = struct.Struct('<4sBB32sQII')
+ENTRY = struct.Struct('<qQ')
+NO_BASE = 2 ** 64 - 1
+CODEC_ZLIB = 1
+KEYFRAME_EVERY = 32
+LEVEL = 9
+# Payload kind archived for each venue
+VENUE_KINDS = {
+    'lighter': 'lighter.account',
+    'hyperliquid': 'hyperliquid.clearinghouseState',
+    'drift': 'drift.accounts',
+}
+
+# ========== ENCODING ==========
+
+def canonical(kind, payload):
+    """Stable bytes of a snapshot: equal payloads hash equal whatever their key order"""
+    return json.dumps({'kind': kind, 'payload': payload}, sort_keys=True, separators=(',', ':')).encode()
+
+
+def epoch_of(when):
+    # Naive datetimes are UTC, as in history_store
+    return int(when.replace(tzinfo=timezone.utc).timestamp()) if when.tzinfo is None else int(when.timestamp())
+
+
+def segment_paths(strategy_id, year, root=RAW_DIR):
+    base = Path(root) / strategy_id / str(year)
+    return base.with_suffix('.blobs'), base.with_suffix('.idx')
+
+
+class BlobReader:
+    """Decodes blobs of one segment held in memory, caching recent raw bytes for delta chains"""
+
+    CACHE = 64
+
+    def __init__(self, data):
+        self.data = data
+        self.cache = {}
+
+    def header(self, offset):
+        magic, codec, depth, digest, base, raw_len, data_len = HEADER.unpack_from(self.data, offset)
+        if magic != MAGIC:
+            raise ValueError(f"bad blob header at {offset}")
+        return codec, depth, digest, base, raw_len, data_len
+
+    def raw(self, offset):
+        if offset in self.cache:
+            return self.cache[offset]
+        codec, _, _, base, raw_len, data_len = self.header(offset)
+        if codec != CODEC_ZLIB:
+            raise ValueError(f"unknown codec {codec} at {offset}")
+        start = offset + HEADER.size
+        if base == NO_BASE:
+            decoder = zlib.decompressobj()
+        else:
+            decoder = zlib.decompressobj(zdict=self.raw(base))
+        raw = decoder.decompress(self.data[start:start + data_len]) + decoder.flush()
+        if len(self.cache) >= self.CACHE:
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[offset] = raw
+        return raw
+
+    def blobs(self):
+        """(offset, depth, digest) of every complete blob, in file order"""
+        offset = 0
+        while offset + HEADER.size <= len(self.data):
+            _, depth, digest, _, _, data_len = self.header(offset)
+            if offset + HEADER.size + data_len > len(self.data):
+                break  # Torn write at the tail
+            yield offset, depth, digest
+            offset += HEADER.size + data_len
+
+
+def read_entries(idx_path):
+    """(epochs, offsets) arrays of a segment index (a torn tail entry is ignored)"""
+    epochs, offsets = array('q'), array('q')
+    try:
+        with open(idx_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return epochs, offsets
+    for epoch, offset in ENTRY.iter_unpack(data[:len(data) - len(data) % ENTRY.size]):
+        epochs.append(epoch)
+        offsets.append(offset)
+    return epochs, offsets
+
+# ========== WRITER ==========
+
+class Segment:
+    """Append side of one strategy-year segment"""
+
+    def __init__(self, strategy_id, year, root=RAW_DIR):
+        self.blobs_path, self.idx_path = segment_paths(strategy_id, year, root)
+        self.blobs_path.parent.mkdir(parents=True, exist_ok=True)
+        data = self.blobs_path.read_bytes() if self.blobs_path.exists() else b''
+        self.reader = BlobReader(bytearray(data))
+        self.known = {}
+        self.last = None  # (offset, depth) of the newest blob
+        self.end = 0
+        for offset, depth, digest in self.reader.blobs():
+            self.known[digest] = offset
+            self.last = (offset, depth)
+            self.end = offset + HEADER.size + self.reader.header(offset)[5]
+
+    def append(self, epoch, raw):
+        """Index one snapshot; returns (offset, deduplicated)"""
+        digest = hashlib.sha256(raw).digest()
+        offset = self.known.get(digest)
+        deduplicated = offset is not None
+        if not deduplicated:
+            offset = self._write_blob(digest, raw)
+        with open(self.idx_path, 'ab') as f:
+            f.write(ENTRY.pack(epoch, offset))
+        return offset, deduplicated
+
+    def _write_blob(self, digest, raw):
+        if self.last and self.last[1] + 1 < KEYFRAME_EVERY:
+            base, depth = self.last[0], self.last[1] + 1
+            encoder = zlib.compressobj(LEVEL, zdict=self.reader.raw(base))
+        else:
+            base, depth = NO_BASE, 0
+            encoder = zlib.compressobj(LEVEL)
+        data = encoder.compress(raw) + encoder.flush()
+        record = HEADER.pack(MAGIC, CODEC_ZLIB, depth, digest, base, len(raw), len(data)) + data
+        with open(self.blobs_path, 'r+b' if self.blobs_path.exists() else 'wb') as f:
+            # Overwrite a torn tail, if any, rather than appending after it
+            f.seek(self.end)
+            f.write(record)
+            f.truncate()
+        offset = self.end
+        del self.reader.data[offset:]
+        self.reader.data += record
+        self.reader.cache[offset] = raw
+        self.known[digest] = offset
+        self.last = (offset, depth)
+        self.end = offset + len(record)
+        return offset
+
+
+def append_snapshots(strategy_id, snapshots, root=RAW_DIR):
+    """Archive [(when, kind, payload), ...], opening each year's segment once; returns [(offset, deduplicated)]"""
+    segments, results = {}, []
+    for when, kind, payload in snapshots:
+        if when.year not in segments:
+            segments[when.year] = Segment(strategy_id, when.year, root)
+        results.append(segments[when.year].append(epoch_of(when), canonical(kind, payload)))
+    return results
+
+
+def append_snapshot(strategy_id, when, kind, payload, root=RAW_DIR):
+    """Archive one raw payload taken at `when`; returns (offset, deduplicated)"""
+    return append_snapshots(strategy_id, [(when, kind, payload)], root)[0]
+
+
+def capture_snapshot(strategy_id, when, kind, payload):
+    """Updater hook: archiving never fails an update"""
+    try:
+        _, deduplicated = append_snapshot(strategy_id, when, kind, payload)
+        print(f"🗄️  Archived raw {kind}{' (duplicate)' if deduplicated else ''}")
+    except Exception as e:
+        print(f"⚠️  Could not archive raw snapshot: {e}")
+
+# ========== READER ==========
+
+def segment_years(strategy_id, root=RAW_DIR):
+    directory = Path(root) / strategy_id
+    return sorted(int(p.stem) for p in directory.glob('*.idx') if p.stem.isdigit())
+
+
+def scan(strategy_id, start=None, end=None, root=RAW_DIR, verify=False):
+    """Yield (epoch, kind, payload) for snapshots with start <= epoch <= end, in time order"""
+    for year in segment_years(strategy_id, root):
+        if start is not None and year < datetime.fromtimestamp(start, timezone.utc).year:
+            continue
+        if end is not None and year > datetime.fromtimestamp(end, timezone.utc).year:
+            continue
+        blobs_path, idx_path = segment_paths(strategy_id, year, root)
+        epochs, offsets = read_entries(idx_path)
+        order = range(len(epochs))
+        if any(epochs[i] > epochs[i + 1] for i in range(len(epochs) - 1)):
+            order = sorted(order, key=epochs.__getitem__)
+            epochs = array('q', (epochs[i] for i in order))
+            offsets = array('q', (offsets[i] for i in order))
+        lo = 0 if start is None else bisect_left(epochs, start)
+        hi = len(epochs) if end is None else bisect_right(epochs, end)
+        if lo >= hi:
+            continue
+        reader = BlobReader(blobs_path.read_bytes())
+        for i in range(lo, hi):
+            raw = reader.raw(offsets[i])
+            if verify and hashlib.sha256(raw).digest() != reader.header(offsets[i])[2]:
+                raise ValueError(f"{blobs_path}: hash mismatch at {offsets[i]}")
+            snapshot = json.loads(raw)
+            yield epochs[i], snapshot['kind'], snapshot['payload']
+
+
+def metrics_reader(strategy):
+    """payload -> metrics ({'tvl', ...}) the way the strategy's updater derives them from a live read"""
+    if strategy['venue'] == 'drift':
+        import drift_reader
+
+        def drift_metrics(payload):
+            net_equity, rows = drift_reader.equity_from_accounts(payload['user'], payload['accounts'])
+            return {'tvl': net_equity, 'positions_count': len(rows), 'status': 'Live'}
+        return drift_metrics
+    from strategies import load_updater
+    return load_updater(strategy).calculate_metrics
+
+
+def segment_report(strategy_id, year, root=RAW_DIR):
+    blobs_path, idx_path = segment_paths(strategy_id, year, root)
+    epochs, _ = read_entries(idx_path)
+    reader = BlobReader(blobs_path.read_bytes() if blobs_path.exists() else b'')
+    blobs = list(reader.blobs())
+    raw_bytes = sum(reader.header(offset)[4] for offset, _, _ in blobs)
+    stored = (blobs_path.stat().st_size if blobs_path.exists() else 0) + idx_path.stat().st_size
+    return {'strategy': strategy_id, 'year': year, 'snapshots': len(epochs), 'blobs': len(blobs),
+            'raw_bytes': raw_bytes, 'stored_bytes': stored}
+
+# ========== CLI ==========
+
+def parse_day(value):
+    return None if value is None else epoch_of(datetime.fromisoformat(value))
+
+
+def synthetic_payloads(count, seed=7):
+    """Hyperliquid-shaped clearinghouseState payloads drifting a little per poll"""
+    import random
+    rng = random.Random(seed)
+    coins = ['BTC', 'ETH', 'SOL', 'HYPE', 'ARB', 'DOGE', 'AVAX', 'LINK']
+    prices = {c: rng.uniform(1, 60000) for c in coins}
+    previous = None
+    for i in range(count):
+        # Every tenth poll nothing moved, like a quiet account
+        if previous and i % 10 == 9:
+            yield previous
+            continue
+        for c in coins:
+            prices[c] *= 1 + rng.gauss(0, 0.004)
+        positions = [{'type': 'oneWay', 'position': {
+            'coin': c, 'szi': f"{(k + 1) * 0.37:.4f}", 'entryPx': f"{prices[c] * 0.98:.2f}",
+            'positionValue': f"{(k + 1) * 0.37 * prices[c]:.2f}",
+            'unrealizedPnl': f"{(k + 1) * 0.37 * prices[c] * 0.02:.2f}",
+            'leverage': {'type': 'cross', 'value': 5}, 'liquidationPx': None,
+            'marginUsed': f"{(k + 1) * 0.37 * prices[c] / 5:.2f}", 'returnOnEquity': '0.1',
+            'maxLeverage': 50, 'cumFunding': {'allTime': '1.0', 'sinceOpen': '0.5', 'sinceChange': '0.1'},
+        }} for k, c in enumerate(coins)]
+        value = sum(float(p['position']['positionValue']) for p in positions) / 3
+        previous = {
+            'marginSummary': {'accountValue': f"{value:.2f}", 'totalNtlPos': f"{value * 3:.2f}",
+                              'totalRawUsd': f"{value:.2f}", 'totalMarginUsed': f"{value / 5:.2f}"},
+            'crossMaintenanceMarginUsed': f"{value / 50:.2f}",
+            'withdrawable': f"{value * 0.4:.2f}",
+            'assetPositions': positions,
+            'time': 1_700_000_000_000 + i * 3_600_000,
+        }
+        yield previous
+
+
+def benchmark(count):
+    """One synthetic strategy-year of hourly polls: size and scan speed"""
+    root = Path(tempfile.mkdtemp(prefix='raw-archive-'))
+    try:
+        start = datetime(2026, 1, 1)
+        segment = Segment('synthetic', 2026, root)
+        raw_total, started = 0, time.time()
+        for i, payload in enumerate(synthetic_payloads(count)):
+            raw = canonical(VENUE_KINDS['hyperliquid'], payload)
+            raw_total += len(raw)
+            segment.append(epoch_of(start) + i * 3600, raw)
+        write_seconds = time.time() - started
+        report = segment_report('synthetic', 2026, root)
+        started = time.time()
+        scanned = sum(1 for _ in scan('synthetic', root=root, verify=True))
+        scan_seconds = time.time() - started
+        print(f"📦 {count:,} snapshots: raw {raw_total / 1e6:.1f} MB → stored {report['stored_bytes'] / 1e6:.2f} MB "
+              f"({raw_total / report['stored_bytes']:.0f}x, {report['stored_bytes'] / count:.0f} B/snapshot, "
+              f"{report['blobs']:,} unique blobs)")
+        print(f"✍️  append {count / write_seconds:,.0f} snapshots/s")
+        print(f"📖 scan   {scanned / scan_seconds:,.0f} snapshots/s (verified, JSON decoded)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """Report, scan or recompute archived raw payloads"""
+    parser = argparse.ArgumentParser(description="Content-addressed raw venue snapshot archive")
+    parser.add_argument('--report', action='store_true', help="size of every strategy-year segment")
+    parser.add_argument('--scan', action='store_true', help="decode every snapshot in range (speed check)")
+    parser.add_argument('--recompute', action='store_true',
+                        help="rerun the updater's calculate_metrics on archived payloads")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all archived)")
+    parser.add_argument('--since', help="YYYY-MM-DD[ HH:MM:SS] (UTC)")
+    parser.add_argument('--until', help="YYYY-MM-DD[ HH:MM:SS] (UTC)")
+    parser.add_argument('--verify', action='store_true', help="check every blob against its hash")
+    parser.add_argument('--benchmark', type=int, metavar='N', help="synthetic year of N hourly polls")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return 0
+
+    strategy_ids = args.strategy or sorted(p.name for p in RAW_DIR.glob('*') if p.is_dir())
+    start, end = parse_day(args.since), parse_day(args.until)
+
+    if args.report or not (args.scan or args.recompute):
+        print(f"{'STRATEGY':<16} {'YEAR':>4} {'SNAPSHOTS':>9} {'BLOBS':>7} {'RAW':>10} {'STORED':>10}")
+        for strategy_id in strategy_ids:
+            for year in segment_years(strategy_id):
+                r = segment_report(strategy_id, year)
+                print(f"{strategy_id:<16} {year:>4} {r['snapshots']:>9,} {r['blobs']:>7,} "
+                      f"{r['raw_bytes'] / 1024:>8.0f}KB {r['stored_bytes'] / 1024:>8.0f}KB")
+        return 0
+
+    for strategy_id in strategy_ids:
+        calculate = None
+        if args.recompute:
+            from strategies import get_strategy
+            calculate = metrics_reader(get_strategy(strategy_id))
+        started, count, first, last = time.time(), 0, None, None
+        for epoch, kind, payload in scan(strategy_id, start, end, verify=args.verify):
+            count += 1
+            if calculate:
+                metrics = calculate(payload)
+                first = first or (epoch, metrics)
+                last = (epoch, metrics)
+        elapsed = time.time() - started
+        print(f"📖 {strategy_id}: {count:,} snapshots in {elapsed:.2f}s ({count / elapsed if elapsed else 0:,.0f}/s)")
+        if first:
+            for label, (epoch, metrics) in (('first', first), ('last', last)):
+                when = datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"   {label:<5} {when}  TVL {metrics['tvl']:,.2f}" if metrics else f"   {label:<5} {when}  -")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
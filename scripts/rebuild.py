@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+REBUILD
+Re-derive every strategy's outputs from its stored inputs with the current
+NAV / drawdown / metric logic, one strategy per worker process, instead of
+fixing appended files by hand after a formula change.
+
+    inputs   archived raw venue snapshots (store/raw/<id>/, metrics recomputed
+             with raw_archive.metrics_reader) where they exist, otherwise the
+             collateral / TVL series already stored in liveData
+    logic    the updater's own calculate_nav and START_NAV, Hyperliquid flows
+             from the local ledger (store/ledger/) when it has been synced,
+             running-peak drawdown, the registry's rounding
+    outputs  live-data-<id>.rebuilt.json and equity-historical-<id>.rebuilt.json
+             next to the originals, each written atomically
+
+Points are replayed in file order (the order the updaters appended them), so
+NAV chains across the same steps it did live. Backfilled points keep their
+values. equity-historical rows that copied a live point are re-derived from
+that point; rows from before live tracking are kept. Nothing is replaced
+until --apply, which renames the rebuilt files over the originals.
+
+    python rebuild.py                         # every strategy, diff summary only
+    python rebuild.py --strategy systemicls --no-raw
+    python rebuild.py --apply
+"""
+
+import argparse
+import json
+import os
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import history_store
+import raw_archive
+import time_index
+from strategies import STRATEGIES, get_strategy, load_updater
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+LEDGER_DIR = STORE_DIR / "ledger"
+REBUILT_SUFFIX = ".rebuilt.json"
+RAW_MATCH_SECONDS = 120   # A snapshot belongs to the stored point polled within this many seconds
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+# ========== PATHS ==========
+
+def output_paths(strategy_id, data_dir=None):
+    """{original: rebuilt} for the files a strategy's updater maintains"""
+    live_path = history_store.live_data_path(strategy_id, data_dir)
+    historical_path = live_path.with_name(f"equity-historical-{strategy_id}.json")
+    return {path: path.with_name(path.name[:-len('.json')] + REBUILT_SUFFIX)
+            for path in (live_path, historical_path)}
+
+
+def load_json(path, default):
+    if not path.exists():
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# ========== INPUTS ==========
+
+def ledger_flows(strategy):
+    """flows_between(start, end) over the synced ledger of a Hyperliquid wallet, or None"""
+    if strategy['venue'] != 'hyperliquid':
+        return None
+    import hyperliquid_ledger
+    wallet = getattr(load_updater(strategy), strategy['account_attr'])
+    store = hyperliquid_ledger.LedgerStore(wallet, LEDGER_DIR)
+    store.load_flows()
+    return store.flows_between if store.flow_times else None
+
+
+def raw_metrics(strategy, raw_root):
+    """[(epoch, metrics)] recomputed from every archived snapshot, time order"""
+    calculate = None
+    samples = []
+    for epoch, _, payload in raw_archive.scan(strategy['id'], root=raw_root):
+        calculate = calculate or raw_archive.metrics_reader(strategy)
+        metrics = calculate(payload)
+        if metrics:
+            samples.append((epoch, metrics))
+    return samples
+
+
+def timeline(strategy, points, samples):
+    """
+    [(stored index or None, epoch, tvl, pnl)] in replay order: every stored
+    point, with metrics from the snapshot polled with it when one was archived,
+    then snapshots newer than the last stored point
+    """
+    tvl_key = strategy.get('tvl_key', 'tvl')
+    pnl_metric = strategy.get('pnl_metric')
+    epochs = [history_store.point_epoch(p) for p in points]
+    by_time = sorted(range(len(points)), key=epochs.__getitem__)
+    sorted_epochs = [epochs[i] for i in by_time]
+
+    last_epoch = max(epochs, default=None)
+    matched, unmatched = {}, 0
+    for epoch, metrics in samples:
+        lo = bisect_left(sorted_epochs, epoch - RAW_MATCH_SECONDS)
+        hi = bisect_right(sorted_epochs, epoch + RAW_MATCH_SECONDS)
+        candidates = [by_time[k] for k in range(lo, hi) if by_time[k] not in matched]
+        if candidates:
+            matched[min(candidates, key=lambda i: abs(epochs[i] - epoch))] = metrics
+        elif last_epoch is None or epoch > last_epoch:
+            matched[('new', epoch)] = metrics
+        else:
+            unmatched += 1
+
+    steps = []
+    for i, point in enumerate(points):
+        if i in matched:
+            metrics = matched[i]
+            steps.append((i, epochs[i], metrics['tvl'], metrics.get(pnl_metric, 0) if pnl_metric else None))
+        else:
+            steps.append((i, epochs[i], point.get(tvl_key), point.get('pnl')))
+    for key in sorted((k for k in matched if isinstance(k, tuple)), key=lambda k: k[1]):
+        metrics = matched[key]
+        steps.append((None, key[1], metrics['tvl'], metrics.get(pnl_metric, 0) if pnl_metric else None))
+    return steps, len(matched), unmatched
+
+# ========== REPLAY ==========
+
+def replay(strategy, points, steps, flows_between=None):
+    """Chain NAV and running-peak drawdown over the steps; returns the new liveData"""
+    updater = load_updater(strategy)
+    calculate_nav = updater.calculate_nav
+    start_nav = getattr(updater, 'START_NAV', history_store.START_NAV)
+    tvl_key = strategy.get('tvl_key', 'tvl')
+    decimals = strategy.get('nav_decimals')
+    tvl_decimals = strategy.get('tvl_decimals')
+    drawdown_decimals = strategy.get('drawdown_decimals')
+
+    rebuilt, previous, peak = [], None, None
+    for index, epoch, tvl, pnl in steps:
+        old = points[index] if index is not None else None
+        if old is not None and old.get('backfill'):
+            point = dict(old)  # Reconstructed from venue history, not from a poll
+        else:
+            if tvl is None:
+                tvl = previous[1] if previous else 0
+            if tvl_decimals is not None:
+                tvl = round(tvl, tvl_decimals)
+            if previous is None:
+                nav = calculate_nav(start_nav, tvl, tvl)
+            elif flows_between:
+                nav = history_store.flow_adjusted_nav(previous[0], previous[1], tvl,
+                                                      flows_between(previous[2], epoch), previous[2], epoch)
+            else:
+                nav = calculate_nav(previous[0], previous[1], tvl)
+            value = round(nav, decimals) if decimals is not None else nav
+            previous = (value, tvl, epoch)
+            if old is None:
+                when = datetime.fromtimestamp(epoch, timezone.utc)
+                point = {"date": when.date().isoformat(), "timestamp": when.strftime("%Y-%m-%d %H:%M:%S"),
+                         "year": when.year, "value": value, tvl_key: tvl}
+            else:
+                point = dict(old)
+                point['value'] = value
+                point[tvl_key] = tvl
+            if strategy.get('pnl_metric') and pnl is not None:
+                point['pnl'] = pnl
+        peak = point['value'] if peak is None else max(peak, point['value'])
+        drawdown = ((point['value'] - peak) / peak) * 100 if peak > 0 else 0
+        point['drawdown'] = round(drawdown, drawdown_decimals) if drawdown_decimals is not None else drawdown
+        rebuilt.append(point)
+    return rebuilt
+
+
+def remap_historical(rows, old_points, new_points):
+    """equity-historical rows that copied a live point take that point's rebuilt value and drawdown"""
+    queues = defaultdict(list)
+    for old, new in zip(old_points, new_points):
+        queues[(old['date'], old['value'])].append(new)
+    cursors = defaultdict(int)
+    remapped, changed = [], 0
+    for row in rows:
+        key = (row['date'], row['value'])
+        if key not in queues:
+            remapped.append(row)
+            continue
+        # Both files are appended in poll order: consume matches in order, repeat the last
+        queue = queues[key]
+        new = queue[min(cursors[key], len(queue) - 1)]
+        cursors[key] += 1
+        updated = {**row, 'value': new['value'], 'drawdown': new['drawdown']}
+        changed += updated != row
+        remapped.append(updated)
+    return remapped, changed
+
+# ========== WORKER ==========
+
+def diff_points(strategy, old_points, new_points):
+    tvl_key = strategy.get('tvl_key', 'tvl')
+    value_changed = tvl_changed = 0
+    max_delta = max_relative = 0.0
+    for old, new in zip(old_points, new_points):
+        delta = abs(new['value'] - old['value'])
+        if delta:
+            value_changed += 1
+            max_delta = max(max_delta, delta)
+            if old['value']:
+                max_relative = max(max_relative, delta / abs(old['value']) * 100)
+        tvl_changed += new.get(tvl_key) != old.get(tvl_key)
+    return {
+        'value_changed': value_changed,
+        'tvl_changed': tvl_changed,
+        'max_delta': max_delta,
+        'max_relative': max_relative,
+        'last': (old_points[-1]['value'] if old_points else None, new_points[-1]['value'] if new_points else None),
+        'max_drawdown': (min((p['drawdown'] for p in old_points), default=None),
+                         min((p['drawdown'] for p in new_points), default=None)),
+    }
+
+
+def rebuild_strategy(strategy_id, data_dir=None, raw_root=raw_archive.RAW_DIR, use_raw=True, use_ledger=True):
+    """Rebuild one strategy and write its .rebuilt.json files; returns the diff summary"""
+    started = time.time()
+    strategy = get_strategy(strategy_id)
+    paths = output_paths(strategy_id, data_dir)
+    live_path, historical_path = paths
+
+    document = history_store.load_history(strategy_id, data_dir)
+    strategy_data = document.get(strategy_id, {"liveData": [], "tvl": 0, "status": "Offline"})
+    old_points = strategy_data.get('liveData', [])
+    samples = raw_metrics(strategy, raw_root) if use_raw else []
+    steps, from_raw, unmatched = timeline(strategy, old_points, samples)
+    flows_between = ledger_flows(strategy) if use_ledger else None
+    new_points = replay(strategy, old_points, steps, flows_between)
+
+    tvl_key = strategy.get('tvl_key', 'tvl')
+    rebuilt = {**document, strategy_id: {**strategy_data, 'liveData': new_points}}
+    if new_points:
+        rebuilt[strategy_id]['tvl'] = new_points[-1].get(tvl_key, strategy_data.get('tvl', 0))
+    summary = {
+        'strategy': strategy_id,
+        'points': (len(old_points), len(new_points)),
+        'from_raw': from_raw,
+        'unmatched_raw': unmatched,
+        'ledger': flows_between is not None,
+        'written': [],
+        **diff_points(strategy, old_points, new_points),
+    }
+    if not new_points:
+        summary['seconds'] = time.time() - started
+        return summary
+    history_store.write_json_atomic(paths[live_path], rebuilt)
+    summary['written'].append(str(live_path))
+
+    if historical_path.exists():
+        rows = load_json(historical_path, [])
+        remapped, changed = remap_historical(rows, old_points, new_points)
+        history_store.write_json_atomic(paths[historical_path], remapped)
+        summary['written'].append(str(historical_path))
+        summary['historical'] = (changed, len(rows))
+    summary['seconds'] = time.time() - started
+    return summary
+
+
+def apply_rebuilt(strategy_id, written, data_dir=None):
+    """Rename rebuilt files over the originals and reindex the new liveData"""
+    paths = output_paths(strategy_id, data_dir)
+    for original in written:
+        os.replace(paths[Path(original)], original)
+    points = history_store.load_history(strategy_id, data_dir).get(strategy_id, {}).get('liveData', [])
+    time_index.save_index(strategy_id, time_index.TimeIndex.from_points(points), time_index.index_root(data_dir))
+
+# ========== CLI ==========
+
+def print_summary(s):
+    old_count, new_count = s['points']
+    old_last, new_last = s['last']
+    old_dd, new_dd = s['max_drawdown']
+    sources = f"{s['from_raw']:,} from raw" + (f", {s['unmatched_raw']:,} raw unmatched" if s['unmatched_raw'] else "")
+    print(f"🔁 {s['strategy']}: {old_count:,} -> {new_count:,} points ({sources}"
+          f"{', ledger flows' if s['ledger'] else ''}) in {s['seconds']:.2f}s")
+    if not new_count:
+        print("   nothing to rebuild")
+        return
+    print(f"   NAV changed on {s['value_changed']:,} points (max |Δ| {s['max_delta']:,.4f}, "
+          f"{s['max_relative']:.4f}%), TVL on {s['tvl_changed']:,}")
+    if old_last is not None:
+        print(f"   last NAV {old_last:,.4f} -> {new_last:,.4f}   max DD {old_dd:.2f}% -> {new_dd:.2f}%")
+    if 'historical' in s:
+        changed, total = s['historical']
+        print(f"   equity-historical: {changed:,} of {total:,} rows changed")
+
+
+def main():
+    """Rebuild strategies in parallel and print what changed"""
+    parser = argparse.ArgumentParser(description="Re-derive live-data / equity-historical from stored inputs")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all)")
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--no-raw', action='store_true', help="ignore archived snapshots, replay stored series only")
+    parser.add_argument('--no-ledger', action='store_true', help="no Hyperliquid flow adjustment")
+    parser.add_argument('--apply', action='store_true', help="replace the originals with the rebuilt files")
+    args = parser.parse_args()
+
+    strategy_ids = args.strategy or [s['id'] for s in STRATEGIES]
+    for strategy_id in strategy_ids:
+        get_strategy(strategy_id)
+
+    print("="*70)
+    print(f"🔁 REBUILD {len(strategy_ids)} strategies on {min(args.workers, len(strategy_ids))} workers")
+    print("="*70)
+    started = time.time()
+    summaries, failed = {}, []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(strategy_ids)))) as pool:
+        futures = {pool.submit(rebuild_strategy, strategy_id, args.data_dir, raw_archive.RAW_DIR,
+                               not args.no_raw, not args.no_ledger): strategy_id
+                   for strategy_id in strategy_ids}
+        for future in as_completed(futures):
+            try:
+                summaries[futures[future]] = future.result()
+            except Exception as e:
+                print(f"❌ {futures[future]}: {e}")
+                failed.append(futures[future])
+
+    for strategy_id in strategy_ids:
+        if strategy_id in summaries:
+            print_summary(summaries[strategy_id])
+    print(f"⏱️  Rebuilt {len(summaries)} strategies in {time.time() - started:.2f}s")
+
+    if args.apply:
+        for strategy_id, summary in summaries.items():
+            if summary['written']:
+                apply_rebuilt(strategy_id, summary['written'], args.data_dir)
+                print(f"💾 {strategy_id}: applied {len(summary['written'])} files")
+    elif any(s['written'] for s in summaries.values()):
+        print(f"📝 Review the *{REBUILT_SUFFIX} files, then rerun with --apply")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
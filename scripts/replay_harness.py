@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+ACCELERATED REPLAY HARNESS
+Drives the real update_live_data path for N simulated hours per strategy using
+an injectable clock and synthetic (or recorded) account snapshots, then reports
+throughput, file size and per-update latency as the history grows.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import mock_venue_server
+from strategies import STRATEGIES, get_strategy, load_updater
+
+# ========== CONFIG ==========
+DEFAULT_START = "2025-01-01 00:00:00"
+DEFAULT_HOURS = 720  # One month of hourly updates
+SYNTHETIC_VENUES = ('lighter', 'hyperliquid')  # Venues the mock server can synthesise
+
+# ========== CLOCK & SNAPSHOTS ==========
+
+class SimulatedClock:
+    """Clock that only moves when told to"""
+
+    def __init__(self, start, step=timedelta(hours=1)):
+        self.current = start
+        self.step = step
+
+    def now(self):
+        return self.current
+
+    def advance(self):
+        self.current += self.step
+        return self.current
+
+
+def synthetic_snapshots(strategy, hours, start):
+    """Account payloads in venue format, one per simulated hour"""
+    tick0 = int(start.timestamp() // mock_venue_server.TICK_SECONDS)
+    ticks_per_hour = 3600 // mock_venue_server.TICK_SECONDS
+    key = strategy['id']
+    for hour in range(hours):
+        tick = tick0 + hour * ticks_per_hour
+        if strategy['venue'] == 'lighter':
+            yield mock_venue_server.lighter_account(key, tick)['accounts'][0]
+        else:
+            yield mock_venue_server.hyperliquid_clearinghouse_state(key, tick)
+
+
+def recorded_snapshots(path, strategy_id):
+    """Recorded payloads from a JSONL file of {"strategy", "payload"} lines"""
+    with open(path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('strategy') == strategy_id:
+                yield record['payload']
+
+# ========== REPLAY ==========
+
+def loglog_slope(x0, y0, x1, y1):
+    """Growth exponent between two (size, latency) samples: ~1 linear, ~2 quadratic"""
+    if min(x0, y0, x1, y1) <= 0 or x0 == x1:
+        return 0.0
+    return math.log(y1 / y0) / math.log(x1 / x0)
+
+
+def replay_strategy(strategy, snapshots, clock, output_dir, report_every):
+    """Feed snapshots through the updater, sampling cost as history grows"""
+    module = load_updater(strategy)
+    module.OUTPUT_DIR = output_dir
+    live_path = output_dir / f"live-data-{strategy['id']}.json"
+
+    checkpoints = []
+    window = []
+    updates = 0
+    start = time.perf_counter()
+
+    for snapshot in snapshots:
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            metrics = module.calculate_metrics(snapshot)
+            if metrics:
+                module.update_live_data(metrics, now=clock.now())
+                if hasattr(module, 'update_historical_data'):
+                    module.update_historical_data(metrics)
+            window.append(time.perf_counter() - t0)
+        clock.advance()
+        updates += 1
+
+        if updates % report_every == 0:
+            checkpoints.append({
+                'points': updates,
+                'file_kb': live_path.stat().st_size / 1024 if live_path.exists() else 0,
+                'mean_ms': sum(window) / len(window) * 1000,
+                'max_ms': max(window) * 1000,
+            })
+            window = []
+
+    elapsed = time.perf_counter() - start
+    return {
+        'strategy': strategy['id'],
+        'updates': updates,
+        'elapsed': elapsed,
+        'throughput': updates / elapsed if elapsed > 0 else 0,
+        'checkpoints': checkpoints,
+    }
+
+
+def print_report(result):
+    """Per-strategy growth table"""
+    print(f"\n📈 {result['strategy']}: {result['updates']} updates in {result['elapsed']:.2f}s "
+          f"({result['throughput']:.1f} simulated updates/s)")
+    print(f"   {'POINTS':>8} | {'FILE':>10} | {'MEAN':>10} | {'MAX':>10}")
+    for c in result['checkpoints']:
+        print(f"   {c['points']:>8} | {c['file_kb']:>8.1f}KB | {c['mean_ms']:>8.2f}ms | {c['max_ms']:>8.2f}ms")
+
+    cps = result['checkpoints']
+    if len(cps) >= 2:
+        slope = loglog_slope(cps[0]['points'], cps[0]['mean_ms'], cps[-1]['points'], cps[-1]['mean_ms'])
+        flag = "⚠️  super-linear" if slope > 1.3 else "✅ ok"
+        print(f"   Per-update cost grows ~ n^{slope:.2f} with history size  {flag}")
+
+
+def main():
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Replay simulated hours through the real update path")
+    parser.add_argument('--hours', type=int, default=DEFAULT_HOURS, help="simulated hourly updates per strategy")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all)")
+    parser.add_argument('--start', default=DEFAULT_START, help="simulated start time")
+    parser.add_argument('--snapshots', help="JSONL of recorded {strategy, payload} snapshots")
+    parser.add_argument('--report-every', type=int, default=0, help="checkpoint interval in updates")
+    parser.add_argument('--output-dir', help="keep generated files here instead of a temp dir")
+    args = parser.parse_args()
+
+    if args.strategy:
+        strategies = [get_strategy(s) for s in args.strategy]
+    else:
+        strategies = [s for s in STRATEGIES if s['venue'] in SYNTHETIC_VENUES]
+    start = datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S")
+    report_every = args.report_every or max(1, args.hours // 10)
+
+    print("="*70)
+    print("⏩ ACCELERATED REPLAY HARNESS")
+    print("="*70)
+    print(f"Strategies: {', '.join(s['id'] for s in strategies)}")
+    print(f"Simulated:  {args.hours} hours from {args.start}")
+    print(f"Source:     {args.snapshots or 'synthetic'}")
+
+    with contextlib.ExitStack() as stack:
+        if args.output_dir:
+            output_dir = Path(args.output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            output_dir = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+
+        for strategy in strategies:
+            if args.snapshots:
+                snapshots = itertools.islice(recorded_snapshots(args.snapshots, strategy['id']), args.hours)
+            else:
+                snapshots = synthetic_snapshots(strategy, args.hours, start)
+            clock = SimulatedClock(start)
+            result = replay_strategy(strategy, snapshots, clock, output_dir, report_every)
+            print_report(result)
+
+    print()
+    print("="*70)
+    print("✅ REPLAY COMPLETED")
+    print("="*70)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
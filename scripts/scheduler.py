@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+ADAPTIVE SCHEDULER
+Polling interval per strategy for the collector daemon, so requests go where a
+finer resolution actually changes the NAV / drawdown picture:
+
+    volatility  time-decayed variance of returns per second (EWMA, seeded
+                from the liveData NAV); the interval is chosen so one poll
+                interval spans about TARGET_MOVE_PCT of expected move. Live
+                returns are TVL changes net of ledger flows (with --ledger);
+                a single return is capped at JUMP_SIGMAS of the current
+                estimate, so an unrecorded deposit cannot buy a burst of polls
+    exposure    open notional / TVL sets a volatility floor, so a strategy that
+                just opened leverage is not polled as if it were flat
+    status      Offline, or no open positions and no recent volatility, polls
+                at the maximum interval
+
+Intervals are clamped to [min, max] and then fitted to a request budget per
+venue (requests per hour across all its strategies): when the wanted rates do
+not fit, every strategy not already at the maximum is slowed by the same factor.
+
+    python collector_daemon.py --adaptive --budget lighter=240 --budget hyperliquid=600
+    python scheduler.py --plan                 # intervals the history alone implies
+"""
+
+import argparse
+import math
+from collections import defaultdict
+from datetime import timezone
+
+import history_store
+from strategies import STRATEGIES, get_strategy
+
+# ========== CONFIG ==========
+MIN_INTERVAL = 30               # Seconds
+MAX_INTERVAL = 3600             # Never poll less often than the hourly cron did
+TARGET_MOVE_PCT = 0.5           # Expected |return| between two polls
+HALF_LIFE = 6 * 3600            # Seconds for an old return to lose half its weight
+EXPOSURE_DAILY_VOL_PCT = 3.0    # Assumed daily vol per unit of notional / TVL
+JUMP_SIGMAS = 4                 # Largest live return folded in, in current standard deviations
+HISTORY_POINTS = 500            # liveData points used to seed the estimate
+DEFAULT_BUDGETS = {'lighter': 240, 'hyperliquid': 600}  # Requests per hour per venue
+NOTIONAL_METRICS = ('ntl_pos', 'position_value')        # Hyperliquid, Lighter
+
+# ========== ESTIMATE ==========
+
+class Activity:
+    """Running state of one strategy: last level, variance per second, exposure, status"""
+
+    def __init__(self):
+        self.epoch = None
+        self.level = None
+        self.variance = None  # Return variance per second
+        self.exposure = None  # |notional| / TVL
+        self.positions = None
+        self.status = None
+
+    def add(self, epoch, level, flow=0.0, cap=None):
+        """
+        Fold one return into the variance, weighting by the time since the last
+        level. `flow` (deposits +, withdrawals -) is not part of the return.
+        """
+        if self.level is not None and self.level > 0 and level - flow > 0 and epoch > self.epoch:
+            dt = epoch - self.epoch
+            sample = math.log((level - flow) / self.level) ** 2 / dt
+            if cap is not None:
+                sample = min(sample, cap)
+            weight = 1 - 0.5 ** (dt / HALF_LIFE)
+            self.variance = sample if self.variance is None else self.variance + weight * (sample - self.variance)
+        if self.epoch is None or epoch >= self.epoch:
+            self.epoch, self.level = epoch, level
+
+    def observe(self, epoch, metrics, flow=0.0):
+        self.status = metrics.get('status', self.status)
+        self.positions = metrics.get('positions_count', self.positions)
+        notional = next((metrics[k] for k in NOTIONAL_METRICS if metrics.get(k) is not None), None)
+        if notional is not None and metrics['tvl'] > 0:
+            self.exposure = abs(notional) / metrics['tvl']
+        elif self.positions is not None:
+            self.exposure = 1.0 if self.positions else 0.0
+        # A flat account has no variance to scale, so an unexplained TVL jump adds nothing
+        cap = JUMP_SIGMAS ** 2 * max(self.variance or 0, self.variance_floor())
+        self.add(epoch, metrics['tvl'], flow, cap)
+
+    def variance_floor(self):
+        """Variance per second implied by the open exposure alone"""
+        return (self.exposure or 0) ** 2 * (EXPOSURE_DAILY_VOL_PCT / 100) ** 2 / 86400
+
+
+def wanted_interval(activity, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+    """Interval in which the expected move reaches TARGET_MOVE_PCT, clamped to the bounds"""
+    if activity.status == 'Offline':
+        return max_interval
+    variance = max(activity.variance or 0, activity.variance_floor())
+    if variance <= 0:
+        return max_interval
+    return min(max_interval, max(min_interval, (TARGET_MOVE_PCT / 100) ** 2 / variance))
+
+
+def fit_budget(wanted, budget, max_interval=MAX_INTERVAL, costs=None):
+    """
+    Slow {id: interval} down until sum(cost * 3600 / interval) <= budget.
+    Strategies pushed to max_interval drop out and the rest share what is left.
+    """
+    costs = costs or {}
+    rate = {k: costs.get(k, 1) * 3600 / v for k, v in wanted.items()}
+    floor = {k: costs.get(k, 1) * 3600 / max_interval for k in wanted}
+    capped = {k for k, v in wanted.items() if v >= max_interval}
+    while True:
+        free = [k for k in rate if k not in capped]
+        remaining = budget - sum(floor[k] for k in capped)
+        total = sum(rate[k] for k in free)
+        if total <= remaining or not free:
+            break
+        scale = max(remaining, 0) / total
+        newly = [k for k in free if rate[k] * scale <= floor[k]]
+        if not newly:
+            for k in free:
+                rate[k] *= scale
+            break
+        for k in newly:
+            rate[k] = floor[k]
+            capped.add(k)
+    return {k: min(max_interval, costs.get(k, 1) * 3600 / rate[k]) for k in wanted}
+
+# ========== SCHEDULER ==========
+
+class AdaptiveScheduler:
+    """Per-strategy intervals, refitted to the venue budget after every observation"""
+
+    def __init__(self, strategies, budgets=None, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 costs=None, verbose=True):
+        self.strategies = {s['id']: s for s in strategies}
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.costs = costs or {}  # Requests per poll (e.g. 2 with a ledger sync)
+        self.verbose = verbose
+        self.activity = defaultdict(Activity)
+        self.intervals = {}
+
+    def seed(self, output_dir=None):
+        """Variance and status from the stored history (NAV, so flows do not count as moves)"""
+        for strategy_id in self.strategies:
+            data = history_store.load_history(strategy_id, output_dir).get(strategy_id, {})
+            activity = self.activity[strategy_id]
+            for point in data.get('liveData', [])[-HISTORY_POINTS:]:
+                activity.add(history_store.point_epoch(point), point['value'])
+            activity.status = data.get('status')
+            activity.epoch = activity.level = None  # Live levels are TVL, not NAV
+        for venue in {s['venue'] for s in self.strategies.values()}:
+            self.refit(venue)
+
+    def observe(self, strategy_id, when, metrics, flows_between=None):
+        """
+        Fold a polled sample in and refit its venue. flows_between(start, end)
+        -> [(unix seconds, amount)] nets deposits / withdrawals out of the return.
+        """
+        epoch = when.replace(tzinfo=timezone.utc).timestamp() if when.tzinfo is None else when.timestamp()
+        activity = self.activity[strategy_id]
+        flow = 0.0
+        if flows_between and activity.epoch is not None:
+            flow = sum(amount for _, amount in flows_between(activity.epoch, epoch))
+        activity.observe(epoch, metrics, flow)
+        self.refit(self.strategies[strategy_id]['venue'])
+
+    def refit(self, venue):
+        ids = [k for k, s in self.strategies.items() if s['venue'] == venue]
+        wanted = {k: wanted_interval(self.activity[k], self.min_interval, self.max_interval) for k in ids}
+        budget = self.budgets.get(venue)
+        fitted = fit_budget(wanted, budget, self.max_interval, self.costs) if budget else wanted
+        for strategy_id, interval in fitted.items():
+            previous = self.intervals.get(strategy_id)
+            self.intervals[strategy_id] = interval
+            # Log real changes only, not every small drift of the estimate
+            if self.verbose and (previous is None or abs(interval - previous) > 0.25 * previous):
+                print(f"⏲️  {strategy_id}: poll every {interval:.0f}s ({self.describe(strategy_id)})")
+
+    def interval_for(self, strategy_id):
+        return self.intervals.get(strategy_id, self.max_interval)
+
+    def describe(self, strategy_id):
+        a = self.activity[strategy_id]
+        vol = f"{math.sqrt(a.variance * 86400) * 100:.2f}%/day" if a.variance is not None else "-"
+        exposure = f"{a.exposure:.2f}x" if a.exposure is not None else "-"
+        return f"vol {vol}, exposure {exposure}, {a.status or 'unknown'}"
+
+    def requests_per_hour(self, venue):
+        return sum(self.costs.get(k, 1) * 3600 / self.interval_for(k)
+                   for k, s in self.strategies.items() if s['venue'] == venue)
+
+# ========== CLI ==========
+
+def parse_budgets(values):
+    """['lighter=240'] -> {'lighter': 240.0}"""
+    budgets = {}
+    for value in values or []:
+        venue, _, limit = value.partition('=')
+        budgets[venue] = float(limit)
+    return budgets
+
+
+def main():
+    """Print the schedule the stored history implies"""
+    parser = argparse.ArgumentParser(description="Adaptive polling intervals per strategy")
+    parser.add_argument('--plan', action='store_true', help="intervals from history (default)")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all)")
+    parser.add_argument('--budget', action='append', metavar='VENUE=N', help="requests per hour per venue")
+    parser.add_argument('--min-interval', type=float, default=MIN_INTERVAL)
+    parser.add_argument('--max-interval', type=float, default=MAX_INTERVAL)
+    parser.add_argument('--output-dir', help="live-data directory (default: public/data)")
+    args = parser.parse_args()
+
+    strategies = [get_strategy(s) for s in args.strategy] if args.strategy else STRATEGIES
+    scheduler = AdaptiveScheduler(strategies, parse_budgets(args.budget), args.min_interval,
+                                  args.max_interval, verbose=False)
+    scheduler.seed(args.output_dir)
+
+    print(f"{'STRATEGY':<16} {'VENUE':<12} {'INTERVAL':>9}  ACTIVITY")
+    for strategy in strategies:
+        print(f"{strategy['id']:<16} {strategy['venue']:<12} {scheduler.interval_for(strategy['id']):>8.0f}s  "
+              f"{scheduler.describe(strategy['id'])}")
+    for venue in sorted({s['venue'] for s in strategies}):
+        budget = scheduler.budgets.get(venue)
+        print(f"📊 {venue}: {scheduler.requests_per_hour(venue):.0f} requests/h"
+              + (f" (budget {budget:.0f})" if budget else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+SRS BOOTSTRAP
+Uncertainty around the SRS ranking from srs_real.py. Each agent's return
+series is resampled with a moving block bootstrap (blocks keep the
+autocorrelation), the four components and the SRS are recomputed for every
+resample in vectorized batches spread over a ProcessPoolExecutor, and the
+result is a distribution of scores and ranks per agent.
+
+    python srs_bootstrap.py --resamples 10000 --block 24
+    python srs_bootstrap.py --synthetic-agents 100 --resamples 10000   # CI budget check
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import history_store
+import srs_real
+from nav_model import NavSeries
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+OUTPUT_PATH = STORE_DIR / "analytics" / "srs-bootstrap.json"
+DEFAULT_RESAMPLES = 10000
+DEFAULT_BLOCK = 24             # Block length in points (one day of hourly polls)
+BATCH = 250                    # Resamples per worker task
+CONFIDENCE = 0.95
+
+# ========== COMPONENTS ==========
+
+def components(returns):
+    """ROI, Sortino, Calmar and stability for a (B, T) batch of return paths (srs_real rules)"""
+    growth = np.cumprod(1 + returns, axis=1)
+    roi = growth[:, -1] - 1
+
+    mean = returns.mean(axis=1)
+    negative = returns < 0
+    count = negative.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        neg_mean = np.where(negative, returns, 0).sum(axis=1) / count
+        neg_var = np.where(negative, (returns - neg_mean[:, None]) ** 2, 0).sum(axis=1) / count
+        downside = np.where(count > 0, np.sqrt(neg_var), 0.0001)
+        sortino = np.where(downside > 0, mean / downside, 0)
+
+    # Drawdown on the NAV path including its starting value (1.0)
+    peak = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    mdd = np.maximum(((peak - growth) / peak).max(axis=1), 0.0001)
+    calmar = roi / mdd
+
+    with np.errstate(divide='ignore'):
+        stability = 1 / returns.std(axis=1)
+    return np.stack([roi, sortino, calmar, stability], axis=1)
+
+
+def block_indexes(rng, length, block, resamples):
+    """(resamples, length) indexes of a moving block bootstrap"""
+    block = max(1, min(block, length))
+    blocks = -(-length // block)
+    starts = rng.integers(0, length - block + 1, size=(resamples, blocks))
+    return (starts[:, :, None] + np.arange(block)).reshape(resamples, -1)[:, :length]
+
+
+def srs_scores(matrix, history_lens, weights=srs_real.SRS_WEIGHTS):
+    """(..., A, 4) components -> (..., A) internal scores, normalized across agents"""
+    low = matrix.min(axis=-2, keepdims=True)
+    high = matrix.max(axis=-2, keepdims=True)
+    normalized = (matrix - low) / (high - low + 1e-9)
+    scores = normalized @ np.asarray(weights)
+    return np.where(np.asarray(history_lens) < srs_real.MIN_DATA_POINTS,
+                    scores * srs_real.NEW_ENTRY_PENALTY, scores)
+
+# ========== WORKERS ==========
+
+_SERIES = None
+
+
+def _init_worker(series):
+    global _SERIES
+    _SERIES = series
+
+
+def bootstrap_batch(seed, resamples, block):
+    """(resamples, A, 4) components for one batch, every agent resampled independently"""
+    rng = np.random.default_rng(seed)
+    out = np.zeros((resamples, len(_SERIES), 4))
+    for a, returns in enumerate(_SERIES):
+        if len(returns) == 0:
+            continue  # srs_real scores agents with < 2 points as all zeros
+        out[:, a] = components(returns[block_indexes(rng, len(returns), block, resamples)])
+    return out
+
+
+def run_bootstrap(series, resamples, block, workers=None, seed=0):
+    """(resamples, A, 4) component matrix, computed in batches across processes"""
+    sizes = [min(BATCH, resamples - start) for start in range(0, resamples, BATCH)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(series,)) as pool:
+        batches = list(pool.map(bootstrap_batch, seeds, sizes, [block] * len(sizes)))
+    return np.concatenate(batches)
+
+# ========== REPORT ==========
+
+def summarize(agents, history_lens, point_scores, matrix):
+    scores = srs_scores(matrix, history_lens)
+    srs = (100 + scores * 900).astype(int)
+    # Rank 1 = best; ties broken by agent order
+    ranks = np.argsort(np.argsort(-scores, axis=1, kind='stable'), axis=1) + 1
+    tail = (1 - CONFIDENCE) / 2 * 100
+    summary = []
+    for a, agent in enumerate(agents):
+        rank_counts = np.bincount(ranks[:, a], minlength=len(agents) + 1)[1:]
+        summary.append({
+            'id': agent['id'],
+            'name': agent['name'],
+            'srs': int(100 + point_scores[a] * 900),
+            'srs_median': int(np.median(srs[:, a])),
+            'srs_ci': [int(np.percentile(srs[:, a], tail)), int(np.percentile(srs[:, a], 100 - tail))],
+            'rank_median': int(np.median(ranks[:, a])),
+            'rank_ci': [int(np.percentile(ranks[:, a], tail)), int(np.percentile(ranks[:, a], 100 - tail))],
+            'rank_probabilities': [round(c / len(ranks), 4) for c in rank_counts],
+        })
+    return sorted(summary, key=lambda s: (s['rank_median'], -s['srs_median']))
+
+
+def load_agents(base_path=srs_real.BASE_PATH):
+    """Agents with a live-data file and their return series (same inputs as srs_real)"""
+    agents, series = [], []
+    for agent in srs_real.AGENTS:
+        path = os.path.join(base_path, f'live-data-{agent["id"]}.json')
+        if not os.path.exists(path):
+            continue
+        agents.append(agent)
+        series.append(NavSeries.load(agent['id'], base_path).returns())
+    return agents, series
+
+
+def synthetic_agents(count, length, seed=0):
+    rng = np.random.default_rng(seed)
+    agents = [{'id': f'synthetic_{i:03}', 'name': f'Synthetic {i:03}'} for i in range(count)]
+    series = [rng.normal(rng.uniform(-2e-4, 4e-4), rng.uniform(1e-3, 1e-2), length) for _ in range(count)]
+    return agents, series
+
+
+def main():
+    """Bootstrap the SRS ranking and report rank distributions"""
+    parser = argparse.ArgumentParser(description="Block-bootstrap confidence intervals for SRS and ranks")
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES)
+    parser.add_argument('--block', type=int, default=DEFAULT_BLOCK, help="block length in points")
+    parser.add_argument('--workers', type=int, help="processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--synthetic-agents', type=int, help="benchmark on N random agents instead")
+    parser.add_argument('--synthetic-length', type=int, default=2000)
+    parser.add_argument('--output', default=str(OUTPUT_PATH))
+    args = parser.parse_args()
+
+    if args.synthetic_agents:
+        agents, series = synthetic_agents(args.synthetic_agents, args.synthetic_length, args.seed)
+    else:
+        agents, series = load_agents()
+    history_lens = [len(r) + 1 if len(r) else 0 for r in series]
+    point = np.array([components(r[None, :])[0] if len(r) else np.zeros(4) for r in series])
+    point_scores = srs_scores(point, history_lens)
+
+    started = time.time()
+    matrix = run_bootstrap(series, args.resamples, args.block, args.workers, args.seed)
+    summary = summarize(agents, history_lens, point_scores, matrix)
+    elapsed = time.time() - started
+
+    history_store.write_json_atomic(args.output, {
+        'resamples': args.resamples,
+        'block': args.block,
+        'confidence': CONFIDENCE,
+        'agents': summary,
+    }, indent=None)
+
+    print(f"\n{'='*95}")
+    print(f" SRS BOOTSTRAP - {args.resamples} resamples x {len(agents)} agents, block {args.block} "
+          f"({elapsed:.1f}s)")
+    print(f"{'='*95}")
+    print(f"{'AGENT':<20} | {'SRS':>5} | {'MEDIAN':>6} | {'SRS 95% CI':<11} | {'RANK':>4} | {'RANK CI':<8} | {'P(#1)':>6}")
+    print("-" * 95)
+    for s in summary[:30]:
+        print(f"{s['name']:<20} | {s['srs']:>5} | {s['srs_median']:>6} | {s['srs_ci'][0]:>4} - {s['srs_ci'][1]:<4} | "
+              f"{s['rank_median']:>4} | {s['rank_ci'][0]:>2} - {s['rank_ci'][1]:<3} | {s['rank_probabilities'][0]:>6.1%}")
+    print(f"{'='*95}")
+    print(f"💾 Saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,4 +1,5 @@
 import json
+import math
 import numpy as np
 import os
 import re
@@ -11,6 +12,10 @@ APP_JSX_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'App.jsx')
 
 # Minimal data points (hari/update) agar tidak kena pinalti pendatang baru
 MIN_DATA_POINTS = 7 
+NEW_ENTRY_PENALTY = 0.2
+
+# Bobot komponen SRS (ROI, Sortino, Calmar, Stability)
+SRS_WEIGHTS = (0.3, 0.3, 0.3, 0.1)
 
 AGENTS = [
     {'id': 'sentquant', 'name': 'Sentquant', 'color': '#f3f4f5'},
@@ -49,94 +54,115 @@ def calculate_metrics(navs):
 # ==========================================
 # 2. DATA PROCESSING & RISK ENGINE
 # ==========================================
-raw_results = []
-for agent in AGENTS:
-    file_path = os.path.join(BASE_PATH, f'live-data-{agent["id"]}.json')
-    if not os.path.exists(file_path): continue
-        
-    with open(file_path, 'r') as f:
-        data = json.load(f)
-        history = data[agent['id']]['liveData']
-        nav_history = [h['value'] for h in history]
-        
-        roi, sort, calm, stab = calculate_metrics(nav_history)
-        
-        raw_results.append({
-            **agent, 
-            'roi': roi, 
-            'sortino': sort, 
-            'calmar': calm, 
-            'stability': stab,
-            'history_len': len(nav_history)
-        })
+def load_raw_results(agents=AGENTS, base_path=BASE_PATH):
+    raw_results = []
+    for agent in agents:
+        file_path = os.path.join(base_path, f'live-data-{agent["id"]}.json')
+        if not os.path.exists(file_path): continue
+            
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+            history = data[agent['id']]['liveData']
+            nav_history = [h['value'] for h in history]
+            
+            roi, sort, calm, stab = calculate_metrics(nav_history)
+            
+            raw_results.append({
+                **agent, 
+                'roi': roi, 
+                'sortino': sort, 
+                'calmar': calm, 
+                'stability': stab,
+                'history_len': len(nav_history)
+            })
+    return raw_results
 
 # Normalisasi Min-Max
 def norm(key, dataset):
-    vals = [d[key] for d in dataset]
-    v_min, v_max = min(vals), max(vals)
-    return [(v - v_min) / (v_max - v_min + 1e-9) for v in vals]
-
-n_roi = norm('roi', raw_results)
-n_sort = norm('sortino', raw_results)
-n_calm = norm('calmar', raw_results)
-n_stab = norm('stability', raw_results)
+    # Komponen tidak terhingga (mis. volatilitas 0 pada history datar) dapat nilai 0
+    vals = [float(d[key]) for d in dataset]
+    finite = [v for v in vals if math.isfinite(v)] or [0.0]
+    v_min, v_max = min(finite), max(finite)
+    return [(v - v_min) / (v_max - v_min + 1e-9) if math.isfinite(v) else 0.0 for v in vals]
 
 # ==========================================
 # 3. SRS SYNTHESIS & TIE-BREAKER LOGIC
 # ==========================================
-for i, res in enumerate(raw_results):
-    # RUMUS DASAR: 30-30-30-10
-    score = (n_roi[i]*0.3) + (n_sort[i]*0.3) + (n_calm[i]*0.3) + (n_stab[i]*0.1)
-    
-    # NEW ENTRY PENALTY:
-    # Jika data kurang dari 7 hari, skor dipangkas 80% agar tidak langsung Rank #1
-    if res['history_len'] < MIN_DATA_POINTS:
-        score *= 0.2
+def score_results(raw_results):
+    if not raw_results: return []
+
+    n_roi = norm('roi', raw_results)
+    n_sort = norm('sortino', raw_results)
+    n_calm = norm('calmar', raw_results)
+    n_stab = norm('stability', raw_results)
+
+    for i, res in enumerate(raw_results):
+        # RUMUS DASAR: 30-30-30-10
+        w_roi, w_sort, w_calm, w_stab = SRS_WEIGHTS
+        score = (n_roi[i]*w_roi) + (n_sort[i]*w_sort) + (n_calm[i]*w_calm) + (n_stab[i]*w_stab)
         
-    res['internal_score'] = score
-    res['srs'] = int(100 + (score * 900))
-
-# SORTING ORDER: 1. SRS Internal (Decimal), 2. ROI, 3. Seniority (History)
-ranked = sorted(
-    raw_results, 
-    key=lambda x: (x['internal_score'], x['roi'], x['history_len']), 
-    reverse=True
-)
+        # NEW ENTRY PENALTY:
+        # Jika data kurang dari 7 hari, skor dipangkas 80% agar tidak langsung Rank #1
+        if res['history_len'] < MIN_DATA_POINTS:
+            score *= NEW_ENTRY_PENALTY
+            
+        if not math.isfinite(score):
+            score = 0.0
+        res['internal_score'] = score
+        res['srs'] = int(100 + (score * 900))
+
+    # SORTING ORDER: 1. SRS Internal (Decimal), 2. ROI, 3. Seniority (History)
+    return sorted(
+        raw_results, 
+        key=lambda x: (x['internal_score'], x['roi'], x['history_len']), 
+        reverse=True
+    )
 
 # ==========================================
 # 4. TERMINAL AUDIT REPORT
 # ==========================================
-print(f"\n{'='*95}")
-print(f" SENTQUANT ALPHA AUDIT - SRS MASTER REPORT")
-print(f"{'='*95}")
-print(f"{'RANK':<5} | {'AGENT':<20} | {'ROI':<8} | {'SORTINO':<8} | {'CALMAR':<8} | {'STAB':<8} | {'SRS':<5}")
-print("-" * 95)
+def print_report(ranked):
+    print(f"\n{'='*95}")
+    print(f" SENTQUANT ALPHA AUDIT - SRS MASTER REPORT")
+    print(f"{'='*95}")
+    print(f"{'RANK':<5} | {'AGENT':<20} | {'ROI':<8} | {'SORTINO':<8} | {'CALMAR':<8} | {'STAB':<8} | {'SRS':<5}")
+    print("-" * 95)
 
-for i, r in enumerate(ranked, 1):
-    status = "*" if r['history_len'] < MIN_DATA_POINTS else " "
-    print(f"#{i:02}{status}  | {r['name']:<20} | {r['roi']*100:>6.2f}% | {r['sortino']:>8.2f} | {r['calmar']:>8.2f} | {r['stability']:>8.2f} | {r['srs']:>5}")
+    for i, r in enumerate(ranked, 1):
+        status = "*" if r['history_len'] < MIN_DATA_POINTS else " "
+        print(f"#{i:02}{status}  | {r['name']:<20} | {r['roi']*100:>6.2f}% | {r['sortino']:>8.2f} | {r['calmar']:>8.2f} | {r['stability']:>8.2f} | {r['srs']:>5}")
 
-print(f"{'='*95}")
-print("(*) New Entry / Insufficient Data Penalty Applied")
+    print(f"{'='*95}")
+    print("(*) New Entry / Insufficient Data Penalty Applied")
 
 # ==========================================
 # 5. AUTO-INJECTION KE APP.JSX
 # ==========================================
-try:
-    with open(APP_JSX_PATH, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    new_config = "const STRATEGIES_CONFIG = [\n"
-    for r in raw_results:
-        # Detect Protocol
-        proto = "Lighter" if "hyper" not in r['id'] and "jlp" not in r['id'] else ("Hyperliquid" if "hyper" in r['id'] else "Drift")
-        new_config += f"  {{ id: '{r['id']}', name: '{r['name']}', protocol: '{proto}', color: '{r['color']}', srs: {r['srs']} }},\n"
-    new_config += "];"
-
-    updated_content = re.sub(r"const STRATEGIES_CONFIG = \[.*?\];", new_config, content, flags=re.DOTALL)
-
-    with open(APP_JSX_PATH, 'w', encoding='utf-8') as f:
-        f.write(updated_content)
-    print("\n🚀 SUCCESS: Rankings & Metrics updated on App.jsx\n")
-except Exception as e:
-    print(f"\n❌ FAILED to inject App.jsx: {e}")
\ No newline at end of file
+def inject_app_jsx(raw_results):
+    try:
+        with open(APP_JSX_PATH, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        new_config = "const STRATEGIES_CONFIG = [\n"
+        for r in raw_results:
+            # Detect Protocol
+            proto = "Lighter" if "hyper" not in r['id'] and "jlp" not in r['id'] else ("Hyperliquid" if "hyper" in r['id'] else "Drift")
+            new_config += f"  {{ id: '{r['id']}', name: '{r['name']}', protocol: '{proto}', color: '{r['color']}', srs: {r['srs']} }},\n"
+        new_config += "];"
+
+        updated_content = re.sub(r"const STRATEGIES_CONFIG = \[.*?\];", new_config, content, flags=re.DOTALL)
+
+        with open(APP_JSX_PATH, 'w', encoding='utf-8') as f:
+            f.write(updated_content)
+        print("\n🚀 SUCCESS: Rankings & Metrics updated on App.jsx\n")
+    except Exception as e:
+        print(f"\n❌ FAILED to inject App.jsx: {e}")
+
+def main():
+    raw_results = load_raw_results()
+    ranked = score_results(raw_results)
+    print_report(ranked)
+    inject_app_jsx(raw_results)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
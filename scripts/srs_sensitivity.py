@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+SRS SENSITIVITY
+How much do the rankings depend on the 0.3/0.3/0.3/0.1 component weights?
+Every weighting on the simplex (ROI, Sortino, Calmar, stability; step
+--step) is scored in one matrix product over the normalized component
+matrix, and each weighting's ranking is compared with the default one
+by Kendall's tau-b.
+
+    python srs_sensitivity.py --step 0.05
+    python srs_sensitivity.py --synthetic-agents 300 --step 0.02   # scale check
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+import history_store
+import srs_real
+from srs_bootstrap import components, synthetic_agents
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+OUTPUT_PATH = STORE_DIR / "analytics" / "srs-sensitivity.json"
+COMPONENTS = ('roi', 'sortino', 'calmar', 'stability')
+DEFAULT_STEP = 0.05
+LISTED = 10                    # Least-concordant weightings listed in the report
+
+# ========== GRID ==========
+
+def simplex_grid(step):
+    """(K, 4) weightings with components in multiples of `step` summing to 1"""
+    n = int(round(1 / step))
+    a, b, c = np.indices((n + 1,) * 3).reshape(3, -1)
+    keep = a + b + c <= n
+    parts = np.stack([a[keep], b[keep], c[keep], n - a[keep] - b[keep] - c[keep]], axis=1)
+    return parts / n
+
+
+def normalized_matrix(raw_results):
+    """(A, 4) min-max normalized components with the new-entry penalty folded in"""
+    matrix = np.array([[r[key] for key in COMPONENTS] for r in raw_results], dtype=float)
+    low, high = matrix.min(axis=0), matrix.max(axis=0)
+    normalized = (matrix - low) / (high - low + 1e-9)
+    # The penalty scales a whole row, so it commutes with the weighting
+    short = np.array([r['history_len'] < srs_real.MIN_DATA_POINTS for r in raw_results])
+    normalized[short] *= srs_real.NEW_ENTRY_PENALTY
+    return normalized
+
+# ========== RANK STABILITY ==========
+
+def dense_ranks(scores):
+    """(A, K) -> 1-based dense ranks per column (ties share a rank) and tied pairs per column"""
+    order = np.argsort(scores, axis=0, kind='stable')
+    ordered = np.take_along_axis(scores, order, axis=0)
+    new = np.ones(scores.shape, dtype=bool)
+    new[1:] = ordered[1:] != ordered[:-1]
+    ranks = np.empty(scores.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.cumsum(new, axis=0), axis=0)
+    # Each element of a tie run pairs with those before it in the run
+    position = np.arange(len(scores))[:, None]
+    run_start = np.maximum.accumulate(np.where(new, position, 0), axis=0)
+    return ranks, (position - run_start).sum(axis=0)
+
+
+class RankCounter:
+    """One Fenwick tree per column over dense ranks, updated for all columns at once"""
+
+    def __init__(self, size, columns):
+        self.size = size
+        self.tree = np.zeros((size + 1, columns), dtype=np.int32)
+        self.columns = np.arange(columns)
+
+    def add(self, ranks):
+        pos, cols = ranks.copy(), self.columns
+        while len(pos):
+            self.tree[pos, cols] += 1
+            pos = pos + (pos & -pos)
+            keep = pos <= self.size
+            pos, cols = pos[keep], cols[keep]
+
+    def count_le(self, ranks):
+        """Inserted ranks <= `ranks`, per column"""
+        total = np.zeros(len(self.columns), dtype=np.int64)
+        pos, cols = ranks.copy(), self.columns
+        while len(pos):
+            total[cols] += self.tree[pos, cols]
+            pos = pos - (pos & -pos)
+            keep = pos > 0
+            pos, cols = pos[keep], cols[keep]
+        return total
+
+
+def kendall_tau(reference, scores):
+    """
+    Kendall tau-b of each column of (A, K) scores against the (A,) reference.
+    Agents are visited best-first by reference, counting for every column how
+    many earlier (better) agents score above / below: O(A log A) per column.
+    """
+    n, columns = scores.shape
+    order = np.argsort(-reference, kind='stable')
+    reference = reference[order]
+    ranks, score_ties = dense_ranks(scores[order])
+    counter = RankCounter(n, columns)
+    concordant = np.zeros(columns)
+    discordant = np.zeros(columns)
+    reference_ties = 0
+    start = 0
+    while start < n:
+        stop = start + 1
+        while stop < n and reference[stop] == reference[start]:
+            stop += 1
+        # Reference ties count in neither direction: query the group before inserting it
+        for i in range(start, stop):
+            at_or_below = counter.count_le(ranks[i])
+            concordant += start - at_or_below
+            discordant += counter.count_le(ranks[i] - 1)
+        for i in range(start, stop):
+            counter.add(ranks[i])
+        reference_ties += (stop - start) * (stop - start - 1) // 2
+        start = stop
+    pairs = n * (n - 1) / 2
+    denominator = np.sqrt((pairs - reference_ties) * (pairs - score_ties))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, (concordant - discordant) / denominator, 0)
+
+
+def ranks_of(scores):
+    """(A, K) scores -> rank of each agent per column (1 = best)"""
+    return np.argsort(np.argsort(-scores, axis=0, kind='stable'), axis=0) + 1
+
+
+def analyze(raw_results, step=DEFAULT_STEP, weights=srs_real.SRS_WEIGHTS):
+    normalized = normalized_matrix(raw_results)
+    grid = simplex_grid(step)
+    scores = normalized @ grid.T
+    reference = normalized @ np.asarray(weights)
+    taus = kendall_tau(reference, scores)
+    ranks = ranks_of(scores)
+    default_ranks = ranks_of(reference[:, None])[:, 0]
+
+    leader = int(np.argmax(reference))
+    worst = np.argsort(taus)[:LISTED]
+    agents = []
+    for a, r in enumerate(raw_results):
+        agents.append({
+            'id': r['id'],
+            'name': r['name'],
+            'rank': int(default_ranks[a]),
+            'rank_best': int(ranks[a].min()),
+            'rank_worst': int(ranks[a].max()),
+            'top_share': round(float(np.mean(ranks[a] == 1)), 4),
+        })
+    return {
+        'step': step,
+        'weightings': len(grid),
+        'default_weights': list(weights),
+        'tau': {
+            'min': round(float(taus.min()), 4),
+            'p05': round(float(np.percentile(taus, 5)), 4),
+            'median': round(float(np.median(taus)), 4),
+            'mean': round(float(taus.mean()), 4),
+        },
+        'same_leader_share': round(float(np.mean(ranks[leader] == 1)), 4),
+        'least_concordant': [{'weights': [round(float(w), 4) for w in grid[k]], 'tau': round(float(taus[k]), 4)}
+                             for k in worst],
+        'agents': sorted(agents, key=lambda s: s['rank']),
+    }
+
+
+def synthetic_results(count, length, seed=0):
+    """Random agents scored like srs_real, for scale checks"""
+    agents, series = synthetic_agents(count, length, seed)
+    return [{**agent, **dict(zip(COMPONENTS, components(returns[None, :])[0])), 'history_len': length + 1}
+            for agent, returns in zip(agents, series)]
+
+
+def main():
+    """Score the whole weight simplex and report rank stability"""
+    parser = argparse.ArgumentParser(description="SRS weight-sensitivity grid search")
+    parser.add_argument('--step', type=float, default=DEFAULT_STEP, help="grid step on each weight")
+    parser.add_argument('--synthetic-agents', type=int, help="benchmark on N random agents instead")
+    parser.add_argument('--synthetic-length', type=int, default=500)
+    parser.add_argument('--output', default=str(OUTPUT_PATH))
+    args = parser.parse_args()
+
+    if args.synthetic_agents:
+        raw_results = synthetic_results(args.synthetic_agents, args.synthetic_length)
+    else:
+        raw_results = srs_real.load_raw_results()
+    if len(raw_results) < 2:
+        print("⚠️ Need at least two agents")
+        return 1
+
+    started = time.time()
+    report = analyze(raw_results, args.step)
+    elapsed = time.time() - started
+    history_store.write_json_atomic(args.output, report, indent=1)
+
+    tau = report['tau']
+    print(f"\n{'='*78}")
+    print(f" SRS SENSITIVITY - {report['weightings']} weightings x {len(raw_results)} agents ({elapsed:.1f}s)")
+    print(f"{'='*78}")
+    print(f"Kendall tau vs {report['default_weights']}: min {tau['min']:.3f} | p5 {tau['p05']:.3f} | "
+          f"median {tau['median']:.3f}")
+    print(f"Default leader stays #1 in {report['same_leader_share']:.1%} of weightings")
+    print(f"\n{'AGENT':<20} | {'RANK':>4} | {'BEST':>4} | {'WORST':>5} | {'#1 SHARE':>8}")
+    print("-" * 78)
+    for s in report['agents'][:30]:
+        print(f"{s['name']:<20} | {s['rank']:>4} | {s['rank_best']:>4} | {s['rank_worst']:>5} | {s['top_share']:>8.1%}")
+    print(f"{'='*78}")
+    print(f"💾 Saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
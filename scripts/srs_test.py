@@ -3,6 +3,8 @@ import math
 import numpy as np
 from datetime import datetime, timedelta
 
+from srs_real import SRS_WEIGHTS
+
 # ==========================================
 # KONFIGURASI MESIN SRS SENTQUANT
 # ==========================================
@@ -95,7 +97,8 @@ n_stab = norm('stability', raw_results)
 # Synthesis & Scoring
 for i, res in enumerate(raw_results):
     # Weighted Internal Score
-    internal = (n_roi[i]*0.3) + (n_sort[i]*0.3) + (n_calm[i]*0.3) + (n_stab[i]*0.1)
+    w_roi, w_sort, w_calm, w_stab = SRS_WEIGHTS
+    internal = (n_roi[i]*w_roi) + (n_sort[i]*w_sort) + (n_calm[i]*w_calm) + (n_stab[i]*w_stab)
     res['internal'] = internal
     res['srs'] = int(100 + (internal * 900))
 
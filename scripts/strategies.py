@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+STRATEGY REGISTRY
+Every collected strategy, the venue it trades on and the updater script that owns it
+"""
+
+import importlib
+
+# ========== CONFIG ==========
+# 'account_attr' names the module-level constant holding the account in each updater.
+# 'tvl_key', 'pnl_metric' and the '*_decimals' rounding describe the liveData schema each updater writes.
+STRATEGIES = [
+    {'id': 'sentquant', 'name': 'Sentquant', 'venue': 'lighter',
+     'module': 'daily_update', 'account_attr': 'ACCOUNT_INDEX',
+     'tvl_key': 'collateral', 'pnl_metric': 'total_pnl', 'nav_decimals': 2,
+     'tvl_decimals': None, 'drawdown_decimals': None},
+    {'id': 'guineapool', 'name': 'Guinea Pool', 'venue': 'lighter',
+     'module': 'fetch_guineapool', 'account_attr': 'ACCOUNT_INDEX',
+     'tvl_key': 'collateral', 'pnl_metric': 'total_pnl', 'nav_decimals': 2,
+     'tvl_decimals': None, 'drawdown_decimals': None},
+    {'id': 'systemic_hyper', 'name': 'Systemic Hyper', 'venue': 'hyperliquid',
+     'module': 'daily_update_hyperliquid', 'account_attr': 'WALLET_ADDRESS',
+     'tvl_key': 'tvl', 'pnl_metric': 'unrealized_pnl', 'nav_decimals': None,
+     'tvl_decimals': None, 'drawdown_decimals': None},
+    {'id': 'systemicls', 'name': 'Systemic L/S', 'venue': 'hyperliquid',
+     'module': 'fetch_systemicls', 'account_attr': 'WALLET_ADDRESS',
+     'tvl_key': 'tvl', 'pnl_metric': 'unrealized_pnl', 'nav_decimals': None,
+     'tvl_decimals': None, 'drawdown_decimals': None},
+    {'id': 'jlp_neutral', 'name': 'JLP Delta Neutral', 'venue': 'drift',
+     'module': 'fetch_jlp_neutral', 'account_attr': 'VAULT_ADDRESS_STR',
+     'tvl_key': 'collateral', 'pnl_metric': None, 'nav_decimals': 2,
+     'tvl_decimals': 2, 'drawdown_decimals': 2},
+]
+
+# ========== FUNCTIONS ==========
+
+def get_strategy(strategy_id):
+    """Look up a registry entry by id"""
+    for strategy in STRATEGIES:
+        if strategy['id'] == strategy_id:
+            return strategy
+    raise KeyError(f"Unknown strategy: {strategy_id}")
+
+
+def load_updater(strategy):
+    """Import the updater module for a strategy (only when it is needed)"""
+    return importlib.import_module(strategy['module'])
+
+
+def strategy_account(strategy):
+    """Account index / wallet the updater is configured for"""
+    return getattr(load_updater(strategy), strategy['account_attr'])
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+TIME INDEX
+Per-strategy index from epoch seconds to liveData offsets, kept as two sorted
+array('q') columns so "value at t", "points between t0 and t1" and "last point
+of each day" are bisects instead of full scans with string parsing.
+
+Indexes live in store/index/<id>.tix, are extended by history_store and the hourly
+updaters on every append and rebuilt whenever they no longer match the live-data file:
+
+    python time_index.py --rebuild
+    python time_index.py --strategy sentquant --at "2026-03-01 12:00"
+"""
+
+import argparse
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+
+import history_store
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+INDEX_DIR = STORE_DIR / "index"
+MAGIC = b'TIX1'
+HEADER = struct.Struct('<4sI')  # magic, entry count
+DAY = 86400
+
+# ========== INDEX ==========
+
+class TimeIndex:
+    """Sorted epochs and the liveData offset of each one"""
+
+    def __init__(self, epochs=None, offsets=None):
+        self.epochs = epochs if epochs is not None else array('q')
+        self.offsets = offsets if offsets is not None else array('q')
+
+    @classmethod
+    def from_points(cls, points):
+        pairs = sorted((history_store.point_epoch(p), i) for i, p in enumerate(points))
+        return cls(array('q', (e for e, _ in pairs)), array('q', (i for _, i in pairs)))
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def append(self, epoch, offset):
+        """Add one entry; O(1) for in-order appends, insort otherwise"""
+        if not self.epochs or epoch >= self.epochs[-1]:
+            self.epochs.append(epoch)
+            self.offsets.append(offset)
+        else:
+            position = bisect_right(self.epochs, epoch)
+            self.epochs.insert(position, epoch)
+            self.offsets.insert(position, offset)
+
+    def extend_points(self, points, first_offset):
+        """Index points that were appended to liveData starting at first_offset"""
+        for i, point in enumerate(points):
+            self.append(history_store.point_epoch(point), first_offset + i)
+
+    # ---------- lookups ----------
+
+    def span(self, start=None, end=None):
+        """(lo, hi) positions of entries with start <= epoch <= end"""
+        lo = 0 if start is None else bisect_left(self.epochs, start)
+        hi = len(self.epochs) if end is None else bisect_right(self.epochs, end)
+        return lo, hi
+
+    def offset_at(self, when):
+        """Offset of the last point at or before `when` (None if earlier than all)"""
+        position = bisect_right(self.epochs, when) - 1
+        return self.offsets[position] if position >= 0 else None
+
+    def offsets_between(self, start=None, end=None):
+        lo, hi = self.span(start, end)
+        return self.offsets[lo:hi]
+
+    def bucket_positions(self, seconds, start=None, end=None):
+        """Positions of the last entry in each `seconds`-wide UTC bucket"""
+        lo, hi = self.span(start, end)
+        positions = []
+        while lo < hi:
+            bucket_end = (self.epochs[lo] // seconds + 1) * seconds
+            nxt = bisect_left(self.epochs, bucket_end, lo, hi)
+            positions.append(nxt - 1)
+            lo = nxt
+        return positions
+
+    def last_of_each(self, seconds, start=None, end=None):
+        """Offsets of the last point in each bucket (seconds=DAY -> daily closes)"""
+        return [self.offsets[p] for p in self.bucket_positions(seconds, start, end)]
+
+    # ---------- persistence ----------
+
+    def to_bytes(self):
+        epochs, offsets = array('q', self.epochs), array('q', self.offsets)
+        if sys.byteorder != 'little':
+            epochs.byteswap()
+            offsets.byteswap()
+        return HEADER.pack(MAGIC, len(epochs)) + epochs.tobytes() + offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, count = HEADER.unpack_from(data)
+        if magic != MAGIC or len(data) != HEADER.size + 16 * count:
+            raise ValueError("not a time index file")
+        epochs, offsets = array('q'), array('q')
+        epochs.frombytes(data[HEADER.size:HEADER.size + 8 * count])
+        offsets.frombytes(data[HEADER.size + 8 * count:])
+        if sys.byteorder != 'little':
+            epochs.byteswap()
+            offsets.byteswap()
+        return cls(epochs, offsets)
+
+# ========== STORAGE ==========
+
+def index_root(output_dir=None):
+    """Index directory for a live-data directory (default store, or next to a custom one)"""
+    if output_dir is None or Path(output_dir).resolve() == history_store.OUTPUT_DIR.resolve():
+        return INDEX_DIR
+    return Path(output_dir) / ".index"
+
+
+def index_path(strategy_id, root=INDEX_DIR):
+    return Path(root) / f"{strategy_id}.tix"
+
+
+def save_index(strategy_id, index, root=INDEX_DIR):
+    path = index_path(strategy_id, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(index.to_bytes())
+    os.replace(tmp_path, path)
+
+
+def read_index(strategy_id, root=INDEX_DIR):
+    """Stored index, or None if missing / unreadable"""
+    try:
+        with open(index_path(strategy_id, root), 'rb') as f:
+            return TimeIndex.from_bytes(f.read())
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def matches(index, points):
+    """Cheap consistency check of a stored index against liveData"""
+    if index is None or len(index) != len(points):
+        return False
+    if not points:
+        return True
+    first, last = index.offsets[0], index.offsets[-1]
+    return (max(first, last) < len(points)
+            and history_store.point_epoch(points[first]) == index.epochs[0]
+            and history_store.point_epoch(points[last]) == index.epochs[-1])
+
+
+def load_index(strategy_id, points, root=INDEX_DIR):
+    """Index for these points, rebuilt (and saved) if the stored one is stale"""
+    index = read_index(strategy_id, root)
+    if not matches(index, points):
+        index = TimeIndex.from_points(points)
+        try:
+            save_index(strategy_id, index, root)
+        except OSError as e:
+            print(f"⚠️  Could not save time index for {strategy_id}: {e}")
+    return index
+
+
+def update_index(strategy_id, points, new_count, root=INDEX_DIR):
+    """Extend the stored index with the last new_count points of liveData"""
+    old_points = points[:len(points) - new_count]
+    index = read_index(strategy_id, root)
+    if matches(index, old_points):
+        index.extend_points(points[len(old_points):], len(old_points))
+    else:
+        index = TimeIndex.from_points(points)
+    save_index(strategy_id, index, root)
+    return index
+
+
+def main():
+    """Rebuild indexes or run a lookup"""
+    parser = argparse.ArgumentParser(description="Epoch -> liveData offset index per strategy")
+    parser.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all files)")
+    parser.add_argument('--rebuild', action='store_true', help="rebuild from the live-data files")
+    parser.add_argument('--at', help="print the point at or before this UTC time")
+    parser.add_argument('--data-dir', help="live-data directory (default: public/data)")
+    args = parser.parse_args()
+
+    data_dir = history_store.live_data_path('x', args.data_dir).parent
+    strategy_ids = args.strategy or sorted(
+        p.name[len('live-data-'):-len('.json')] for p in data_dir.glob('live-data-*.json'))
+
+    for strategy_id in strategy_ids:
+        points = history_store.load_history(strategy_id, args.data_dir).get(strategy_id, {}).get('liveData', [])
+        root = index_root(args.data_dir)
+        if args.rebuild:
+            index = TimeIndex.from_points(points)
+            save_index(strategy_id, index, root)
+        else:
+            index = load_index(strategy_id, points, root)
+        days = len(index.last_of_each(DAY))
+        print(f"🗂️  {strategy_id:<16} {len(index):>6} points  {days:>4} days")
+        if args.at and len(index):
+            when = datetime.fromisoformat(args.at).replace(tzinfo=timezone.utc).timestamp()
+            offset = index.offset_at(int(when))
+            point = points[offset] if offset is not None else None
+            print(f"    at {args.at}: {point}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
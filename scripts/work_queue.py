@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+WORK QUEUE
+Sharded collection across worker processes (or hosts sharing the store)
+through a SQLite-backed queue:
+
+    coordinator  enqueues one item per strategy per round; shard = stable hash of the id
+    workers      lease items of their own shards first (then steal from others),
+                 poll the venue and store the sample on the item
+    merge        only the coordinator appends results to live-data files, one
+                 batched append per strategy, so workers never race on a file
+
+Leases expire, so items of a crashed worker are picked up again; failed polls
+are retried with exponential backoff up to MAX_ATTEMPTS. A completion from a
+worker whose lease was taken over is ignored.
+
+    python work_queue.py run --workers 8 --shards 16
+    python work_queue.py worker --shard 0 --shard 1 --follow   # e.g. on another host, same --db
+    python work_queue.py merge
+    python work_queue.py status
+    python work_queue.py run --workers 8 --synthetic 200 --output-dir /tmp/queue-data   # scaling check
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import history_store
+from strategies import STRATEGIES
+
+# ========== CONFIG ==========
+SCRIPT_DIR = Path(__file__).parent
+STORE_DIR = Path(os.getenv('SENTQUANT_STORE_DIR', SCRIPT_DIR.parent / "store"))
+QUEUE_DB = STORE_DIR / "queue" / "queue.db"
+POLLED_VENUES = ('lighter', 'hyperliquid')
+DEFAULT_SHARDS = 16
+LEASE_SECONDS = 60             # A leased item is claimable again after this
+MAX_ATTEMPTS = 4
+RETRY_BASE = 2.0               # Seconds; doubled per attempt
+IDLE_SLEEP = 0.5               # Worker back-off when nothing is claimable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    round TEXT NOT NULL,
+    strategy_id TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    account TEXT,
+    shard INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',     -- pending / leased / done / failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_until REAL NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    polled_at TEXT,
+    metrics TEXT,
+    merged INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS items_claim ON items (state, shard, available_at);
+CREATE INDEX IF NOT EXISTS items_merge ON items (state, merged, strategy_id);
+"""
+
+# ========== QUEUE ==========
+
+def shard_of(strategy_id, shards):
+    """Stable across processes and hosts (unlike hash())"""
+    return zlib.crc32(strategy_id.encode()) % shards
+
+
+def connect(db=QUEUE_DB):
+    db = Path(db)
+    db.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db, timeout=30, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue_round(conn, strategies, shards=DEFAULT_SHARDS, round_id=None):
+    """One pending item per strategy dict ({id, venue, account?}); returns the round id"""
+    round_id = round_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.executemany(
+            "INSERT INTO items (round, strategy_id, venue, account, shard) VALUES (?, ?, ?, ?, ?)",
+            [(round_id, s['id'], s['venue'], s.get('account'), shard_of(s['id'], shards)) for s in strategies])
+    return round_id
+
+
+def claim(conn, owner, shards=None, lease_seconds=LEASE_SECONDS):
+    """Lease one claimable item, own shards first; None if there is nothing to do"""
+    now = time.time()
+    claimable = ("((state = 'pending' AND available_at <= :now) OR "
+                 "(state = 'leased' AND lease_until < :now))")
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        row = None
+        if shards:
+            marks = ','.join(str(int(s)) for s in shards)
+            row = conn.execute(f"SELECT id, strategy_id, venue, account, attempts FROM items "
+                               f"WHERE {claimable} AND shard IN ({marks}) ORDER BY id LIMIT 1",
+                               {'now': now}).fetchone()
+        if row is None:
+            row = conn.execute(f"SELECT id, strategy_id, venue, account, attempts FROM items "
+                               f"WHERE {claimable} ORDER BY id LIMIT 1", {'now': now}).fetchone()
+        if row is not None:
+            conn.execute("UPDATE items SET state = 'leased', owner = ?, lease_until = ?, attempts = attempts + 1 "
+                         "WHERE id = ?", (owner, now + lease_seconds, row[0]))
+        conn.execute('COMMIT')
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    if row is None:
+        return None
+    item_id, strategy_id, venue, account, attempts = row
+    return {'id': item_id, 'strategy_id': strategy_id, 'venue': venue, 'account': account,
+            'attempts': attempts + 1}
+
+
+def complete(conn, item, owner, polled_at, metrics):
+    """Store the sample; False if the lease was lost to another worker"""
+    cursor = conn.execute(
+        "UPDATE items SET state = 'done', polled_at = ?, metrics = ?, error = NULL "
+        "WHERE id = ? AND owner = ? AND state = 'leased'",
+        (polled_at.isoformat(sep=' '), json.dumps(metrics), item['id'], owner))
+    return cursor.rowcount == 1
+
+
+def fail(conn, item, owner, error):
+    """Back off and retry, or give up after MAX_ATTEMPTS"""
+    if item['attempts'] >= MAX_ATTEMPTS:
+        conn.execute("UPDATE items SET state = 'failed', error = ? WHERE id = ? AND owner = ?",
+                     (error, item['id'], owner))
+    else:
+        retry_at = time.time() + RETRY_BASE * 2 ** (item['attempts'] - 1)
+        conn.execute("UPDATE items SET state = 'pending', available_at = ?, error = ? WHERE id = ? AND owner = ?",
+                     (retry_at, error, item['id'], owner))
+
+
+def open_items(conn, shards=None):
+    """Items that are pending or leased (in these shards)"""
+    where = f" AND shard IN ({','.join(str(int(s)) for s in shards)})" if shards else ""
+    return conn.execute(f"SELECT COUNT(*) FROM items WHERE state IN ('pending', 'leased'){where}").fetchone()[0]
+
+# ========== WORKER ==========
+
+def resolve(item, cache):
+    """(strategy, updater module, account) for an item, cached per strategy"""
+    if item['strategy_id'] not in cache:
+        from backfill import resolve_strategy
+        strategy, module, account, _ = resolve_strategy(item['strategy_id'], item['venue'], item['account'])
+        cache[item['strategy_id']] = (strategy, module, account)
+    return cache[item['strategy_id']]
+
+
+def poll(item, cache):
+    """Fetch one snapshot through the strategy's updater -> metrics"""
+    _, module, account = resolve(item, cache)
+    metrics = module.calculate_metrics(module.fetch_account_data(account))
+    if not metrics:
+        raise RuntimeError("no account data")
+    return metrics
+
+
+def worker_loop(db=QUEUE_DB, shards=None, owner=None, follow=False):
+    """Claim and poll until nothing is left (or forever with follow); returns items completed"""
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    conn = connect(db)
+    cache = {}
+    completed = 0
+    while True:
+        item = claim(conn, owner, shards)
+        if item is None:
+            if not follow and open_items(conn) == 0:
+                break
+            time.sleep(IDLE_SLEEP)
+            continue
+        try:
+            metrics = poll(item, cache)
+        except Exception as e:
+            fail(conn, item, owner, str(e)[:500])
+            continue
+        if complete(conn, item, owner, datetime.now(), metrics):
+            completed += 1
+    conn.close()
+    return completed
+
+# ========== MERGE ==========
+
+def merge(conn, output_dir=None):
+    """Append finished samples to live-data files, one batched append per strategy"""
+    from backfill import resolve_strategy
+    rows = conn.execute("SELECT id, strategy_id, venue, account, polled_at, metrics FROM items "
+                        "WHERE state = 'done' AND merged = 0 ORDER BY strategy_id, polled_at").fetchall()
+    by_strategy = defaultdict(list)
+    for row in rows:
+        by_strategy[row[1]].append(row)
+    written = 0
+    for strategy_id, items in by_strategy.items():
+        strategy, _, _, _ = resolve_strategy(strategy_id, items[0][2], items[0][3])
+        live_data = history_store.load_history(strategy_id, output_dir).get(strategy_id, {}).get('liveData', [])
+        last = history_store.point_epoch(live_data[-1]) if live_data else None
+        samples = []
+        for _, _, _, _, polled_at, metrics in items:
+            when = datetime.fromisoformat(polled_at).replace(microsecond=0)
+            # Skip samples already written by a merge that crashed before marking them
+            if last is None or history_store.point_epoch({'timestamp': when.strftime("%Y-%m-%d %H:%M:%S")}) > last:
+                samples.append((when, json.loads(metrics)))
+        if samples:
+            written += len(history_store.append_points(strategy, samples, output_dir))
+        with conn:
+            conn.executemany("UPDATE items SET merged = 1 WHERE id = ?", [(item[0],) for item in items])
+    return written
+
+
+def status(conn):
+    rows = conn.execute("SELECT state, COUNT(*), SUM(merged) FROM items GROUP BY state").fetchall()
+    return {state: {'items': count, 'merged': merged or 0} for state, count, merged in rows}
+
+# ========== COORDINATOR ==========
+
+def registry_items(strategy_ids=None):
+    return [{'id': s['id'], 'venue': s['venue']} for s in STRATEGIES
+            if s['venue'] in POLLED_VENUES and (not strategy_ids or s['id'] in strategy_ids)]
+
+
+def synthetic_items(count):
+    """Unregistered accounts (the mock venue server answers for any id)"""
+    return [{'id': f"synthetic_{i:04}", 'venue': 'lighter' if i % 2 == 0 else 'hyperliquid',
+             'account': str(100000 + i) if i % 2 == 0 else f"0x{i:040x}"} for i in range(count)]
+
+
+def worker_shards(worker, workers, shards):
+    return [s for s in range(shards) if s % workers == worker]
+
+
+def run_round(db, items, workers, shards, output_dir=None):
+    """Enqueue, fan out to worker processes, wait, merge. Returns a stats dict"""
+    conn = connect(db)
+    round_id = enqueue_round(conn, items, shards)
+    started = time.time()
+    with multiprocessing.Pool(workers) as pool:
+        counts = pool.starmap(worker_loop, [(db, worker_shards(w, workers, shards), None, False)
+                                            for w in range(workers)])
+    elapsed = time.time() - started
+    written = merge(conn, output_dir)
+    failed = conn.execute("SELECT strategy_id, error FROM items WHERE round = ? AND state = 'failed'",
+                          (round_id,)).fetchall()
+    conn.close()
+    return {'round': round_id, 'items': len(items), 'completed': sum(counts), 'per_worker': counts,
+            'failed': failed, 'written': written, 'seconds': elapsed}
+
+
+def main():
+    """Coordinator, worker, merge or status"""
+    parser = argparse.ArgumentParser(description="Sharded SQLite work queue for collectors")
+    parser.add_argument('--db', default=str(QUEUE_DB), help="queue database (shared by every worker)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="enqueue a round, run N local workers, merge")
+    run.add_argument('--workers', type=int, default=os.cpu_count())
+    run.add_argument('--shards', type=int, default=DEFAULT_SHARDS)
+    run.add_argument('--strategy', action='append', help="strategy id (repeatable, default: all polled)")
+    run.add_argument('--synthetic', type=int, help="N unregistered mock accounts instead (needs --output-dir)")
+    run.add_argument('--output-dir', help="write live-data files here instead of public/data")
+
+    enqueue = commands.add_parser('enqueue', help="enqueue a round without running workers")
+    enqueue.add_argument('--shards', type=int, default=DEFAULT_SHARDS)
+    enqueue.add_argument('--strategy', action='append')
+
+    worker = commands.add_parser('worker', help="claim and poll items")
+    worker.add_argument('--shard', type=int, action='append', help="preferred shard (repeatable)")
+    worker.add_argument('--follow', action='store_true', help="keep waiting for new rounds")
+
+    merge_cmd = commands.add_parser('merge', help="append finished samples to live-data files")
+    merge_cmd.add_argument('--output-dir')
+
+    commands.add_parser('status', help="item counts per state")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        if args.synthetic and not args.output_dir:
+            parser.error("--synthetic needs --output-dir")
+        items = synthetic_items(args.synthetic) if args.synthetic else registry_items(args.strategy)
+        stats = run_round(args.db, items, max(1, args.workers), max(args.shards, args.workers), args.output_dir)
+        print("="*70)
+        print(f"🧵 ROUND {stats['round']}: {stats['items']} items, {len(stats['per_worker'])} workers")
+        print("="*70)
+        print(f"Completed: {stats['completed']} in {stats['seconds']:.1f}s "
+              f"({stats['completed'] / max(stats['seconds'], 1e-9):.1f} items/s)")
+        print(f"Per worker: {stats['per_worker']}")
+        print(f"Merged:    {stats['written']} points")
+        for strategy_id, error in stats['failed']:
+            print(f"❌ {strategy_id}: {error}")
+        return 1 if stats['failed'] else 0
+
+    conn = connect(args.db)
+    if args.command == 'enqueue':
+        round_id = enqueue_round(conn, registry_items(args.strategy), args.shards)
+        print(f"📥 Round {round_id} enqueued")
+    elif args.command == 'worker':
+        print(f"✅ Completed {worker_loop(args.db, args.shard, follow=args.follow)} items")
+    elif args.command == 'merge':
+        print(f"💾 Merged {merge(conn, args.output_dir)} points")
+    else:
+        for state, counts in sorted(status(conn).items()):
+            print(f"   {state:<8} {counts['items']:>7} items  ({counts['merged']} merged)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
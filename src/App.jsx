@@ -9,6 +9,7 @@ import {
   BarChart3, Briefcase, ArrowLeft, ArrowRight, ChevronDown, Shield, 
   Calendar, MapPin, Link as LinkIcon, Cpu,Play, Globe, TrendingUp, Wallet, Home
 } from 'lucide-react';
+import { StatsClient, historyVersion } from './stats';
 
 // ==========================================
 // 1. DATA MOCK & KONFIGURASI
@@ -202,6 +203,21 @@ const CustomBenchmarkTooltip = ({ active, payload, label }) => {
     </div>
   );
 };
+// --- HISTORY HELPERS ---
+const pointTime = (p) => p.timestamp || p.date;
+
+// Satu worker statistik untuk seluruh app, dibuat saat pertama dibutuhkan
+let statsWorkerClient = null;
+const statsClient = () => statsWorkerClient || (statsWorkerClient = new StatsClient());
+
+// Full live-data satu strategi ({ liveData, tvl }), hanya diambil saat dibutuhkan
+const loadFullHistory = async (id) => {
+  const res = await fetch(`/data/live-data-${id}.json`);
+  const json = await res.json();
+  const strategyLive = json[id] || { liveData: [], tvl: 0 };
+  return { ...strategyLive, liveData: strategyLive.liveData || [] };
+};
+
 const App = () => {
   const [activeTab, setActiveTab] = useState('home');
   const scrollRef = React.useRef(null);
@@ -236,17 +252,32 @@ const App = () => {
     const initData = async () => {
       setLoading(true);
       try {
-        // Kita ambil data untuk SEMUA strategi yang ada di CONFIG secara paralel
+        // 1 request kecil: angka utama + sparkline per strategi (scripts/arena_summary.py)
+        let summary = null;
+        try {
+          const summaryRes = await fetch('/data/arena-summary.json');
+          if (summaryRes.ok) summary = (await summaryRes.json()).strategies;
+        } catch (err) {
+          console.warn("arena-summary.json tidak ada, ambil full history.");
+        }
+
         const fetchedData = await Promise.all(
           STRATEGIES_CONFIG.map(async (strat) => {
+            const s = summary && summary[strat.id];
+            if (s) {
+              return {
+                ...strat,
+                profitValue: s.profitValue,
+                tvl: s.tvl,
+                srs: s.srs ?? strat.srs,
+                history: s.sparkline,     // Sparkline dulu, full history saat profil dibuka
+                fullHistory: false
+              };
+            }
             try {
-              // Menarik data dari folder public/data/
-              const liveRes = await fetch(`/data/live-data-${strat.id}.json`);
-              const liveDataJson = await liveRes.json();
-              
-              // Ambil data spesifik strategi ini dari dalam JSON
-              const strategyLive = liveDataJson[strat.id] || { liveData: [], tvl: 0 };
-              const liveData = strategyLive.liveData || [];
+              // Fallback: menarik full data dari folder public/data/
+              const strategyLive = await loadFullHistory(strat.id);
+              const liveData = strategyLive.liveData;
 
               // HITUNG PROFIT ASLI (Kalkulasi dari harga pertama & terakhir)
               let profit = 0;
@@ -260,11 +291,12 @@ const App = () => {
                 ...strat,
                 profitValue: profit,      // Profit dari data asli
                 tvl: strategyLive.tvl,    // TVL dari data asli
-                history: liveData         // Memasukkan liveData ke dalam key 'history' Arena
+                history: liveData,        // Memasukkan liveData ke dalam key 'history' Arena
+                fullHistory: true
               };
             } catch (err) {
               console.warn(`Data untuk ${strat.id} tidak ditemukan, pakai fallback.`);
-              return { ...strat, profitValue: 0, tvl: 0, history: [] };
+              return { ...strat, profitValue: 0, tvl: 0, history: [], fullHistory: true };
             }
           })
         );
@@ -288,6 +320,65 @@ const App = () => {
 
     initData();
   }, []);
+
+  // --- LIVE PUSH (SSE dari scripts/push_server.py, aktif kalau VITE_PUSH_URL di-set) ---
+  useEffect(() => {
+    const pushUrl = import.meta.env.VITE_PUSH_URL;
+    if (!pushUrl || typeof EventSource === 'undefined') return;
+
+    const source = new EventSource(`${pushUrl}/events`);
+
+    source.addEventListener('nav', (e) => {
+      const { strategy, points } = JSON.parse(e.data);
+      const appendPoints = (q) => {
+        if (!q || q.id !== strategy) return q;
+        const last = q.history.length ? pointTime(q.history[q.history.length - 1]) : '';
+        const fresh = points.filter(p => pointTime(p) > last);
+        if (!fresh.length) return q;
+        const history = [...q.history, ...fresh];
+        const latest = history[history.length - 1];
+        const profit = history.length > 1
+          ? ((latest.value - history[0].value) / history[0].value) * 100
+          : q.profitValue;
+        return { ...q, history, profitValue: profit, tvl: latest.collateral ?? latest.tvl ?? q.tvl };
+      };
+      setQuants(prev => prev.map(appendPoints));
+      setSelectedProfile(prev => appendPoints(prev));
+    });
+
+    source.addEventListener('rankings', (e) => {
+      const srsById = Object.fromEntries(JSON.parse(e.data).rankings.map(r => [r.id, r.srs]));
+      const applySrs = (q) => (q && srsById[q.id] !== undefined ? { ...q, srs: srsById[q.id] } : q);
+      setQuants(prev => prev.map(applySrs));
+      setSelectedProfile(prev => applySrs(prev));
+    });
+
+    return () => source.close();
+  }, []);
+
+  // --- FULL HISTORY BARU DIAMBIL SAAT PROFIL DIBUKA ---
+  useEffect(() => {
+    if (!selectedProfile || selectedProfile.fullHistory) return;
+    const id = selectedProfile.id;
+    let cancelled = false;
+
+    loadFullHistory(id)
+      .then(({ liveData }) => {
+        if (cancelled) return;
+        const withFullHistory = (q) => {
+          if (!q || q.id !== id) return q;
+          // Titik dari push yang lebih baru dari file tetap dipertahankan
+          const last = liveData.length ? pointTime(liveData[liveData.length - 1]) : '';
+          const history = [...liveData, ...q.history.filter(p => pointTime(p) > last)];
+          return { ...q, history, fullHistory: true };
+        };
+        setQuants(prev => prev.map(withFullHistory));
+        setSelectedProfile(prev => withFullHistory(prev));
+      })
+      .catch(err => console.warn(`Full history ${id} gagal dimuat:`, err));
+
+    return () => { cancelled = true; };
+  }, [selectedProfile?.id, selectedProfile?.fullHistory]);
   // --- LOGIKA BIAR SWIPE GAK ADA HABISNYA ---
   const handleInfiniteScroll = (e) => {
     if (activeTab !== 'arena' || selectedProfile) return;
@@ -313,28 +404,20 @@ const App = () => {
       return () => clearTimeout(timer);
     }
   }, [activeTab, selectedProfile, quants]);
-// --- CALCULATOR LOGIC DARI SKRIP 1 ---
-  const profileStats = useMemo(() => {
-    if (!selectedProfile || !selectedProfile.history.length) return null;
-    const data = selectedProfile.history;
-    const startVal = data[0].value;
-    const endVal = data[data.length - 1].value;
-    
-    const returns = [];
-    for (let i = 1; i < data.length; i++) {
-      returns.push((data[i].value - data[i-1].value) / data[i-1].value);
-    }
-    
-    const mean = returns.reduce((a, b) => a + b, 0) / returns.length;
-    const stdDev = Math.sqrt(returns.reduce((s, r) => s + Math.pow(r - mean, 2), 0) / returns.length);
-    
-    return {
-      totalReturn: ((endVal - startVal) / startVal) * 100,
-      maxDrawdown: Math.min(...data.map(d => d.drawdown || 0)),
-      sharpe: stdDev !== 0 ? (mean / stdDev) * Math.sqrt(252) : 0,
-      winRate: returns.length > 0 ? ((returns.filter(r => r > 0).length / returns.length) * 100).toFixed(1) : "0"
-    };
-  }, [selectedProfile]);
+// --- CALCULATOR LOGIC DARI SKRIP 1 (dihitung di statsWorker.js) ---
+  const [profileStatsState, setProfileStatsState] = useState({ id: null, stats: null });
+  const profileVersion = selectedProfile ? historyVersion(selectedProfile.history) : null;
+  useEffect(() => {
+    if (!selectedProfile || !selectedProfile.history.length) return;
+    const id = selectedProfile.id;
+    let cancelled = false;
+    statsClient().profile(selectedProfile).then(stats => {
+      if (!cancelled) setProfileStatsState({ id, stats });
+    });
+    return () => { cancelled = true; };
+  }, [selectedProfile?.id, profileVersion]);
+  // Hasil profil lain (yang sebelumnya dibuka) tidak ditampilkan
+  const profileStats = selectedProfile && profileStatsState.id === selectedProfile.id ? profileStatsState.stats : null;
   const totalTVL = useMemo(() => quants.reduce((acc, curr) => acc + (curr.tvl || 0), 0), [quants]);
   // --- LOGIKA PERINGKAT GLOBAL BERDASARKAN SRS ---
   const rankedQuants = useMemo(() => {
@@ -342,35 +425,20 @@ const App = () => {
     return [...quants].sort((a, b) => (b.srs || 0) - (a.srs || 0) || (b.profitValue - a.profitValue));
   }, [quants]);
   
-const benchmarkData = useMemo(() => {
-    if (!quants.length || quants.every(q => q.history.length === 0)) return [];
-
-    
-    
-    // 1. Ambil SETIAP DETIK update unik dari SEMUA agen
-    const allTimestamps = new Set();
-    quants.forEach(q => {
-      q.history.forEach(h => allTimestamps.add(h.timestamp || h.date));
-    });
-
-    const sortedTimestamps = Array.from(allTimestamps).sort((a, b) => new Date(a) - new Date(b));
-
-    // 2. Gunakan sistem "Ingatan Terakhir" (Forward Fill)
-    const memory = {};
-    quants.forEach(q => { memory[q.id] = null; });
-
-    // 3. Bangun timeline: Ambil data persis setiap ada update di profil
-    return sortedTimestamps.map(timestamp => {
-      const point = { time: timestamp };
-      quants.forEach(q => {
-        // Cari apakah agen ini punya data di jam/detik ini
-        const match = q.history.find(h => (h.timestamp || h.date) === timestamp);
-        if (match) { memory[q.id] = match.value; }
-        point[q.id] = memory[q.id];
-      });
-      return point;
+// --- BENCHMARK: semua timestamp unik + forward fill, disejajarkan di statsWorker.js ---
+  const [benchmarkData, setBenchmarkData] = useState([]);
+  const benchmarkKey = quants.map(q => `${q.id}@${historyVersion(q.history)}`).join(',');
+  useEffect(() => {
+    if (!quants.length || quants.every(q => q.history.length === 0)) {
+      setBenchmarkData([]);
+      return;
+    }
+    let cancelled = false;
+    statsClient().benchmark(quants).then(rows => {
+      if (!cancelled) setBenchmarkData(rows);
     });
-  }, [quants]);
+    return () => { cancelled = true; };
+  }, [benchmarkKey]);
   const NavItem = ({ id, icon, label }) => (
     <button 
       onClick={() => { setActiveTab(id); if(id !== 'arena') setSelectedProfile(null); }} 
@@ -0,0 +1,179 @@
+// ==========================================
+// STATISTIK PROFIL & BENCHMARK (dipakai statsWorker.js, fallback di main thread)
+// ==========================================
+// Data dikirim sebagai kolom Float64Array (bukan array objek) supaya bisa
+// di-transfer ke worker tanpa copy.
+
+// "YYYY-MM-DD HH:MM:SS" / "YYYY-MM-DD" -> epoch ms (UTC, sama seperti scripts/history_store.point_epoch)
+export const parseTime = (stamp) =>
+  Date.parse(stamp.length > 10 ? `${stamp.replace(' ', 'T')}Z` : `${stamp}T00:00:00Z`);
+
+export const formatTime = (ms) => new Date(ms).toISOString().slice(0, 19).replace('T', ' ');
+
+// Versi data satu history: berubah kalau ada titik baru atau sparkline diganti full history
+export const historyVersion = (history) => {
+  if (!history || !history.length) return '0';
+  const last = history[history.length - 1];
+  return `${history.length}:${last.timestamp || last.date}`;
+};
+
+export const packSeries = (history) => {
+  const n = history.length;
+  const times = new Float64Array(n);
+  const values = new Float64Array(n);
+  const drawdowns = new Float64Array(n);
+  for (let i = 0; i < n; i++) {
+    const p = history[i];
+    times[i] = parseTime(p.timestamp || p.date);
+    values[i] = p.value;
+    drawdowns[i] = p.drawdown || 0;
+  }
+  return { times, values, drawdowns };
+};
+
+// Satu pass: mean & std return (Welford), win rate, max drawdown
+export const computeProfileStats = ({ values, drawdowns }) => {
+  const n = values.length;
+  if (!n) return null;
+  let count = 0, mean = 0, m2 = 0, wins = 0;
+  for (let i = 1; i < n; i++) {
+    const r = (values[i] - values[i - 1]) / values[i - 1];
+    count++;
+    const delta = r - mean;
+    mean += delta / count;
+    m2 += delta * (r - mean);
+    if (r > 0) wins++;
+  }
+  let maxDrawdown = 0;
+  for (let i = 0; i < n; i++) if (drawdowns[i] < maxDrawdown) maxDrawdown = drawdowns[i];
+  const stdDev = count ? Math.sqrt(m2 / count) : 0;
+  return {
+    totalReturn: ((values[n - 1] - values[0]) / values[0]) * 100,
+    maxDrawdown,
+    sharpe: stdDev !== 0 ? (mean / stdDev) * Math.sqrt(252) : 0,
+    winRate: count > 0 ? ((wins / count) * 100).toFixed(1) : "0"
+  };
+};
+
+// Gabungan semua timestamp unik + forward fill nilai terakhir tiap strategi (NaN sebelum titik pertama)
+export const alignSeries = (seriesList) => {
+  let total = 0;
+  seriesList.forEach(s => { total += s.times.length; });
+  const all = new Float64Array(total);
+  let offset = 0;
+  seriesList.forEach(s => { all.set(s.times, offset); offset += s.times.length; });
+  all.sort();
+  let unique = 0;
+  for (let i = 0; i < total; i++) {
+    if (i === 0 || all[i] !== all[i - 1]) all[unique++] = all[i];
+  }
+  const times = all.slice(0, unique);
+
+  const columns = seriesList.map(({ times: t, values: v }) => {
+    // History biasanya sudah urut; kalau tidak, urutkan indeksnya dulu
+    let order = null;
+    for (let i = 1; i < t.length; i++) {
+      if (t[i] < t[i - 1]) {
+        order = Array.from(t.keys()).sort((a, b) => t[a] - t[b] || a - b);
+        break;
+      }
+    }
+    const column = new Float64Array(unique);
+    let j = 0, last = NaN;
+    for (let i = 0; i < unique; i++) {
+      while (j < t.length && t[order ? order[j] : j] <= times[i]) {
+        last = v[order ? order[j] : j];
+        j++;
+      }
+      column[i] = last;
+    }
+    return column;
+  });
+  return { times, columns };
+};
+
+// Kolom hasil alignSeries -> baris untuk Recharts ({ time, [id]: value })
+export const benchmarkRows = (ids, { times, columns }) => {
+  const rows = new Array(times.length);
+  for (let i = 0; i < times.length; i++) {
+    const row = { time: formatTime(times[i]) };
+    for (let k = 0; k < ids.length; k++) {
+      const v = columns[k][i];
+      row[ids[k]] = Number.isNaN(v) ? null : v;
+    }
+    rows[i] = row;
+  }
+  return rows;
+};
+
+// ==========================================
+// CLIENT: kirim kolom ke worker sekali per versi, hasil dari cache worker
+// ==========================================
+export class StatsClient {
+  constructor() {
+    this.sent = new Map();     // id -> versi yang sudah dipegang worker
+    this.pending = new Map();  // request id -> resolve
+    this.seq = 0;
+    this.local = new Map();    // Fallback tanpa Worker: id -> { version, series }
+    try {
+      this.worker = new Worker(new URL('./statsWorker.js', import.meta.url), { type: 'module' });
+      this.worker.onmessage = (e) => {
+        // Worker gagal: kirim ulang semua kolom di request berikutnya
+        if (e.data.error) this.sent.clear();
+        const resolve = this.pending.get(e.data.seq);
+        this.pending.delete(e.data.seq);
+        if (resolve) resolve(e.data.result);
+      };
+    } catch (err) {
+      console.warn("Web Worker tidak tersedia, statistik dihitung di main thread.", err);
+      this.worker = null;
+    }
+  }
+
+  // { id, version, times, values, drawdowns } hanya untuk versi yang belum ada di worker
+  attach(q, transfer) {
+    const version = historyVersion(q.history);
+    const entry = { id: q.id, version };
+    if (this.sent.get(q.id) !== version) {
+      Object.assign(entry, packSeries(q.history));
+      transfer.push(entry.times.buffer, entry.values.buffer, entry.drawdowns.buffer);
+      this.sent.set(q.id, version);
+    }
+    return entry;
+  }
+
+  request(type, payload, transfer) {
+    const seq = ++this.seq;
+    return new Promise(resolve => {
+      this.pending.set(seq, resolve);
+      this.worker.postMessage({ type, seq, ...payload }, transfer);
+    });
+  }
+
+  localSeries(q) {
+    const version = historyVersion(q.history);
+    const cached = this.local.get(q.id);
+    if (cached && cached.version === version) return cached.series;
+    const series = packSeries(q.history);
+    this.local.set(q.id, { version, series });
+    return series;
+  }
+
+  profile(q) {
+    if (!this.worker) return Promise.resolve(computeProfileStats(this.localSeries(q)));
+    const transfer = [];
+    return this.request('profile', { series: this.attach(q, transfer) }, transfer);
+  }
+
+  benchmark(quants) {
+    const ids = quants.map(q => q.id);
+    if (!this.worker) return Promise.resolve(benchmarkRows(ids, alignSeries(quants.map(q => this.localSeries(q)))));
+    const transfer = [];
+    const series = quants.map(q => this.attach(q, transfer));
+    return this.request('benchmark', { series }, transfer).then(result => (result ? benchmarkRows(ids, result) : []));
+  }
+
+  terminate() {
+    if (this.worker) this.worker.terminate();
+  }
+}
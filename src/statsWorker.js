@@ -0,0 +1,52 @@
+// ==========================================
+// WEB WORKER: statistik profil & benchmark di luar main thread
+// ==========================================
+// Menyimpan kolom tiap strategi (versi terakhir) dan hasil per versi data,
+// jadi pindah profil / render ulang tidak menghitung ulang yang sama.
+import { alignSeries, computeProfileStats } from './stats.js';
+
+const series = new Map();     // id -> { version, times, values, drawdowns }
+const profiles = new Map();   // id -> { version, stats }
+const benchmarks = new Map(); // "id@versi,..." -> { times, columns }
+const BENCHMARK_CACHE = 4;
+
+const remember = (entry) => {
+  if (entry.times) series.set(entry.id, entry);
+  const stored = series.get(entry.id);
+  if (!stored || stored.version !== entry.version) {
+    throw new Error(`Series ${entry.id}@${entry.version} belum dikirim`);
+  }
+  return stored;
+};
+
+const profile = ({ series: entry }) => {
+  const stored = remember(entry);
+  const cached = profiles.get(entry.id);
+  if (cached && cached.version === entry.version) return cached.stats;
+  const stats = computeProfileStats(stored);
+  profiles.set(entry.id, { version: entry.version, stats });
+  return stats;
+};
+
+const benchmark = ({ series: entries }) => {
+  const stored = entries.map(remember);
+  const key = entries.map(e => `${e.id}@${e.version}`).join(',');
+  if (!benchmarks.has(key)) {
+    if (benchmarks.size >= BENCHMARK_CACHE) benchmarks.delete(benchmarks.keys().next().value);
+    benchmarks.set(key, alignSeries(stored));
+  }
+  // Dikirim sebagai copy (bukan transfer) supaya cache di sini tetap utuh
+  return benchmarks.get(key);
+};
+
+const HANDLERS = { profile, benchmark };
+
+self.onmessage = (e) => {
+  const { type, seq } = e.data;
+  try {
+    self.postMessage({ seq, result: HANDLERS[type](e.data) });
+  } catch (err) {
+    console.error(`statsWorker ${type} gagal:`, err);
+    self.postMessage({ seq, result: null, error: true });
+  }
+};